@@ -4,6 +4,8 @@ import dash
 from dash import Input, Output
 from layout import create_layout
 from callbacks import register_callbacks
+from utils.compression import register_compression
+from utils.plan_export import register_plan_export
 
 app = dash.Dash(__name__, suppress_callback_exceptions=True)
 
@@ -15,6 +17,12 @@ def add_iframe_headers(response):
     response.headers['Access-Control-Allow-Headers'] = 'Content-Type'
     return response
 
+# Compress large callback/layout responses (figure JSON) for slow site links
+register_compression(app.server)
+
+# Streaming load plan downloads (JSON/CSV/Parquet)
+register_plan_export(app.server, routes_prefix=app.config.routes_pathname_prefix)
+
 # Set the layout
 app.layout = create_layout()
 
@@ -2,9 +2,13 @@
 from . import package_callbacks
 from . import ui_callbacks
 from . import url_callbacks
+from . import import_callbacks
+from . import export_callbacks
 
 def register_callbacks(app):
     """Register all callbacks with the Dash app"""
     package_callbacks.register_callbacks(app)
     ui_callbacks.register_callbacks(app)
-    url_callbacks.register_callbacks(app)
\ No newline at end of file
+    url_callbacks.register_callbacks(app)
+    import_callbacks.register_callbacks(app)
+    export_callbacks.register_callbacks(app)
\ No newline at end of file
@@ -0,0 +1,42 @@
+"""Callbacks for exporting the current load plan"""
+
+from dash import Input, Output, State, html
+from dash.exceptions import PreventUpdate
+from urllib.parse import urlparse, parse_qs
+from utils.plan_export import save_plan_snapshot, PLAN_WRITERS, PARQUET_AVAILABLE
+
+
+def register_callbacks(app):
+    """Register load plan export callbacks"""
+
+    @app.callback(
+        Output('export-links', 'children'),
+        [Input('export-btn', 'n_clicks')],
+        [State('packages-store', 'data'),
+         State('truck-dimensions', 'data'),
+         State('url', 'href')],
+        prevent_initial_call=True
+    )
+    def export_plan(n_clicks, packages, truck_dims, href):
+        """
+        Snapshot the current plan and show download links for it
+
+        The downloads are streamed by the /export route (utils/plan_export.py),
+        so large plans never pass through a callback response.
+        """
+        if not n_clicks or not packages:
+            raise PreventUpdate
+
+        order_number = parse_qs(urlparse(href or '').query).get('order', [None])[0]
+        token = save_plan_snapshot(packages, truck_dims, order_number)
+        print(f"📤 Plan of {len(packages)} packages ready for export ({token})")
+
+        formats = [fmt for fmt in PLAN_WRITERS if fmt != 'parquet' or PARQUET_AVAILABLE]
+        links = []
+        for fmt in formats:
+            if links:
+                links.append(html.Span(' · ', style={'color': '#94a3b8'}))
+            # Relative to requests_pathname_prefix, so links work behind a proxy sub-path
+            links.append(html.A(fmt.upper(), href=app.get_relative_path(f'/export/{token}.{fmt}'), download='',
+                                style={'color': '#3b82f6'}))
+        return html.Div(['⬇️ Download: ', *links])
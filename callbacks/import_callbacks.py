@@ -0,0 +1,132 @@
+"""Callbacks for importing packages from uploaded CSV/Excel files"""
+
+from dash import Input, Output, State, html, Patch, no_update
+from utils.background import background_callback
+from utils.history import EMPTY_HISTORY
+from utils.package_import import save_upload, start_import, import_batch, cancel_import
+
+
+def import_progress(job, error=None):
+    """Progress line shown under the upload box"""
+    if error:
+        return html.Span(f'❌ {error}', style={'color': '#f87171'})
+    if not job:
+        return ''
+
+    malformed = f" · {job['malformed']:,} malformed rows skipped" if job['malformed'] else ''
+    if job['done']:
+        details = [html.Span(f"✅ Imported {job['parsed']:,} packages from {job['filename']}{malformed}")]
+        details += [
+            html.Div(f"Row {error['row']}: {error['reason']}", style={'fontSize': '11px', 'color': '#94a3b8'})
+            for error in job['errors'][:5]
+        ]
+        return html.Div(details)
+
+    percent = 100 * job['offset'] / job['size'] if job['size'] else 100
+    return html.Span(f"⏳ Importing {job['filename']}: {job['parsed']:,} packages ({percent:.0f}%){malformed}")
+
+
+def register_callbacks(app):
+    """Register package upload callbacks"""
+
+    @background_callback(
+        app,
+        [Output('import-job', 'data'),
+         Output('import-poll', 'disabled'),
+         Output('import-progress', 'children'),
+         Output('package-upload', 'contents')],
+        [Input('package-upload', 'contents')],
+        [State('package-upload', 'filename'),
+         State('import-job', 'data')],
+        progress=Output('import-progress', 'children', allow_duplicate=True),
+        running=[(Output('package-upload', 'disabled'), True, False)],
+        cancel=[Input('import-cancel-btn', 'n_clicks')],
+        prevent_initial_call=True
+    )
+    def start_package_import(set_progress, contents, filename, current_job):
+        """
+        Save an uploaded file and start importing it batch by batch
+
+        Runs as a background job - decoding a large upload and converting
+        Excel files takes too long for the request thread.
+        """
+        if not contents:
+            return no_update, no_update, no_update, no_update
+
+        if current_job and not current_job['done']:
+            cancel_import(current_job)
+
+        set_progress(f'⏳ Reading {filename}...')
+        try:
+            job = start_import(save_upload(contents, filename), filename)
+        except (ValueError, OSError, UnicodeDecodeError) as e:
+            print(f"❌ Import of {filename} failed: {e}")
+            return None, True, import_progress(None, error=e), None
+
+        print(f"📥 Importing {filename} ({job['size']:,} bytes)")
+        # Clearing the upload contents frees the base64 copy held by the browser
+        return job, False, import_progress(job), None
+
+    @app.callback(
+        [Output('import-job', 'data', allow_duplicate=True),
+         Output('import-poll', 'disabled', allow_duplicate=True),
+         Output('import-progress', 'children', allow_duplicate=True)],
+        [Input('import-cancel-btn', 'n_clicks')],
+        [State('import-job', 'data')],
+        prevent_initial_call=True
+    )
+    def cancel_package_import(n_clicks, job):
+        """Stop a running import - packages imported so far are kept"""
+        if not job or job['done']:
+            return no_update, True, no_update
+
+        cancel_import(job)
+        print(f"🛑 Import of {job['filename']} cancelled after {job['parsed']:,} packages")
+        return None, True, f"🛑 Import cancelled - kept {job['parsed']:,} packages"
+
+    @app.callback(
+        [Output('packages-store', 'data', allow_duplicate=True),
+         Output('package-counter', 'data', allow_duplicate=True),
+         Output('import-job', 'data', allow_duplicate=True),
+         Output('import-poll', 'disabled', allow_duplicate=True),
+         Output('import-progress', 'children', allow_duplicate=True),
+         Output('order-id', 'data', allow_duplicate=True),
+         Output('history-store', 'data', allow_duplicate=True)],
+        [Input('import-poll', 'n_intervals')],
+        [State('import-job', 'data')],
+        prevent_initial_call=True
+    )
+    def import_next_batch(n_intervals, job):
+        """
+        Parse the next batch of the running import into the package store
+
+        The first batch replaces the current packages, later batches are
+        appended with a Patch so only the new packages go over the wire.
+        """
+        if not job or job['done']:
+            return no_update, no_update, no_update, True, no_update, no_update, no_update
+
+        first_batch = job['batches'] == 0
+        try:
+            packages, job = import_batch(job)
+        except (ValueError, OSError, UnicodeDecodeError) as e:
+            print(f"❌ Import of {job['filename']} failed: {e}")
+            cancel_import(job)
+            return no_update, no_update, None, True, import_progress(None, error=e), no_update, no_update
+
+        if first_batch:
+            store = packages
+        elif packages:
+            store = Patch()
+            store.extend(packages)
+        else:
+            store = no_update
+
+        if job['done']:
+            print(f"✅ Imported {job['parsed']:,} packages from {job['filename']} "
+                  f"({job['malformed']:,} malformed rows)")
+        # Edits of imported packages are logged under the file name, and
+        # the undo history of the previous plan no longer applies
+        order_id = f"file:{job['filename']}" if first_batch else no_update
+        history = EMPTY_HISTORY if first_batch else no_update
+        return store, job['parsed'], job, job['done'], import_progress(job), order_id, history
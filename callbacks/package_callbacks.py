@@ -1,17 +1,30 @@
 """Callbacks for package manipulation (add, delete, rotate, move)"""
 
-from dash import Input, Output, State, callback_context, ALL
+from dash import Input, Output, State, callback_context, ALL, Patch, html
 import dash
 from dash.exceptions import PreventUpdate
-import numpy as np
 import json
-from config import TRUCK_LENGTH, TRUCK_WIDTH, TRUCK_HEIGHT, MOVE_STEP
+from config import TRUCK_LENGTH, TRUCK_WIDTH, TRUCK_HEIGHT, MOVE_STEP, COMPACT_FIGURE_THRESHOLD
 from utils.geometry import rotate_dimensions
+from utils.event_log import log_package_change, flush_event_log
+from utils.background import background_callback
+from utils.history import package_change, push_history, apply_operation
+from utils.sequencing import plan_loading
+from utils.exact_placement import place_packages
+from utils.pallets import top_under, is_pallet, palletize_packages
+from utils.snapping import move_group
+from utils.constraints import resolve_rules
+
+# Index of the first package trace in the figure (after truck wireframe and floor)
+PACKAGE_TRACE_OFFSET = 2
 
 def calculate_stack_position(selected_pkg, all_packages, truck_height):
     """
     Calculate the Z position for a package based on overlapping packages.
     Returns None if no stacking needed, or the new Z position if stacking.
+
+    Pallets are checked parent first (utils.pallets.top_under): their cartons
+    are only looked at when the pallet is under the package.
     """
     
     rotation = selected_pkg.get('rotation', 0)
@@ -31,23 +44,9 @@ def calculate_stack_position(selected_pkg, all_packages, truck_height):
         if other_pkg['id'] == selected_pkg['id']:
             continue
         
-        other_rotation = other_pkg.get('rotation', 0)
-        other_width, other_height = rotate_dimensions(
-            other_pkg['width'], other_pkg['height'], other_rotation
-        )
-        
-        other_x1 = other_pkg['x']
-        other_x2 = other_pkg['x'] + other_width
-        other_y1 = other_pkg['y']
-        other_y2 = other_pkg['y'] + other_height
-        
-        # Check overlap
-        x_overlap = not (sel_x2 <= other_x1 or sel_x1 >= other_x2)
-        y_overlap = not (sel_y2 <= other_y1 or sel_y1 >= other_y2)
-        
-        if x_overlap and y_overlap:
+        other_top = top_under(other_pkg, sel_x1, sel_y1, sel_x2, sel_y2)
+        if other_top is not None:
             found_overlap = True
-            other_top = other_pkg['z'] + other_pkg['depth']
             if other_top > max_z:
                 max_z = other_top
     
@@ -95,61 +94,126 @@ def update_package_with_stacking(pkg, packages, auto_stack, truck_height, action
         return pkg, f"📍 {action_type.capitalize()} {pkg['name']} to ({pkg['x']:.1f}, {pkg['y']:.1f}, {pkg['z']:.1f})"
 
 
+def move_selection(packages, selected_id, selected_ids, x, y, snap_toggle, truck_dims, axes=(0, 1)):
+    """
+    Where the selected packages go when the selected package is moved to (x, y)
+
+    The rest of a multi-selection moves along by the same amount, and with
+    snapping on the group is pulled flush against neighbours and walls
+    (utils.snapping.move_group).
+
+    Args:
+        packages: All package dicts
+        selected_id: Id of the package being moved
+        selected_ids: Ids of the multi-selection (may be empty)
+        x, y: Requested position of the selected package
+        snap_toggle: Snap toggle value
+        truck_dims: Truck dimensions store data (None for the default truck)
+        axes: Axes the move is along (0 = X, 1 = Y)
+
+    Returns:
+        dict: package id -> new (x, y)
+    """
+    selected = next((pkg for pkg in packages if pkg['id'] == selected_id), None)
+    if selected is None:
+        return {}
+    truck_dims = truck_dims or {'length': TRUCK_LENGTH, 'width': TRUCK_WIDTH, 'height': TRUCK_HEIGHT}
+    group = set(selected_ids or ()) | {selected_id}
+    return move_group(packages, group, x - selected['x'], y - selected['y'], truck_dims,
+                      snap=bool(snap_toggle and 'enabled' in snap_toggle), axes=axes)
+
+
 def register_callbacks(app):
     """Register package manipulation callbacks"""
 
     @app.callback(
-        Output('packages-store', 'data', allow_duplicate=True),
+        [Output('packages-store', 'data', allow_duplicate=True),
+         Output('history-store', 'data', allow_duplicate=True)],
         [Input({'type': 'delete-btn', 'index': dash.dependencies.ALL}, 'n_clicks')],
         [State({'type': 'delete-btn', 'index': dash.dependencies.ALL}, 'id'),
-         State('packages-store', 'data')],
+         State('packages-store', 'data'),
+         State('order-id', 'data'),
+         State('history-store', 'data')],
         prevent_initial_call=True
     )
-    def delete_package(n_clicks, ids, packages):
+    def delete_package(n_clicks, ids, packages, order_id, history):
         """Delete a package"""
+        changes = []
         ctx = callback_context
         if not ctx.triggered or not any(n_clicks):
-            return packages
+            return packages, dash.no_update
         
         button_id = ctx.triggered[0]['prop_id'].split('.')[0]
         if button_id:
             clicked_id = json.loads(button_id)
-            packages = [pkg for pkg in packages if pkg['id'] != clicked_id['index']]
-        
-        return packages
+            index = next((i for i, pkg in enumerate(packages) if pkg['id'] == clicked_id['index']), None)
+            if index is not None:
+                deleted = packages[index]
+                packages = packages[:index] + packages[index + 1:]
+                log_package_change('delete_package', order_id, deleted, None)
+                changes.append(package_change(deleted, None, index))
+        
+        return packages, push_history(history, 'delete_package', changes)
 
     @app.callback(
-        Output('selected-package-id', 'data'),
-        [Input({'type': 'package-item', 'index': dash.dependencies.ALL}, 'n_clicks')],
-        [State({'type': 'package-item', 'index': dash.dependencies.ALL}, 'id')]
+        [Output('selected-package-id', 'data'),
+         Output('selected-package-ids', 'data')],
+        [Input({'type': 'package-item', 'index': dash.dependencies.ALL}, 'n_clicks'),
+         Input('multi-select-toggle', 'value')],
+        [State({'type': 'package-item', 'index': dash.dependencies.ALL}, 'id'),
+         State('selected-package-id', 'data'),
+         State('selected-package-ids', 'data')]
     )
-    def select_package(n_clicks, ids):
-        """Handle package selection"""
+    def select_package(n_clicks, multi_select, ids, selected_id, selected_ids):
+        """
+        Handle package selection
+
+        With multi-select on, a click adds the package to the selection (or
+        takes it out again); the last one clicked is the one being edited.
+        """
         ctx = callback_context
-        if not ctx.triggered or not any(n_clicks):
-            return dash.no_update
-        
+        if not ctx.triggered:
+            return dash.no_update, dash.no_update
+
         button_id = ctx.triggered[0]['prop_id'].split('.')[0]
-        if button_id:
-            clicked_id = json.loads(button_id)
-            return clicked_id['index']
-        
-        return dash.no_update
+        if button_id == 'multi-select-toggle':
+            # Switching multi-select on or off starts again from the package being edited
+            return dash.no_update, [] if selected_id is None else [selected_id]
+
+        if not any(n_clicks) or not button_id:
+            return dash.no_update, dash.no_update
+
+        clicked = json.loads(button_id)['index']
+        if not (multi_select and 'enabled' in multi_select):
+            return clicked, [clicked]
+
+        selected_ids = list(selected_ids or [])
+        if selected_id is not None and selected_id not in selected_ids:
+            selected_ids.append(selected_id)
+        if clicked in selected_ids:
+            selected_ids.remove(clicked)
+            return (selected_ids[-1] if selected_ids else None), selected_ids
+        return clicked, selected_ids + [clicked]
 
     @app.callback(
-        Output('packages-store', 'data', allow_duplicate=True),
+        [Output('packages-store', 'data', allow_duplicate=True),
+         Output('history-store', 'data', allow_duplicate=True)],
         [Input('rotate-btn', 'n_clicks')],
         [State('selected-package-id', 'data'),
-         State('packages-store', 'data')],
+         State('packages-store', 'data'),
+         State('order-id', 'data'),
+         State('history-store', 'data')],
         prevent_initial_call=True
     )
-    def rotate_package(n_clicks, selected_id, packages):
+    def rotate_package(n_clicks, selected_id, packages, order_id, history):
         """Rotate the selected package by 90 degrees"""
+        changes = []
         if not n_clicks or not packages:
-            return packages
+            return packages, dash.no_update
         
         for pkg in packages:
             if pkg['id'] == selected_id:
+                before = dict(pkg)
                 current_rotation = pkg.get('rotation', 0)
                 pkg['rotation'] = (current_rotation + 90) % 360
                 
@@ -159,32 +223,39 @@ def register_callbacks(app):
                 )
                 pkg['x'] = min(pkg['x'], TRUCK_LENGTH - actual_width)
                 pkg['y'] = min(pkg['y'], TRUCK_WIDTH - actual_height)
+                log_package_change('rotate_package', order_id, before, pkg)
+                changes.append(package_change(before, pkg))
                 break
         
-        return packages
+        return packages, push_history(history, 'rotate_package', changes)
 
     @app.callback(
-        Output('packages-store', 'data', allow_duplicate=True),
+        [Output('packages-store', 'data', allow_duplicate=True),
+         Output('history-store', 'data', allow_duplicate=True)],
         [Input('align-left-btn', 'n_clicks'),
          Input('align-right-btn', 'n_clicks'),
          Input('align-front-btn', 'n_clicks'),
          Input('align-back-btn', 'n_clicks'),
          Input('align-floor-btn', 'n_clicks')],
         [State('selected-package-id', 'data'),
-         State('packages-store', 'data')],
+         State('packages-store', 'data'),
+         State('order-id', 'data'),
+         State('history-store', 'data')],
         prevent_initial_call=True
     )
     def align_package(left_clicks, right_clicks, front_clicks, back_clicks, 
-                     floor_clicks, selected_id, packages):
+                     floor_clicks, selected_id, packages, order_id, history):
         """Align package to truck walls"""
+        changes = []
         ctx = callback_context
         if not ctx.triggered or not packages:
-            return packages
+            return packages, dash.no_update
         
         button_id = ctx.triggered[0]['prop_id'].split('.')[0]
         
         for pkg in packages:
             if pkg['id'] == selected_id:
+                before = dict(pkg)
                 rotation = pkg.get('rotation', 0)
                 actual_width, actual_height = rotate_dimensions(
                     pkg['width'], pkg['height'], rotation
@@ -200,21 +271,30 @@ def register_callbacks(app):
                     pkg['x'] = TRUCK_LENGTH - actual_width
                 elif button_id == 'align-floor-btn':
                     pkg['z'] = 0
+                log_package_change('align_package', order_id, before, pkg, trigger=button_id)
+                changes.append(package_change(before, pkg))
                 break
         
-        return packages
+        return packages, push_history(history, 'align_package', changes)
 
     @app.callback(
-        Output('packages-store', 'data', allow_duplicate=True),
+        [Output('packages-store', 'data', allow_duplicate=True),
+         Output('history-store', 'data', allow_duplicate=True)],
         [Input({'type': 'grid-cell', 'x': ALL, 'y': ALL}, 'n_clicks')],
         [State('packages-store', 'data'),
         State('selected-package-id', 'data'),
+        State('selected-package-ids', 'data'),
         State('auto-stack-toggle', 'value'),
-        State('truck-dimensions', 'data')],
+        State('snap-toggle', 'value'),
+        State('truck-dimensions', 'data'),
+        State('order-id', 'data'),
+        State('history-store', 'data')],
         prevent_initial_call=True
     )
-    def position_package_from_grid(n_clicks_list, packages, selected_id, auto_stack, truck_dims):
-        """Move package to clicked grid cell with optional auto-stacking"""
+    def position_package_from_grid(n_clicks_list, packages, selected_id, selected_ids, auto_stack, snap, truck_dims,
+                                   order_id, history):
+        """Move the selection to the clicked grid cell, snapping and auto-stacking optionally"""
+        changes = []
         if not packages or not selected_id:
             raise PreventUpdate
         
@@ -233,64 +313,97 @@ def register_callbacks(app):
         cell_y = trigger_id['y']
 
         truck_height = truck_dims.get('height', TRUCK_HEIGHT) if truck_dims else TRUCK_HEIGHT
+        moves = move_selection(packages, selected_id, selected_ids, cell_x, cell_y, snap, truck_dims)
+        stack_on = [pkg for pkg in packages if pkg['id'] not in moves]  # the selection does not stack on itself
         
-        # Update selected package position
+        # Update selected package positions
         updated_packages = []
         for pkg in packages:
-            if pkg['id'] == selected_id:
+            if pkg['id'] in moves:
+                before = dict(pkg)
                 # Update X/Y position
-                pkg['x'] = cell_x
-                pkg['y'] = cell_y
+                pkg['x'], pkg['y'] = moves[pkg['id']]
                 
                 # Apply stacking logic and get log message
-                pkg, log_msg = update_package_with_stacking(pkg, packages, auto_stack, truck_height, "grid placed")
+                pkg, log_msg = update_package_with_stacking(pkg, stack_on, auto_stack, truck_height, "grid placed")
                 print(log_msg)
+                log_package_change('position_package_from_grid', order_id, before, pkg,
+                                   auto_stack=bool(auto_stack and 'enabled' in auto_stack))
+                changes.append(package_change(before, pkg))
                 
             updated_packages.append(pkg)
         
-        return updated_packages
+        return updated_packages, push_history(history, 'position_package_from_grid', changes)
 
     @app.callback(
-        Output('packages-store', 'data', allow_duplicate=True),
+        [Output('packages-store', 'data', allow_duplicate=True),
+         Output('history-store', 'data', allow_duplicate=True)],
         [Input('input-x', 'value'),
          Input('input-y', 'value'),
          Input('input-z', 'value')],
         [State('selected-package-id', 'data'),
-         State('packages-store', 'data')],
+         State('selected-package-ids', 'data'),
+         State('snap-toggle', 'value'),
+         State('packages-store', 'data'),
+         State('order-id', 'data'),
+         State('history-store', 'data')],
         prevent_initial_call=True
     )
-    def update_package_position(x, y, z, selected_id, packages):
-        """Update the position of the selected package from numeric inputs"""
+    def update_package_position(x, y, z, selected_id, selected_ids, snap, packages, order_id, history):
+        """Update the position of the selected package from numeric inputs (X/Y move the whole selection)"""
+        changes = []
         if not packages or x is None or y is None or z is None:
-            return packages
+            return packages, dash.no_update
         
+        trigger_id = callback_context.triggered[0]['prop_id'].split('.')[0] if callback_context.triggered else None
+        axes = {'input-x': (0,), 'input-y': (1,)}.get(trigger_id, ())
+        moves = move_selection(packages, selected_id, selected_ids, x, y, snap, None, axes) if axes else {}
+
         for pkg in packages:
-            if pkg['id'] == selected_id:
+            if pkg['id'] == selected_id or pkg['id'] in moves:
+                before = dict(pkg)
                 rotation = pkg.get('rotation', 0)
                 actual_width, actual_height = rotate_dimensions(
                     pkg['width'], pkg['height'], rotation
                 )
                 
-                pkg['x'] = max(0, min(TRUCK_LENGTH - actual_width, x))
-                pkg['y'] = max(0, min(TRUCK_WIDTH - actual_height, y))
-                pkg['z'] = max(0, min(TRUCK_HEIGHT - pkg['depth'], z))
-                break
+                if pkg['id'] in moves:
+                    pkg['x'], pkg['y'] = moves[pkg['id']]
+                else:
+                    pkg['x'] = max(0, min(TRUCK_LENGTH - actual_width, x))
+                    pkg['y'] = max(0, min(TRUCK_WIDTH - actual_height, y))
+                if pkg['id'] == selected_id:
+                    pkg['z'] = max(0, min(TRUCK_HEIGHT - pkg['depth'], z))
+                log_package_change('update_package_position', order_id, before, pkg)
+                changes.append(package_change(before, pkg))
         
-        return packages
+        return packages, push_history(history, 'update_package_position', changes, f'position-input:{selected_id}')
     
     @app.callback(
-        Output('packages-store', 'data', allow_duplicate=True),
+        [Output('packages-store', 'data', allow_duplicate=True),
+         Output('history-store', 'data', allow_duplicate=True)],
         [Input('slider-x', 'value'),
         Input('slider-y', 'value'),
         Input('slider-z', 'value')],
         [State('packages-store', 'data'),
         State('selected-package-id', 'data'),
+        State('selected-package-ids', 'data'),
         State('auto-stack-toggle', 'value'),
-        State('truck-dimensions', 'data')],
+        State('snap-toggle', 'value'),
+        State('truck-dimensions', 'data'),
+        State('order-id', 'data'),
+        State('history-store', 'data')],
         prevent_initial_call=True
     )
-    def update_position_from_sliders(x_val, y_val, z_val, packages, selected_id, auto_stack, truck_dims):
-        """Update package position based on slider values, with optional auto-stacking"""
+    def update_position_from_sliders(x_val, y_val, z_val, packages, selected_id, selected_ids, auto_stack, snap,
+                                     truck_dims, order_id, history):
+        """
+        Update package position based on slider values, with optional auto-stacking
+
+        X/Y moves take the rest of a multi-selection along and snap to
+        neighbours when snapping is on; Z moves only the selected package.
+        """
+        changes = []
         if not packages or not selected_id:
             raise PreventUpdate
         
@@ -317,47 +430,59 @@ def register_callbacks(app):
             raise PreventUpdate
         
         truck_height = truck_dims.get('height', TRUCK_HEIGHT) if truck_dims else TRUCK_HEIGHT
+        moves = {}
+        if trigger_id == 'slider-x':
+            moves = move_selection(packages, selected_id, selected_ids, round(x_val, 2), current_pkg['y'], snap,
+                                   truck_dims, axes=(0,))
+        elif trigger_id == 'slider-y':
+            moves = move_selection(packages, selected_id, selected_ids, current_pkg['x'], round(y_val, 2), snap,
+                                   truck_dims, axes=(1,))
+        stack_on = [pkg for pkg in packages if pkg['id'] not in moves]  # the selection does not stack on itself
         
         updated_packages = []
         for pkg in packages:
-            if pkg['id'] == selected_id:
+            if pkg['id'] == selected_id or pkg['id'] in moves:
                 updated_pkg = {**pkg}
                 
                 # Update position
-                if trigger_id == 'slider-x' and x_val is not None:
-                    updated_pkg['x'] = round(x_val, 2)
-                elif trigger_id == 'slider-y' and y_val is not None:
-                    updated_pkg['y'] = round(y_val, 2)
+                if pkg['id'] in moves:
+                    updated_pkg['x'], updated_pkg['y'] = moves[pkg['id']]
                 elif trigger_id == 'slider-z' and z_val is not None:
                     updated_pkg['z'] = round(z_val, 2)
                 
                 # Apply auto-stacking only for X/Y changes, not Z
                 if trigger_id in ['slider-x', 'slider-y']:
-                    updated_pkg, log_msg = update_package_with_stacking(updated_pkg, packages, auto_stack, truck_height, "slider moved")
+                    updated_pkg, log_msg = update_package_with_stacking(updated_pkg, stack_on, auto_stack, truck_height, "slider moved")
                     print(log_msg)
                 else:
                     # Manual Z change - just log it
                     print(f"📍 Moved {updated_pkg['name']} to ({updated_pkg['x']:.1f}, {updated_pkg['y']:.1f}, {updated_pkg['z']:.1f})")
-                
+
+                log_package_change('update_position_from_sliders', order_id, pkg, updated_pkg, trigger=trigger_id)
+                changes.append(package_change(pkg, updated_pkg))
                 updated_packages.append(updated_pkg)
             else:
                 updated_packages.append(pkg)
         
-        return updated_packages
+        return updated_packages, push_history(history, 'update_position_from_sliders', changes, f'{trigger_id}:{selected_id}')
     
     @app.callback(
-        Output('packages-store', 'data', allow_duplicate=True),
+        [Output('packages-store', 'data', allow_duplicate=True),
+         Output('history-store', 'data', allow_duplicate=True)],
         [Input('input-width', 'value'),
         Input('input-depth', 'value'),
         Input('input-height', 'value'),
         Input('input-stackable', 'value')],
         [State('selected-package-id', 'data'),
         State('packages-store', 'data'),
-        State('truck-dimensions', 'data')],  # ADD THIS
+        State('truck-dimensions', 'data'),
+        State('order-id', 'data'),
+        State('history-store', 'data')],
         prevent_initial_call=True
     )
-    def update_package_properties(width, depth, height, stackable, selected_id, packages, truck_dims):
+    def update_package_properties(width, depth, height, stackable, selected_id, packages, truck_dims, order_id, history):
         """Update package dimensions, and stackable property"""
+        changes = []
         if not packages or not selected_id:
             raise PreventUpdate
         
@@ -375,10 +500,12 @@ def register_callbacks(app):
                     updated_pkg = {**pkg}
                     updated_pkg['stackable'] = 'stackable' in (stackable or [])
                     print(f"📦 Updated stackable: {updated_pkg['stackable']}")
+                    log_package_change('update_package_properties', order_id, pkg, updated_pkg, trigger=trigger_id)
+                    changes.append(package_change(pkg, updated_pkg))
                     updated_packages.append(updated_pkg)
                 else:
                     updated_packages.append(pkg)
-            return updated_packages
+            return updated_packages, push_history(history, 'update_package_properties', changes)
         
         # Get current package to check if value actually changed
         current_pkg = next((pkg for pkg in packages if pkg['id'] == selected_id), None)
@@ -436,9 +563,194 @@ def register_callbacks(app):
                 updated_pkg['x'] = min(updated_pkg['x'], truck_length - actual_width)
                 updated_pkg['y'] = min(updated_pkg['y'], truck_width - actual_height)
                 updated_pkg['z'] = min(updated_pkg['z'], truck_height - updated_pkg['depth'])
-                
+
+                log_package_change('update_package_properties', order_id, pkg, updated_pkg, trigger=trigger_id)
+                changes.append(package_change(pkg, updated_pkg))
                 updated_packages.append(updated_pkg)
             else:
                 updated_packages.append(pkg)
         
-        return updated_packages
+        return updated_packages, push_history(history, 'update_package_properties', changes, f'{trigger_id}:{selected_id}')
+
+    @background_callback(
+        app,
+        [Output('packages-store', 'data', allow_duplicate=True),
+         Output('history-store', 'data', allow_duplicate=True),
+         Output('placement-result', 'children')],
+        [Input('auto-place-btn', 'n_clicks')],
+        [State('packages-store', 'data'),
+         State('truck-dimensions', 'data'),
+         State('customer-id', 'data'),
+         State('order-id', 'data'),
+         State('history-store', 'data')],
+        running=[(Output('auto-place-btn', 'disabled'), True, False)],
+        prevent_initial_call=True
+    )
+    def auto_place_packages(n_clicks, packages, truck_dims, customer, order_id, history):
+        """
+        Place all packages: exact search for small orders, heuristics otherwise (keeping the load rules)
+
+        Runs as a background job, as the exact search may use its whole time
+        limit. Not cached: the search is time-limited and every run is logged.
+        """
+        if not n_clicks or not packages:
+            raise PreventUpdate
+
+        truck_dims = truck_dims or {'length': TRUCK_LENGTH, 'width': TRUCK_WIDTH, 'height': TRUCK_HEIGHT}
+        placed, unplaced, info = place_packages(packages, truck_dims, rules=resolve_rules(customer))
+        for pkg in unplaced:
+            pkg.update(x=truck_dims['length'], y=0.0, z=0.0)  # left on the dock behind the door
+        by_id = {pkg['id']: pkg for pkg in placed + unplaced}
+
+        changes = []
+        updated_packages = []
+        for pkg in packages:
+            new_pkg = {**pkg, **{key: by_id[pkg['id']][key] for key in ('x', 'y', 'z', 'rotation')},
+                       'load_seq': by_id[pkg['id']].get('load_seq')}
+            log_package_change('auto_place', order_id, pkg, new_pkg, method=info['method'], status=info['status'])
+            changes.append(package_change(pkg, new_pkg))
+            updated_packages.append(new_pkg)
+
+        messages = {
+            'optimal': '✅ Shortest possible loading length: {length} m',
+            'timeout': '⏱️ Best found in time: {length} m (lower bound {lower_bound} m)',
+            'infeasible': '❌ The order cannot fit this truck',
+            'too_large': '🧩 Large order - placed with the quick heuristic',
+            'stops': '🚚 Packages have stops - placed in delivery order',
+        }
+        if info['status'] == 'timeout' and info['length'] is None:
+            message = '⏱️ No full plan found in time - placed with the quick heuristic'
+        else:
+            message = messages[info['status']].format(**info)
+        if unplaced:
+            message += f' - {len(unplaced)} packages left on the dock'
+        print(f"🧩 Auto-placed {len(placed)} packages ({info['method']}, {info['status']}"
+              + (f", {info['nodes']} nodes in {info['ms']}ms)" if 'nodes' in info else ')'))
+        flush_event_log()  # the job process may exit before the flush thread runs
+        return updated_packages, push_history(history, 'auto_place', changes), html.Div(message)
+
+    @app.callback(
+        [Output('packages-store', 'data', allow_duplicate=True),
+         Output('history-store', 'data', allow_duplicate=True),
+         Output('placement-result', 'children', allow_duplicate=True)],
+        [Input('palletize-btn', 'n_clicks')],
+        [State('packages-store', 'data'),
+         State('truck-dimensions', 'data'),
+         State('customer-id', 'data'),
+         State('order-id', 'data'),
+         State('history-store', 'data')],
+        prevent_initial_call=True
+    )
+    def palletize(n_clicks, packages, truck_dims, customer, order_id, history):
+        """
+        Stack the loose cartons onto pallets, each moved and placed as one package
+
+        New pallets are parked on the dock behind the door (their position is
+        part of the history entry, so undo/redo restore it); auto-place loads
+        them. The pallets keep to the customer's load rules.
+        """
+        if not n_clicks or not packages:
+            raise PreventUpdate
+
+        truck_length = (truck_dims or {}).get('length', TRUCK_LENGTH)
+        next_id = max(pkg['id'] for pkg in packages) + 1
+        updated_packages, stats = palletize_packages(packages, next_id, dock_x=truck_length,
+                                                     rules=resolve_rules(customer))
+        if not stats['pallets']:
+            return dash.no_update, dash.no_update, html.Div('🧱 No loose cartons to palletize')
+
+        pallets = updated_packages[len(updated_packages) - stats['pallets']:]
+        pallet_of = {carton['id']: pallet['id'] for pallet in pallets for carton in pallet['contents']}
+        changes = []
+        for index, pkg in enumerate(packages):
+            if pkg['id'] in pallet_of:
+                log_package_change('palletize', order_id, pkg, None, pallet=pallet_of[pkg['id']])
+                changes.append(package_change(pkg, None, index))
+        for index, pallet in enumerate(pallets, len(updated_packages) - len(pallets)):
+            log_package_change('palletize', order_id, None, pallet, cartons=len(pallet['contents']))
+            changes.append(package_change(None, pallet, index))
+
+        print(f"🧱 Palletized {stats['cartons']} cartons onto {stats['pallets']} pallets: "
+              f"{stats['volume_before']:.2f} -> {stats['volume_after']:.2f} m³")
+        message = (f"🧱 {stats['cartons']} cartons stacked onto {stats['pallets']} pallets"
+                   " - parked on the dock, auto-place to load them")
+        return updated_packages, push_history(history, 'palletize', changes), html.Div(message)
+
+    @app.callback(
+        [Output('packages-store', 'data', allow_duplicate=True),
+         Output('history-store', 'data', allow_duplicate=True)],
+        [Input('plan-stops-btn', 'n_clicks')],
+        [State('packages-store', 'data'),
+         State('truck-dimensions', 'data'),
+         State('customer-id', 'data'),
+         State('order-id', 'data'),
+         State('history-store', 'data')],
+        prevent_initial_call=True
+    )
+    def plan_stops(n_clicks, packages, truck_dims, customer, order_id, history):
+        """Place all packages in delivery order, last stop at the front wall (keeping the load rules)"""
+        if not n_clicks or not packages:
+            raise PreventUpdate
+
+        placed, unplaced = plan_loading(packages, truck_dims, resolve_rules(customer))
+        by_id = {pkg['id']: pkg for pkg in placed + unplaced}
+
+        changes = []
+        updated_packages = []
+        for pkg in packages:
+            new_pkg = {**pkg, **{key: by_id[pkg['id']][key] for key in ('x', 'y', 'z', 'rotation', 'load_seq')}}
+            log_package_change('plan_stops', order_id, pkg, new_pkg)
+            changes.append(package_change(pkg, new_pkg))
+            updated_packages.append(new_pkg)
+
+        num_stops = len({pkg['stop'] for pkg in packages if pkg.get('stop') is not None})
+        print(f"🚚 Planned loading order of {len(placed)} packages for {num_stops} stops")
+        if unplaced:
+            print(f"⚠️ {len(unplaced)} packages did not fit in the truck - left on the dock")
+        return updated_packages, push_history(history, 'plan_stops', changes)
+
+    @app.callback(
+        [Output('packages-store', 'data', allow_duplicate=True),
+         Output('history-store', 'data', allow_duplicate=True),
+         Output('truck-3d-graph', 'figure', allow_duplicate=True),
+         Output('render-skip', 'data', allow_duplicate=True)],
+        [Input('undo-btn', 'n_clicks'),
+         Input('redo-btn', 'n_clicks')],
+        [State('history-store', 'data'),
+         State('packages-store', 'data')],
+        prevent_initial_call=True
+    )
+    def undo_redo(undo_clicks, redo_clicks, history, packages):
+        """
+        Undo or redo the last package edit
+
+        Moves, rotations and resizes patch the changed package in the store
+        and its mesh in the figure, so the figure is not rebuilt. Restoring a
+        deleted package (or large compact figures) falls back to a full render.
+        """
+        undo = callback_context.triggered_id == 'undo-btn'
+        source, target = ('undo', 'redo') if undo else ('redo', 'undo')
+        if not history or not history[source]:
+            raise PreventUpdate
+
+        operation = history[source][-1]
+        packages_patch, changed, structural = apply_operation(
+            packages, operation, 'before' if undo else 'after'
+        )
+
+        history_patch = Patch()
+        del history_patch[source][len(history[source]) - 1]
+        history_patch[target].append(operation)
+
+        print(f"{'↶ Undo' if undo else '↷ Redo'} {operation['action']} "
+              f"({len(operation['changes'])} package(s))")
+
+        # Pallets may be drawn carton by carton - leave them to a full render too
+        if structural or len(packages) >= COMPACT_FIGURE_THRESHOLD or any(is_pallet(pkg) for _, pkg in changed):
+            return packages_patch, history_patch, dash.no_update, False
+
+        from visualization.figures import package_mesh_update
+        figure_patch = Patch()
+        for index, pkg in changed:
+            figure_patch['data'][PACKAGE_TRACE_OFFSET + index].update(package_mesh_update(pkg))
+        return packages_patch, history_patch, figure_patch, True
@@ -1,11 +1,73 @@
 """Callbacks for UI updates (summary stats, package list, controls)"""
 
-from dash import Input, Output, State, html, dcc
+import json
+import time
+from dash import Input, Output, State, Patch, ALL, html, dcc
 import dash
 from dash.exceptions import PreventUpdate
-from config import TRUCK_LENGTH, TRUCK_WIDTH, TRUCK_HEIGHT, MOVE_STEP, DEFAULT_CAMERA
+from config import (TRUCK_LENGTH, TRUCK_WIDTH, TRUCK_HEIGHT, MOVE_STEP, COMPACT_FIGURE_THRESHOLD,
+                    TRUCK_PROFILES, FLEET_MAX_TRUCKS, CAMERA_PRESETS, MAX_REPORTED_VIOLATIONS)
 from utils.geometry import rotate_dimensions, calculate_totals
-from visualization.figures import create_figure
+from utils.sequencing import has_stops, find_blocked, on_dock
+from utils.constraints import check_load, resolve_rules
+from utils.truck_fit import find_smallest_truck
+from utils.fleet import split_over_trucks
+from utils.bounds import lower_bounds, optimality_gap
+from utils.nesting import nested_count
+from utils.background import background_callback
+from utils.pallets import is_pallet, carton_count, detail_ids
+from callbacks.package_callbacks import PACKAGE_TRACE_OFFSET
+
+# Runs in the browser: remember the camera after the user orbits the view
+STORE_CAMERA_JS = """
+function(relayoutData) {
+    if (relayoutData && relayoutData['scene.camera']) {
+        return relayoutData['scene.camera'];
+    }
+    return window.dash_clientside.no_update;
+}
+"""
+
+# Runs in the browser: name of the hovered package in a compact figure, looked up by the
+# package id in its customdata (see visualization.figures.COMPACT_HOVERTEMPLATE)
+HOVER_PACKAGE_JS = """
+function(hoverData, packages) {
+    const point = hoverData && hoverData.points && hoverData.points[0];
+    const data = point && point.customdata;
+    if (!data || data.length < 5) {
+        return '';
+    }
+    const id = data[3];
+    for (const pkg of packages || []) {
+        if (pkg.id === id) {
+            return `📦 ${pkg.name} (#${id}, ${data[4]}°)`;
+        }
+        for (const inner of (pkg.contents || []).concat(pkg.nested || [])) {
+            if (inner.id === id) {
+                return `📦 ${inner.name} (#${id}) in ${pkg.name}`;
+            }
+        }
+    }
+    return `📦 Package #${id}`;
+}
+"""
+
+# Runs in the browser: move the 3D view to a named camera preset
+CAMERA_PRESET_JS = """
+function(nClicks) {
+    const presets = __PRESETS__;
+    const triggered = window.dash_clientside.callback_context.triggered;
+    if (!triggered.length || !triggered[0].value) {
+        return window.dash_clientside.no_update;
+    }
+    const camera = presets[JSON.parse(triggered[0].prop_id.split('.')[0]).name];
+    const graph = document.querySelector('#truck-3d-graph .js-plotly-plot');
+    if (graph) {
+        Plotly.relayout(graph, {'scene.camera': camera});
+    }
+    return camera;
+}
+""".replace('__PRESETS__', json.dumps({name: preset['camera'] for name, preset in CAMERA_PRESETS.items()}))
 
 
 def register_callbacks(app):
@@ -13,36 +75,130 @@ def register_callbacks(app):
     
     @app.callback(
         Output('summary-stats', 'children'),
-        [Input('packages-store', 'data')]
+        [Input('packages-store', 'data'),
+         Input('truck-dimensions', 'data')]
     )
-    def update_summary(packages):
-        """Update summary statistics"""
+    def update_summary(packages, truck_dims):
+        """Update summary statistics, with lower bounds on loading length and trucks"""
         if not packages:
             return html.Div('No packages loaded', style={'color': '#94a3b8'})
         
+        truck_dims = truck_dims or {'length': TRUCK_LENGTH, 'width': TRUCK_WIDTH, 'height': TRUCK_HEIGHT}
         total_volume = calculate_totals(packages)
-        truck_volume = TRUCK_LENGTH * TRUCK_WIDTH * TRUCK_HEIGHT
+        truck_volume = truck_dims['length'] * truck_dims['width'] * truck_dims['height']
         utilization = (total_volume / truck_volume) * 100
+
+        nested = nested_count(packages)
+        cartons = carton_count(packages)
+        pallets = sum(1 for pkg in packages if is_pallet(pkg))
+        bounds = lower_bounds(packages, truck_dims)
+        loaded = [pkg for pkg in packages if not on_dock(pkg, truck_dims['length'])]
+        used_length = max((pkg['x'] + rotate_dimensions(pkg['width'], pkg['height'], pkg.get('rotation', 0))[0]
+                           for pkg in loaded), default=0.0)
+        if len(loaded) == len(packages) and used_length >= bounds['min_length']:
+            gap = f" (≤ {optimality_gap(used_length, bounds['min_length']) * 100:.0f}% above optimum)"
+        else:
+            gap = ''
+        trucks_style = {'marginBottom': '5px', 'color': '#f59e0b'} if bounds['min_trucks'] > 1 else {'marginBottom': '5px'}
         
         return html.Div([
             html.Div(f'📦 Total Packages: {len(packages)}', style={'marginBottom': '5px'}),
             html.Div(f'📐 Total Volume: {total_volume:.2f} m³', style={'marginBottom': '5px'}),
-            html.Div(f'📊 Utilization: {utilization:.1f}%', style={'marginBottom': '5px'})
+            html.Div(f'🌀 {nested} ducts nested inside larger ones', style={'marginBottom': '5px'}) if nested else None,
+            html.Div(f'🧱 {cartons} cartons on {pallets} pallets', style={'marginBottom': '5px'}) if cartons else None,
+            html.Div(f'📊 Utilization: {utilization:.1f}%', style={'marginBottom': '5px'}),
+            html.Div(f"📏 Loading length: {used_length:.2f} m, at least {bounds['min_length']:.2f} m{gap}",
+                     style={'marginBottom': '5px'}),
+            html.Div(f"🚛 Trucks needed: at least {bounds['min_trucks']}", style=trucks_style)
+        ])
+    
+    @app.callback(
+        Output('rule-warnings', 'children'),
+        [Input('packages-store', 'data'),
+         Input('truck-dimensions', 'data'),
+         Input('customer-id', 'data')]
+    )
+    def update_rule_warnings(packages, truck_dims, customer):
+        """Check the whole load against the customer's load rules after every edit"""
+        if not packages:
+            return ''
+
+        truck_length = truck_dims.get('length', TRUCK_LENGTH) if truck_dims else TRUCK_LENGTH
+        violations = check_load(packages, resolve_rules(customer), truck_length)
+        if not violations:
+            return html.Div('✅ All load rules kept', style={'color': '#22c55e'})
+
+        items = [html.Div(f"{violation['name']}: {violation['message']}")
+                 for violation in violations[:MAX_REPORTED_VIOLATIONS]]
+        more = len(violations) - MAX_REPORTED_VIOLATIONS
+        return html.Div([
+            html.Div(f'⚠️ {len(violations)} load rule violations', style={'color': '#f59e0b', 'fontWeight': 'bold'}),
+            *items,
+            html.Div(f'… and {more} more') if more > 0 else None
+        ])
+
+    @app.callback(
+        Output('stop-warnings', 'children'),
+        [Input('packages-store', 'data'),
+         Input('truck-dimensions', 'data')]
+    )
+    def update_stop_warnings(packages, truck_dims):
+        """Check after every edit that no package is blocked by one for a later stop"""
+        if not packages or not has_stops(packages):
+            return ''
+
+        truck_length = truck_dims.get('length', TRUCK_LENGTH) if truck_dims else TRUCK_LENGTH
+        blocked = find_blocked(packages, truck_length)
+        num_stops = len({pkg['stop'] for pkg in packages if pkg.get('stop') is not None})
+        docked = sum(1 for pkg in packages if on_dock(pkg, truck_length))
+        dock_note = html.Div(f'📦 {docked} packages did not fit (left on the dock)') if docked else None
+
+        if not blocked:
+            return html.Div([
+                html.Div(f'✅ {num_stops} stops - every package can be unloaded at its stop',
+                         style={'color': '#22c55e'}),
+                dock_note
+            ])
+
+        by_id = {pkg['id']: pkg for pkg in packages}
+        items = []
+        for package_id, blockers in list(blocked.items())[:5]:
+            pkg = by_id[package_id]
+            names = ', '.join(by_id[blocker]['name'] for blocker in blockers[:3])
+            more = f' +{len(blockers) - 3}' if len(blockers) > 3 else ''
+            items.append(html.Div(f"{pkg['name']} (stop {pkg['stop']}) blocked by {names}{more}"))
+        return html.Div([
+            html.Div(f'⚠️ {len(blocked)} packages blocked at unloading', style={'color': '#f59e0b', 'fontWeight': 'bold'}),
+            *items,
+            dock_note
         ])
 
+    @app.callback(
+        [Output('undo-btn', 'disabled'),
+         Output('redo-btn', 'disabled')],
+        [Input('history-store', 'data')]
+    )
+    def update_history_buttons(history):
+        """Enable undo/redo when there is something to undo/redo"""
+        history = history or {}
+        return not history.get('undo'), not history.get('redo')
+
     @app.callback(
         Output('package-list', 'children'),
         [Input('packages-store', 'data'),
-         Input('selected-package-id', 'data')]
+         Input('selected-package-id', 'data'),
+         Input('selected-package-ids', 'data')]
     )
-    def update_package_list(packages, selected_id):
-        """Update the list of packages in the sidebar"""
+    def update_package_list(packages, selected_id, selected_ids):
+        """Update the list of packages in the sidebar (the rest of a multi-selection is outlined)"""
         if not packages:
             return html.Div('No packages', style={'color': '#94a3b8'})
         
+        grouped = set(selected_ids or ())
         package_items = []
         for pkg in packages:
             is_selected = pkg['id'] == selected_id
+            is_grouped = is_selected or pkg['id'] in grouped
             rotation = pkg.get('rotation', 0)
             actual_width, actual_height = rotate_dimensions(
                 pkg['width'], pkg['height'], rotation
@@ -78,7 +234,10 @@ def register_callbacks(app):
                             }
                         ),
                         html.Span(
-                            f"{actual_width} × {actual_height} × {pkg['depth']}m - Rot: {rotation}°",
+                            f"{actual_width} × {actual_height} × {pkg['depth']}m - Rot: {rotation}°"
+                            + (f" - Stop {pkg['stop']}" if pkg.get('stop') is not None else '')
+                            + (f" - 🌀 +{len(pkg['nested'])} nested" if pkg.get('nested') else '')
+                            + (f" - 🧱 {len(pkg['contents'])} cartons" if is_pallet(pkg) else ''),
                             style={'fontSize': '12px', 'color': '#cbd5e1'}
                         )
                     ], style={'marginTop': '5px'})
@@ -90,7 +249,7 @@ def register_callbacks(app):
                     'backgroundColor': '#3b82f6' if is_selected else '#334155',
                     'borderRadius': '5px',
                     'cursor': 'pointer',
-                    'border': '2px solid #3b82f6' if is_selected else '2px solid transparent'
+                    'border': '2px solid #3b82f6' if is_grouped else '2px solid transparent'
                 })
             )
         
@@ -98,29 +257,115 @@ def register_callbacks(app):
 
 
     @app.callback(
-        Output('truck-3d-graph', 'figure'),
+        [Output('truck-3d-graph', 'figure'),
+        Output('render-skip', 'data')],
         [Input('packages-store', 'data'),
-        Input('truck-dimensions', 'data')]
+        Input('truck-dimensions', 'data')],
+        [State('render-skip', 'data'),
+        State('expanded-pallets', 'data'),
+        State('selected-package-id', 'data'),
+        State('camera-store', 'data')]
     )
-    def update_graph(packages, truck_dims):
-        """Update the 3D visualization"""
-        if truck_dims:
-            from visualization.figures import create_figure_custom
-            return create_figure_custom(packages, DEFAULT_CAMERA, truck_dims)
-        else:
-            return create_figure(packages, DEFAULT_CAMERA)
+    def update_graph(packages, truck_dims, render_skip, expanded, selected_id, camera):
+        """
+        Update the 3D visualization
 
-    @app.callback(
+        The figure carries the last camera and a constant uirevision, so the
+        view stays where the user left it.
+        """
+        # Undo/redo already patched the figure for this packages-store change
+        if render_skip and dash.callback_context.triggered_id == 'packages-store':
+            return dash.no_update, False
+
+        return _render_figure(packages, truck_dims, detail_ids(packages or [], expanded, selected_id), camera), False
+
+    # Camera handling stays in the browser: orbiting and presets send no requests
+    app.clientside_callback(
+        STORE_CAMERA_JS,
         Output('camera-store', 'data'),
         [Input('truck-3d-graph', 'relayoutData')],
-        [State('camera-store', 'data')]
+        prevent_initial_call=True
     )
-    def store_camera(relayout_data, current_camera):
-        """Store camera position when user moves it"""
-        if relayout_data and 'scene.camera' in relayout_data:
-            return relayout_data['scene.camera']
-        return current_camera
-    
+
+    app.clientside_callback(
+        HOVER_PACKAGE_JS,
+        Output('hover-package-info', 'children'),
+        [Input('truck-3d-graph', 'hoverData')],
+        [State('packages-store', 'data')],
+        prevent_initial_call=True
+    )
+
+    app.clientside_callback(
+        CAMERA_PRESET_JS,
+        Output('camera-store', 'data', allow_duplicate=True),
+        [Input({'type': 'camera-preset', 'name': ALL}, 'n_clicks')],
+        prevent_initial_call=True
+    )
+
+    @app.callback(
+        [Output('truck-3d-graph', 'figure', allow_duplicate=True),
+         Output('selected-pallet', 'data')],
+        [Input('selected-package-id', 'data')],
+        [State('packages-store', 'data'),
+         State('expanded-pallets', 'data'),
+         State('selected-pallet', 'data'),
+         State('truck-dimensions', 'data'),
+         State('camera-store', 'data')],
+        prevent_initial_call=True
+    )
+    def show_selected_pallet(selected_id, packages, expanded, shown_id, truck_dims, camera):
+        """
+        Draw the selected pallet carton by carton, and the previously
+        selected one as one box again (unless it is expanded)
+
+        Only the two pallet traces are patched; compact figures, which batch
+        packages by color, are rendered again.
+        """
+        packages = packages or []
+        index_of = {pkg['id']: index for index, pkg in enumerate(packages)}
+        pallet_id = selected_id if selected_id in index_of and is_pallet(packages[index_of[selected_id]]) else None
+        if pallet_id == shown_id:
+            raise PreventUpdate
+
+        detailed = detail_ids(packages, expanded, selected_id)
+        if len(packages) >= COMPACT_FIGURE_THRESHOLD:
+            return _render_figure(packages, truck_dims, detailed, camera), pallet_id
+
+        from visualization.figures import package_trace
+        figure_patch = Patch()
+        for changed_id in (shown_id, pallet_id):
+            if changed_id in index_of and is_pallet(packages[index_of[changed_id]]):
+                index = index_of[changed_id]
+                trace = package_trace(packages[index], changed_id in detailed)
+                figure_patch['data'][PACKAGE_TRACE_OFFSET + index] = trace.to_plotly_json()
+        return figure_patch, pallet_id
+
+    @app.callback(
+        Output('expanded-pallets', 'data'),
+        [Input('expand-pallet-btn', 'n_clicks')],
+        [State('selected-package-id', 'data'),
+         State('packages-store', 'data'),
+         State('expanded-pallets', 'data')],
+        prevent_initial_call=True
+    )
+    def toggle_pallet_cartons(n_clicks, selected_id, packages, expanded):
+        """
+        Keep the selected pallet's cartons drawn after it is deselected, or stop
+
+        The selected pallet is drawn in detail already, so the figure only
+        changes when the selection moves on (show_selected_pallet).
+        """
+        selected = next((pkg for pkg in packages or [] if pkg['id'] == selected_id), None)
+        if not n_clicks or not selected or not is_pallet(selected):
+            raise PreventUpdate
+
+        expanded = expanded or []
+        if selected_id in expanded:
+            print(f"📁 Collapsed {selected['name']}")
+            return [pallet_id for pallet_id in expanded if pallet_id != selected_id]
+        print(f"📂 Expanded {selected['name']} ({len(selected['contents'])} cartons)")
+        return expanded + [selected_id]
+
     @app.callback(
     [Output('selected-package-name', 'children'),
      Output('slider-x', 'disabled'),
@@ -255,22 +500,17 @@ def register_callbacks(app):
                 'height': TRUCK_HEIGHT
             }
         
-        # Update individual dimension
+        # Update the changed dimensions (a profile change sets all three at once)
         new_dims = {**current_dims}
-        
-        if trigger_id == 'input-truck-length' and length and length >= 1:
-            if abs(new_dims['length'] - length) > 0.01:  # Only if changed
-                new_dims['length'] = length
-                print(f"📏 Updated truck length: {length}m")
-        elif trigger_id == 'input-truck-width' and width and width >= 1:
-            if abs(new_dims['width'] - width) > 0.01:
-                new_dims['width'] = width
-                print(f"📏 Updated truck width: {width}m")
-        elif trigger_id == 'input-truck-height' and height and height >= 1:
-            if abs(new_dims['height'] - height) > 0.01:
-                new_dims['height'] = height
-                print(f"📏 Updated truck height: {height}m")
-        else:
+        values = {'length': length, 'width': width, 'height': height}
+        for trigger in ctx.triggered:
+            dimension = trigger['prop_id'].split('.')[0].replace('input-truck-', '')
+            value = values.get(dimension)
+            if value and value >= 1 and abs(new_dims[dimension] - value) > 0.01:  # Only if changed
+                new_dims[dimension] = value
+                print(f"📏 Updated truck {dimension}: {value}m")
+
+        if new_dims == current_dims:
             raise PreventUpdate
         
         return new_dims
@@ -278,14 +518,131 @@ def register_callbacks(app):
     @app.callback(
     [Output('input-truck-length', 'value'),
      Output('input-truck-width', 'value'),
-     Output('input-truck-height', 'value')],
+     Output('input-truck-height', 'value'),
+     Output('truck-profile', 'value', allow_duplicate=True)],
     [Input('reset-truck-btn', 'n_clicks')],
     prevent_initial_call=True
     )
     def reset_truck_inputs(n_clicks):
         """Reset truck dimension inputs to default"""
-        from config import TRUCK_LENGTH, TRUCK_WIDTH, TRUCK_HEIGHT
-        return TRUCK_LENGTH, TRUCK_WIDTH, TRUCK_HEIGHT
+        from config import TRUCK_LENGTH, TRUCK_WIDTH, TRUCK_HEIGHT, DEFAULT_TRUCK_PROFILE
+        return TRUCK_LENGTH, TRUCK_WIDTH, TRUCK_HEIGHT, DEFAULT_TRUCK_PROFILE
+
+    @app.callback(
+    [Output('input-truck-length', 'value', allow_duplicate=True),
+     Output('input-truck-width', 'value', allow_duplicate=True),
+     Output('input-truck-height', 'value', allow_duplicate=True)],
+    [Input('truck-profile', 'value')],
+    prevent_initial_call=True
+    )
+    def apply_truck_profile(profile_name):
+        """Fill the truck dimension inputs from the selected profile"""
+        profile = TRUCK_PROFILES.get(profile_name)
+        if not profile:
+            raise PreventUpdate
+        print(f"🚛 Truck profile: {profile['label']}")
+        return profile['length'], profile['width'], profile['height']
+
+    @background_callback(
+        app,
+        [Output('truck-fit-result', 'children'),
+         Output('truck-profile', 'value')],
+        [Input('truck-fit-btn', 'n_clicks')],
+        [State('packages-store', 'data'),
+         State('truck-profile', 'value'),
+         State('customer-id', 'data')],
+        running=[(Output('truck-fit-btn', 'disabled'), True, False)],
+        cached=True,
+        cache_args_to_ignore=[0],  # n_clicks - the same order gives the same answer
+        prevent_initial_call=True
+    )
+    def find_truck(n_clicks, packages, current_profile, customer):
+        """
+        Check the order against every truck profile and select the cheapest that fits
+
+        Runs as a cached background job - placing a large order in every
+        profile takes seconds, and asking again for the same order is free.
+        The customer's load rules apply, and are part of the cache key.
+        """
+        if not packages:
+            return html.Div('No packages to load', style={'color': '#94a3b8'}), dash.no_update
+
+        start = time.perf_counter()
+        best, results = find_smallest_truck(packages, rules=resolve_rules(customer))
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        print(f"🔍 Checked {len(results)} truck profiles for {len(packages)} packages in {elapsed_ms:.0f}ms"
+              f" - best: {best}")
+
+        rows = []
+        for name, result in sorted(results.items(), key=lambda item: TRUCK_PROFILES[item[0]]['cost']):
+            if result['fits']:
+                status = f"✅ {result['utilization']:.0f}% full, {result['ldm']:.1f} LDM"
+            else:
+                status = f"❌ {result['reason']}"
+            rows.append(html.Div(
+                f"{TRUCK_PROFILES[name]['label']}: {status}",
+                style={'fontWeight': 'bold', 'color': '#22c55e'} if name == best else {'color': '#94a3b8'}
+            ))
+
+        if best is None:
+            header = html.Div('⚠️ No truck profile fits the whole order', style={'color': '#f59e0b'})
+            return html.Div([header, *rows]), dash.no_update
+        header = html.Div(f"🚛 Cheapest fit: {TRUCK_PROFILES[best]['label']}", style={'marginBottom': '3px'})
+        return html.Div([header, *rows]), best if best != current_profile else dash.no_update
+
+    @background_callback(
+        app,
+        [Output('fleet-graph', 'figure'),
+         Output('fleet-panel', 'style'),
+         Output('fleet-result', 'children')],
+        [Input('fleet-btn', 'n_clicks')],
+        [State('packages-store', 'data'),
+         State('truck-dimensions', 'data'),
+         State('customer-id', 'data')],
+        running=[(Output('fleet-btn', 'disabled'), True, False)],
+        cached=True,
+        cache_args_to_ignore=[0],  # n_clicks
+        prevent_initial_call=True
+    )
+    def show_fleet(n_clicks, packages, truck_dims, customer):
+        """
+        Split the order over trucks of the current size and show them side by side
+
+        Runs as a cached background job, like find_truck, with the customer's
+        load rules.
+        """
+        if not packages:
+            return dash.no_update, dash.no_update, html.Div('No packages to load', style={'color': '#94a3b8'})
+
+        from visualization.fleet import create_fleet_figure
+
+        start = time.perf_counter()
+        plans, left_over = split_over_trucks(packages, truck_dims, rules=resolve_rules(customer))
+        if not plans:
+            print(f"🚛 Fleet view: none of {len(packages)} packages fit a truck")
+            return dash.no_update, dash.no_update, html.Div(
+                f'⚠️ {len(left_over)} packages fit none of the trucks', style={'color': '#f59e0b'})
+        figure = create_fleet_figure(plans)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        print(f"🚛 Fleet view: {len(packages)} packages over {len(plans)} trucks in {elapsed_ms:.0f}ms"
+              + (f" - {len(left_over)} left over" if left_over else ''))
+
+        rows = [html.Div(f"🚛 {len(plans)} trucks: "
+                         + ', '.join(f"{plan['metrics']['volume_utilization']:.0f}%" for plan in plans))]
+        if left_over:
+            reason = (f'left over after {FLEET_MAX_TRUCKS} trucks' if len(plans) >= FLEET_MAX_TRUCKS
+                      else 'fit none of the trucks')
+            rows.append(html.Div(f'⚠️ {len(left_over)} packages {reason}', style={'color': '#f59e0b'}))
+        return figure, {'display': 'block'}, html.Div(rows)
+
+    @app.callback(
+    Output('fleet-panel', 'style', allow_duplicate=True),
+    [Input('fleet-close-btn', 'n_clicks')],
+    prevent_initial_call=True
+    )
+    def close_fleet(n_clicks):
+        """Hide the fleet view"""
+        return {'display': 'none'}
 
     @app.callback(
     Output('input-stackable', 'value'),
@@ -367,6 +724,17 @@ def _create_position_control(axis, label, value, max_value):
     ], style={'marginBottom': '20px'})
 
 
+def _render_figure(packages, truck_dims, detailed, camera=None):
+    """Full render of the 3D figure, compact for large orders (camera None = DEFAULT_CAMERA)"""
+    # Imported on first render so plotly/numpy stay off the startup path
+    from visualization.figures import create_figure, create_figure_custom
+
+    compact = len(packages or []) >= COMPACT_FIGURE_THRESHOLD
+    if truck_dims:
+        return create_figure_custom(packages, camera, truck_dims, compact=compact, detailed=detailed)
+    return create_figure(packages, camera, compact=compact, detailed=detailed)
+
+
 def _button_style(bg_color, margin_right):
     """Helper to create consistent button styles"""
     return {
@@ -2,23 +2,50 @@
 
 from dash import Input, Output, State, html, callback_context
 from urllib.parse import urlparse, parse_qs, unquote
-import numpy as np
+from config import PACKAGE_TYPE_COLORS, DEFAULT_PACKAGE_COLOR, NEST_DUCTS
+from utils.order_source import get_order_source
+from utils.parse_cache import get_parse_cache
+from utils.history import EMPTY_HISTORY
+from utils.nesting import nest_packages
+
+# Bump when parse output changes so cached results from older versions are ignored
+PARSER_VERSION = 3
+
+MAX_REPORTED_MALFORMED_ROWS = 20
+
+# Payloads with at least this many rows go through the vectorized bulk parser
+BULK_PARSE_THRESHOLD = 200
+
 
 def parse_powerbi_packages(package_string):
     """
     Parse package data from Power BI URL parameter
-    Format: Name~Width~Length~Height~Stackable|Name~...
+    Format: Name~Width~Length~Height~Stackable[~Stop]|Name~...
+
+    Stop is the optional delivery stop number (1 = first drop).
+    """
+    packages, _ = parse_powerbi_packages_with_stats(package_string)
+    return packages
+
+
+def parse_powerbi_packages_with_stats(package_string):
+    """
+    Parse package data and report malformed rows
+
+    Returns:
+        tuple: (packages, stats) where stats has 'rows', 'parsed', 'malformed'
+               and up to MAX_REPORTED_MALFORMED_ROWS 'malformed_rows'
     """
+    stats = {'rows': 0, 'parsed': 0, 'malformed': 0, 'malformed_rows': []}
     if not package_string:
-        return []
+        return [], stats
+
+    if package_string.count('|') + 1 >= BULK_PARSE_THRESHOLD:
+        return parse_powerbi_packages_bulk(package_string)
     
     packages = []
-    package_type_colors = {
-        'EMBV1': 'rgb(59, 130, 246)',   # Blue
-        'EMBV2': 'rgb(234, 88, 12)',    # Orange
-    }
-    
-    default_color = 'rgb(156, 163, 175)'
+    package_type_colors = PACKAGE_TYPE_COLORS
+    default_color = DEFAULT_PACKAGE_COLOR
 
     package_parts = package_string.split('|')
     
@@ -26,15 +53,19 @@ def parse_powerbi_packages(package_string):
         # Skip empty strings (from double separators)
         if not pkg_str or not pkg_str.strip():
             continue
+
+        stats['rows'] += 1
             
         try:
             parts = pkg_str.split('~')
             
-            if len(parts) != 5:
-                print(f"⚠️ Invalid package format (expected 5, got {len(parts)}): {pkg_str}")
+            if len(parts) not in (5, 6):
+                print(f"⚠️ Invalid package format (expected 5 or 6, got {len(parts)}): {pkg_str}")
+                _record_malformed(stats, pkg_str)
                 continue
             
-            name, width, length, height, stackable = parts
+            name, width, length, height, stackable = parts[:5]
+            stop = parts[5].strip() if len(parts) == 6 else ''
             package_type = name.split()[0] if name else "Unknown"
             color = package_type_colors.get(package_type, default_color)
             # Convert comma to dot for European decimal format
@@ -55,15 +86,70 @@ def parse_powerbi_packages(package_string):
                 'color': color,
                 'stackable': stackable.strip() in ['1', 'True', 'true', 'TRUE']
             }
+            if stop:
+                package['stop'] = int(stop)  # Delivery stop (optional 6th field)
             
             packages.append(package)
             
         except ValueError as e:
             print(f"❌ Error parsing package: {pkg_str} - {e}")
+            _record_malformed(stats, pkg_str)
             continue
     
+    stats['parsed'] = len(packages)
     print(f"✅ Loaded {len(packages)} packages from Power BI")
-    return packages
+    return packages, stats
+
+
+def parse_powerbi_packages_bulk(package_string):
+    """
+    Parse a large payload with the vectorized bulk parser
+
+    Same output and stats as the row-by-row path in
+    parse_powerbi_packages_with_stats, without per-row work in Python.
+    """
+    from utils.bulk_parser import parse_packages_bulk, table_to_packages  # numpy - keep it off the startup path
+
+    table, rejected = parse_packages_bulk(package_string, PACKAGE_TYPE_COLORS, DEFAULT_PACKAGE_COLOR)
+    packages = table_to_packages(table)
+
+    stats = {
+        'rows': len(packages) + len(rejected),
+        'parsed': len(packages),
+        'malformed': len(rejected),
+        'malformed_rows': [error['raw'] for error in rejected[:MAX_REPORTED_MALFORMED_ROWS]]
+    }
+    if rejected:
+        print(f"⚠️ Skipped {len(rejected)} malformed package rows (first: row {rejected[0]['row']}, "
+              f"{rejected[0]['reason']})")
+    print(f"✅ Loaded {len(packages)} packages from Power BI (bulk parser)")
+    return packages, stats
+
+
+def _record_malformed(stats, pkg_str):
+    """Count a rejected row and keep a sample of it for the report"""
+    stats['malformed'] += 1
+    if len(stats['malformed_rows']) < MAX_REPORTED_MALFORMED_ROWS:
+        stats['malformed_rows'].append(pkg_str[:200])
+
+
+def cached_parse_packages(package_string):
+    """
+    Parse a package string through the shared parse cache
+
+    Re-opening the same order (in any worker) skips parsing entirely.
+
+    Returns:
+        tuple: (packages, stats) - packages are fresh dicts safe to modify
+    """
+    def compute(raw):
+        packages, stats = parse_powerbi_packages_with_stats(raw)
+        return {'packages': packages, 'stats': stats}
+
+    result, hit = get_parse_cache().get_or_compute(package_string, compute, PARSER_VERSION)
+    if hit:
+        print(f"⚡ Parse cache hit: {result['stats']['parsed']} packages")
+    return [dict(pkg) for pkg in result['packages']], result['stats']
 
 def register_callbacks(app):
     """Register URL parameter handling callbacks"""
@@ -77,12 +163,22 @@ def register_callbacks(app):
         parsed = urlparse(href)
         params = parse_qs(parsed.query)
         order_number = params.get('order', [None])[0]
+        package_data = params.get('packages', [None])[0]
         
         if order_number:
+            # Shares the parse cache with load_packages_from_order_data, so
+            # whichever callback runs second gets the stats for free
+            details = ''
+            if package_data:
+                _, stats = cached_parse_packages(unquote(package_data))
+                details = f"{stats['parsed']} packages"
+                if stats['malformed']:
+                    details += f" · {stats['malformed']} malformed rows skipped"
+
             return html.Div([
                 html.Span(f'{order_number}', style={'color': '#3b82f6', 'fontWeight': 'bold'}),
                 html.Span(
-                    f'', 
+                    details, 
                     style={'color': '#94a3b8', 'fontSize': '12px', 'marginLeft': '5px'}
                 )
             ])
@@ -91,9 +187,20 @@ def register_callbacks(app):
             html.Span('No order selected', style={'color': '#94a3b8'})
         ])
     
+    @app.callback(
+        Output('customer-id', 'data'),
+        [Input('url', 'href')]
+    )
+    def load_customer(href):
+        """Customer from the ?customer= URL parameter (selects the load rules, see utils/constraints.py)"""
+        params = parse_qs(urlparse(href).query) if href else {}
+        return params.get('customer', [None])[0]
+
     @app.callback(
         [Output('packages-store', 'data', allow_duplicate=True),
-        Output('package-counter', 'data', allow_duplicate=True)],
+        Output('package-counter', 'data', allow_duplicate=True),
+        Output('order-id', 'data'),
+        Output('history-store', 'data', allow_duplicate=True)],
         [Input('url', 'href')],
         prevent_initial_call=True
     )
@@ -101,7 +208,7 @@ def register_callbacks(app):
         """Load packages from order data based on URL parameter from Power BI"""   
         if not href:
             from config import INITIAL_PACKAGES
-            return INITIAL_PACKAGES, len(INITIAL_PACKAGES)
+            return INITIAL_PACKAGES, len(INITIAL_PACKAGES), None, EMPTY_HISTORY
         
         parsed = urlparse(href)
         params = parse_qs(parsed.query)
@@ -119,57 +226,70 @@ def register_callbacks(app):
         
         # Try to parse Power BI package data first
         if package_data:
-            packages = parse_powerbi_packages(unquote(package_data))
+            packages, _ = cached_parse_packages(unquote(package_data))
             
             if packages:
                 print(f"✅ Parsed {len(packages)} packages from Power BI:")
                 for pkg in packages:
                     print(f"   📦 {pkg['name']}: {pkg['width']}x{pkg['depth']}x{pkg['height']}m")
                 print()
-                return packages, len(packages)
+                # The counter keeps counting nested ducts so package ids stay unique
+                return nest_ducts(packages), len(packages), order_number, EMPTY_HISTORY
         
+        # Look up the order in the local order database
+        if order_number:
+            source = get_order_source()
+            stored_packages = source.get_packages(order_number) if source else None
+            packages = cached_parse_packages(stored_packages)[0] if stored_packages else []
+
+            if packages:
+                print(f"🗄️ Loaded {len(packages)} packages for order {order_number} from order database")
+                # The counter keeps counting nested ducts so package ids stay unique
+                return nest_ducts(packages), len(packages), order_number, EMPTY_HISTORY
+
         # Fallback to demo packages if only order number provided
         if order_number:
             print(f"⚠️ No package data in URL, using demo packages for order {order_number}")
             packages = create_demo_packages_for_order(order_number)
-            return packages, len(packages)
+            return packages, len(packages), order_number, EMPTY_HISTORY
         
         # No order in URL
         from config import INITIAL_PACKAGES
-        return INITIAL_PACKAGES, len(INITIAL_PACKAGES)
+        return INITIAL_PACKAGES, len(INITIAL_PACKAGES), None, EMPTY_HISTORY
+
+
+def nest_ducts(packages):
+    """Nest round ducts of a loaded order inside each other (if NEST_DUCTS is on)"""
+    if not NEST_DUCTS:
+        return packages
+    packages, stats = nest_packages(packages)
+    if stats['nested']:
+        print(f"🌀 Nested {stats['nested']} of {stats['ducts']} ducts in {stats['bundles']} bundles: "
+              f"{stats['volume_before']:.2f} -> {stats['volume_after']:.2f} m³")
+    return packages
 
 
 def create_demo_packages_for_order(order_number):
     """
     Create demo packages based on order number (for POC testing)
+
+    Seeded by the order number, so an order shows the same packages on
+    every reload.
     """
+    from utils.workload import generate_packages
+
     # Create 2-5 packages based on order number (for demo variety)
     try:
         num_packages = (int(order_number) % 4) + 2  # 2-5 packages
-    except:
+    except ValueError:
         num_packages = 3
-    
-    packages = []
-    colors = [
-        'rgb(59, 130, 246)',   # Blue
-        'rgb(234, 88, 12)',    # Orange
-        'rgb(34, 197, 94)',    # Green
-        'rgb(168, 85, 247)',   # Purple
-        'rgb(236, 72, 153)'    # Pink
-    ]
-    
-    for i in range(num_packages):
-        packages.append({
-            'id': i + 1,
-            'name': f'PKG-{order_number}-{i + 1}',
-            'x': i * 3.5,  # Space them out along X axis
-            'y': 0.0,
-            'z': 0.0,
-            'width': np.random.uniform(2.5, 3.5),
-            'height': np.random.uniform(0.8, 1.2),
-            'depth': np.random.uniform(0.8, 1.2),
-            'color': colors[i % len(colors)],
-            'rotation': 0
-        })
-    
-    return packages
\ No newline at end of file
+
+    packages = generate_packages(num_packages, seed=str(order_number), mix='pallets')
+
+    # Space them out along X axis
+    x = 0.0
+    for pkg in packages:
+        pkg['x'] = x
+        x += pkg['width'] + 0.5
+
+    return packages
@@ -17,8 +17,170 @@ INITIAL_PACKAGES = [
     }
 ]
 
+# Package colors by type (first word of the package name)
+PACKAGE_TYPE_COLORS = {
+    'EMBV1': 'rgb(59, 130, 246)',   # Blue
+    'EMBV2': 'rgb(234, 88, 12)',    # Orange
+}
+DEFAULT_PACKAGE_COLOR = 'rgb(156, 163, 175)'
+
 DEFAULT_CAMERA = {
         'eye': {'x': 4.46, 'y': 4.51, 'z': 1.87},
         'center': {'x': 0.00, 'y': 0.00, 'z': 0.00},
         'up': {'x': 0.00, 'y': 0.00, 'z': 1.00}
-}
\ No newline at end of file
+}
+
+# Named views for the camera buttons above the 3D view (x = truck length, door at the far end)
+CAMERA_PRESETS = {
+    '3d': {'label': '🎥 3D', 'camera': DEFAULT_CAMERA},
+    'top': {'label': '⬇️ Top', 'camera': {
+        'eye': {'x': 0.00, 'y': 0.00, 'z': 4.50},
+        'center': {'x': 0.00, 'y': 0.00, 'z': 0.00},
+        'up': {'x': 0.00, 'y': 1.00, 'z': 0.00}
+    }},
+    'side': {'label': '➡️ Side', 'camera': {
+        'eye': {'x': 0.00, 'y': -4.50, 'z': 0.60},
+        'center': {'x': 0.00, 'y': 0.00, 'z': 0.00},
+        'up': {'x': 0.00, 'y': 0.00, 'z': 1.00}
+    }},
+    'rear': {'label': '🚪 Rear door', 'camera': {
+        'eye': {'x': 3.50, 'y': 0.00, 'z': 0.60},
+        'center': {'x': 0.00, 'y': 0.00, 'z': 0.00},
+        'up': {'x': 0.00, 'y': 0.00, 'z': 1.00}
+    }},
+}
+
+# Response compression for callback and layout payloads (see utils/compression.py)
+COMPRESSION_ENABLED = True
+COMPRESSION_MIN_SIZE = 1024  # bytes - smaller responses are sent uncompressed
+COMPRESSION_LEVEL = 6  # gzip level 1-9
+BROTLI_QUALITY = 5  # brotli quality 0-11, only used if the brotli package is installed
+COMPRESSION_PATHS = (
+    '/_dash-update-component',
+    '/_dash-layout',
+    '/_dash-dependencies',
+)
+
+# Figures with at least this many packages use the compact typed-array encoding
+COMPACT_FIGURE_THRESHOLD = 200
+
+# Cold start budgets checked by scripts/bench_startup.py
+STARTUP_IMPORT_BUDGET_MS = 1500  # import app.py
+FIRST_RESPONSE_BUDGET_MS = 1000  # index + layout + first update_graph render
+
+# Order data source used when the URL has ?order= but no packages (see utils/order_source.py)
+ORDER_SOURCE = 'sqlite'  # 'sqlite', 'tm' or None to always use demo packages
+ORDER_DB_PATH = 'data/orders.db'
+ORDER_DB_POOL_SIZE = 4
+ORDER_SOURCE_RETRY = 30  # seconds before opening an unavailable order source again
+
+# TM HTTP order source (ORDER_SOURCE = 'tm', see utils/order_fetch.py)
+TM_BASE_URL = 'http://localhost:8060'
+TM_POOL_SIZE = 20  # keep-alive connections shared by all fetches
+TM_MAX_CONCURRENCY = 50  # in-flight requests
+TM_TIMEOUT = 5.0  # seconds per attempt
+TM_RETRIES = 2
+TM_BACKOFF = 0.2  # seconds, doubled per retry
+
+# Parse cache for package strings (see utils/parse_cache.py)
+PARSE_CACHE_SIZE = 256  # entries kept in memory per worker
+PARSE_CACHE_TTL = 3600  # seconds
+PARSE_CACHE_DIR = 'cache/parse'  # shared by all workers on the machine, None to disable
+PARSE_CACHE_DISK_ENTRIES = 5000
+
+
+# CSV/Excel package upload (see utils/package_import.py)
+IMPORT_UPLOAD_DIR = 'cache/uploads'
+IMPORT_BATCH_SIZE = 5000  # rows parsed and sent to the browser per poll
+IMPORT_POLL_MS = 250
+IMPORT_DELIMITER = None  # ',', ';' or '\t' - None detects it from the file
+
+# Background callbacks for long jobs (see utils/background.py)
+BACKGROUND_CACHE_DIR = 'cache/background'
+BACKGROUND_CACHE_EXPIRE = 3600  # seconds cached job results are kept
+BACKGROUND_CACHE_VERSION = 1  # bump to invalidate cached job results
+
+# Load plan export (see utils/plan_export.py)
+EXPORT_DIR = 'cache/exports'  # plan snapshots streamed by /export/<token>.<format>
+EXPORT_MAX_AGE = 3600  # seconds a snapshot (and its download links) stays valid
+
+# Planner action log for ML training data (see utils/event_log.py)
+EVENT_LOG_ENABLED = True
+EVENT_LOG_DIR = 'data/events'
+EVENT_LOG_FLUSH_INTERVAL = 2.0  # seconds between background flushes
+EVENT_LOG_BATCH_SIZE = 500  # flush early when this many events are waiting
+EVENT_LOG_MAX_BYTES = 64 * 1024 * 1024  # start a new file part at this size
+
+# Undo/redo of package edits (see utils/history.py)
+HISTORY_DEPTH = 100  # undo steps kept per session
+HISTORY_COALESCE_SECONDS = 1.0  # slider/input edits closer than this merge into one step
+
+# Truck profile catalog for "what fits" (see utils/truck_fit.py). Inner cargo
+# space in meters; cost is relative to the standard trailer.
+TRUCK_PROFILES = {
+    'van': {'label': 'Van 3.5 t', 'length': 4.2, 'width': 1.8, 'height': 1.9, 'cost': 0.35},
+    'container-20': {'label': "20' container", 'length': 5.9, 'width': 2.35, 'height': 2.39, 'cost': 0.5},
+    'rigid-7': {'label': 'Rigid 7.2 m', 'length': 7.2, 'width': 2.45, 'height': 2.5, 'cost': 0.6},
+    'rigid-9': {'label': 'Rigid 9.6 m', 'length': 9.6, 'width': 2.45, 'height': 2.6, 'cost': 0.75},
+    'container-40': {'label': "40' container", 'length': 12.03, 'width': 2.35, 'height': 2.39, 'cost': 0.85},
+    'container-40hc': {'label': "40' high cube", 'length': 12.03, 'width': 2.35, 'height': 2.69, 'cost': 0.9},
+    'trailer': {'label': 'Trailer 13.6 m', 'length': TRUCK_LENGTH, 'width': TRUCK_WIDTH, 'height': TRUCK_HEIGHT,
+                'cost': 1.0},
+    'mega': {'label': 'Mega trailer', 'length': 13.6, 'width': 2.48, 'height': 3.0, 'cost': 1.1},
+}
+DEFAULT_TRUCK_PROFILE = 'trailer'
+TRUCK_FIT_EXACT_BUDGET = 0.1  # s of exact search per profile for small orders
+TRUCK_FIT_WORKERS = 4  # processes checking profiles in parallel (capped at the CPU count)
+TRUCK_FIT_PARALLEL_MIN_PACKAGES = 1000  # smaller orders are checked in the request thread
+
+# Exact placement for small orders (see utils/exact_placement.py)
+EXACT_MAX_PACKAGES = 15  # larger orders go straight to the heuristics
+EXACT_TIME_BUDGET = 1.0  # s - then the best plan found so far is used
+EXACT_MEMO_SIZE = 200000  # searched partial layouts remembered
+
+# Duct nesting before loading (see utils/nesting.py)
+NEST_DUCTS = True  # nest round ducts when an order is loaded
+NESTABLE_TYPES = ('SROR',)  # package types (first word of the name) that are round ducts
+DUCT_ROUND_TOLERANCE = 0.005  # m - max height/depth difference of a round cross-section
+DUCT_NEST_CLEARANCE = 0.01  # m - min diameter difference for one duct to slide into another
+
+# Pallets of cartons (see utils/pallets.py)
+PALLETIZE_TYPES = ('KOLLI',)  # package types (first word of the name) built onto pallets by Palletize
+PALLET_BASE = {'width': 1.2, 'height': 0.8, 'depth': 0.144}  # EUR pallet: along X, across Y, vertical (m)
+PALLET_MAX_DEPTH = 1.8  # m - height of a loaded pallet including the base
+PALLET_COLOR = 'rgb(180, 130, 70)'
+PALLET_DETAIL_MAX_CARTONS = 2000  # cartons drawn individually, over all expanded/selected pallets
+
+# Fleet view: an order split over several trucks (see utils/fleet.py, visualization/fleet.py)
+FLEET_MAX_TRUCKS = 20  # trucks an order is split over at most
+FLEET_GAP = 1.0  # m between trailers in the fleet view
+
+# Magnetic snapping of moved packages to neighbour faces and walls (see utils/snapping.py)
+SNAP_TOLERANCE = 0.08  # m: faces closer than this pull a moved package flush (under the 0.1 m slider step)
+
+# Load rules per customer and package type (first word of the name), see utils/constraints.py.
+# '*' applies to every customer; a customer's entry (URL ?customer=) overrides it per type.
+#   max_stack_height: m - the stack a package is in may reach at most this high
+#   max_load_on_top: kg - weight resting on the package, directly or through others
+#   fragile: nothing may rest on the package (top of its stack only)
+#   upright: the package must stand level - on the floor or with its whole base supported
+#   family: product family, see INCOMPATIBLE_FAMILIES
+#   density: kg/m³ - weight of packages without a 'weight' (default PACKAGE_DENSITY)
+LOAD_RULES = {
+    '*': {
+        'EMBV1': {'max_stack_height': 2.6, 'max_load_on_top': 1000},
+        'EMBV2': {'max_stack_height': 2.6, 'max_load_on_top': 1000},
+        'SROR': {'max_load_on_top': 300},
+        'PALLET': {'upright': True},
+    },
+    'DEMO': {
+        'KOLLI': {'fragile': True, 'upright': True, 'family': 'FOOD'},
+        'SROR': {'family': 'CHEMICAL'},
+    },
+}
+INCOMPATIBLE_FAMILIES = (('FOOD', 'CHEMICAL'),)  # families whose packages must not touch
+PACKAGE_DENSITY = 150  # kg/m³
+CONSTRAINT_SUPPORT_GAP = 0.12  # m - a package this close above another rests on it (auto-stack leaves 0.1 m)
+CONSTRAINT_TOUCH_GAP = 0.01  # m - packages closer than this touch
+CONSTRAINT_CHUNK = 1024  # packages compared per vectorized block in the family check
+MAX_REPORTED_VIOLATIONS = 5  # rule violations listed in the UI
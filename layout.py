@@ -2,8 +2,8 @@
 
 from dash import dcc, html
 from dash_extensions import EventListener
-from config import INITIAL_PACKAGES, MOVE_STEP, TRUCK_LENGTH, TRUCK_WIDTH, TRUCK_HEIGHT
-from visualization.figures import create_figure
+from config import (INITIAL_PACKAGES, MOVE_STEP, TRUCK_LENGTH, TRUCK_WIDTH, TRUCK_HEIGHT, IMPORT_POLL_MS,
+                    TRUCK_PROFILES, DEFAULT_TRUCK_PROFILE, CAMERA_PRESETS)
 
 
 def create_layout():
@@ -35,6 +35,52 @@ def create_control_panel():
             html.Div(id='url-order-info', style={'marginBottom': '10px', 'color': '#cbd5e1'}),
             html.Div(id='summary-stats')
         ], style={'marginBottom': '20px', 'paddingBottom': '20px', 'borderBottom': '1px solid #475569'}),
+
+        # Package file upload
+        html.Div([
+            dcc.Upload(
+                id='package-upload',
+                children=html.Div(['📥 Drop or ', html.A('select', style={'color': '#3b82f6'}), ' a CSV/Excel package list']),
+                accept='.csv,.txt,.xlsx',
+                style={
+                    'padding': '10px',
+                    'border': '1px dashed #475569',
+                    'borderRadius': '5px',
+                    'textAlign': 'center',
+                    'fontSize': '12px',
+                    'color': '#cbd5e1',
+                    'cursor': 'pointer'
+                }
+            ),
+            html.Div(id='import-progress', style={'marginTop': '8px', 'fontSize': '12px', 'color': '#cbd5e1'}),
+            html.Button('Cancel import', id='import-cancel-btn', n_clicks=0,
+                        style={'marginTop': '5px', 'padding': '3px 8px', 'fontSize': '11px',
+                               'backgroundColor': '#475569', 'color': 'white', 'border': 'none',
+                               'borderRadius': '3px', 'cursor': 'pointer'})
+        ], style={'marginBottom': '20px', 'paddingBottom': '20px', 'borderBottom': '1px solid #475569'}),
+
+        # Load plan export
+        html.Div([
+            html.Button('📤 Export plan', id='export-btn', n_clicks=0,
+                        style={'width': '100%', 'padding': '8px', 'marginBottom': '8px'}),
+            html.Div(id='export-links', style={'fontSize': '12px', 'color': '#cbd5e1'})
+        ], style={'marginBottom': '20px', 'paddingBottom': '20px', 'borderBottom': '1px solid #475569'}),
+
+        # Automatic placement and multi-drop loading order
+        html.Div([
+            html.Button('🧩 Auto-place', id='auto-place-btn', n_clicks=0,
+                        title='Exact search for small orders, quick heuristic for large ones',
+                        style={'width': '100%', 'padding': '8px', 'marginBottom': '8px'}),
+            html.Div(id='placement-result', style={'fontSize': '12px', 'color': '#cbd5e1', 'marginBottom': '8px'}),
+            html.Button('🧱 Palletize cartons', id='palletize-btn', n_clicks=0,
+                        title='Stack loose cartons onto pallets, moved and placed as one package each',
+                        style={'width': '100%', 'padding': '8px', 'marginBottom': '8px'}),
+            html.Button('🚚 Plan loading order', id='plan-stops-btn', n_clicks=0,
+                        style={'width': '100%', 'padding': '8px', 'marginBottom': '8px'}),
+            html.Div(id='stop-warnings', style={'fontSize': '12px', 'color': '#cbd5e1'}),
+            # Load rule violations (utils/constraints.py), checked after every edit
+            html.Div(id='rule-warnings', style={'fontSize': '12px', 'color': '#cbd5e1', 'marginTop': '8px'})
+        ], style={'marginBottom': '20px', 'paddingBottom': '20px', 'borderBottom': '1px solid #475569'}),
         
         # Package list
         html.Div([
@@ -65,6 +111,20 @@ def create_control_panel():
                         options=[{'label': ' Smart stacking', 'value': 'enabled'}],
                         value=[],
                         style={'color': '#cbd5e1', 'fontSize': '12px'}
+                    ),
+                    # Moves pull flush against neighbours/walls (utils/snapping.py)
+                    dcc.Checklist(
+                        id='snap-toggle',
+                        options=[{'label': ' 🧲 Snap to neighbours', 'value': 'enabled'}],
+                        value=['enabled'],
+                        style={'color': '#cbd5e1', 'fontSize': '12px'}
+                    ),
+                    # Clicking packages in the list adds/removes them from the selection
+                    dcc.Checklist(
+                        id='multi-select-toggle',
+                        options=[{'label': ' Multi-select (move together)', 'value': 'enabled'}],
+                        value=[],
+                        style={'color': '#cbd5e1', 'fontSize': '12px'}
                     )
                 ], style={'marginBottom': '10px'}),
 
@@ -119,6 +179,19 @@ def create_control_panel():
                 # Rotation
                 html.Button('🔄 Rotate 90°', id='rotate-btn', n_clicks=0,
                         style={'width': '100%', 'padding': '8px', 'marginBottom': '15px'}),
+
+                # Pallet level of detail
+                html.Button('📂 Show / hide cartons', id='expand-pallet-btn', n_clicks=0,
+                        title='Keep the cartons of the selected pallet drawn when it is not selected',
+                        style={'width': '100%', 'padding': '8px', 'marginBottom': '15px'}),
+
+                # Undo/redo
+                html.Div([
+                    html.Button('↶ Undo', id='undo-btn', n_clicks=0, disabled=True,
+                            style={'width': '49%', 'padding': '8px', 'marginRight': '2%'}),
+                    html.Button('↷ Redo', id='redo-btn', n_clicks=0, disabled=True,
+                            style={'width': '49%', 'padding': '8px'})
+                ], style={'display': 'flex', 'marginBottom': '15px'}),
             ], style={
                 'padding': '15px',
                 'backgroundColor': '#334155',
@@ -218,12 +291,24 @@ def create_control_panel():
             # Truck dimensions
             html.Div([
                 html.H3('🚛 Truck Dimensions', style={'fontSize': '16px', 'marginBottom': '10px'}),
+                html.Div([
+                    html.Label('Profile:', style={'fontSize': '12px', 'color': '#94a3b8', 'marginBottom': '3px'}),
+                    dcc.Dropdown(
+                        id='truck-profile',
+                        options=[{'label': f"{profile['label']} ({profile['length']} x {profile['width']} x "
+                                           f"{profile['height']} m)", 'value': name}
+                                 for name, profile in TRUCK_PROFILES.items()],
+                        value=DEFAULT_TRUCK_PROFILE,
+                        clearable=False,
+                        style={'color': '#0f172a', 'fontSize': '12px', 'marginBottom': '8px'}
+                    )
+                ]),
                 html.Div([
                     html.Label('Length (m):', style={'fontSize': '12px', 'color': '#94a3b8', 'marginBottom': '3px'}),
                     dcc.Input(
                         id='input-truck-length',
                         type='number',
-                        min=4,
+                        min=2,
                         max=50,
                         step=0.01,
                         value=TRUCK_LENGTH,
@@ -235,7 +320,7 @@ def create_control_panel():
                     dcc.Input(
                         id='input-truck-width',
                         type='number',
-                        min=2,
+                        min=1,
                         max=10,
                         step=0.01,
                         value=TRUCK_WIDTH,
@@ -247,7 +332,7 @@ def create_control_panel():
                     dcc.Input(
                         id='input-truck-height',
                         type='number',
-                        min=2,
+                        min=1,
                         max=10,
                         step=0.01,
                         value=TRUCK_HEIGHT,
@@ -266,7 +351,39 @@ def create_control_panel():
                                 'border': 'none',
                                 'borderRadius': '3px',
                                 'cursor': 'pointer'
-                            })
+                            }),
+                html.Button('🔍 What fits?',
+                            id='truck-fit-btn',
+                            n_clicks=0,
+                            title='Check the order against every truck profile and pick the cheapest that fits',
+                            style={
+                                'width': '100%',
+                                'padding': '5px',
+                                'marginTop': '5px',
+                                'fontSize': '11px',
+                                'backgroundColor': '#2563eb',
+                                'color': 'white',
+                                'border': 'none',
+                                'borderRadius': '3px',
+                                'cursor': 'pointer'
+                            }),
+                html.Div(id='truck-fit-result', style={'fontSize': '11px', 'marginTop': '8px'}),
+                html.Button('🚛 Fleet view',
+                            id='fleet-btn',
+                            n_clicks=0,
+                            title='Split the order over as many trucks of this size as it needs',
+                            style={
+                                'width': '100%',
+                                'padding': '5px',
+                                'marginTop': '5px',
+                                'fontSize': '11px',
+                                'backgroundColor': '#2563eb',
+                                'color': 'white',
+                                'border': 'none',
+                                'borderRadius': '3px',
+                                'cursor': 'pointer'
+                            }),
+                html.Div(id='fleet-result', style={'fontSize': '11px', 'marginTop': '8px'})
             ], style={'marginBottom': '20px', 'paddingBottom': '20px', 'borderBottom': '1px solid #475569'}),
         ], id='controls-container')
         
@@ -281,14 +398,51 @@ def create_control_panel():
 
 
 def create_visualization_panel():
-    """Create the right visualization panel"""
+    """
+    Create the right visualization panel
+
+    The graph starts with an empty dark placeholder - update_graph renders the
+    real figure on page load, so plotly/numpy are not needed at startup. The
+    camera buttons above it move the view in the browser (no server call),
+    and the fleet view below it stays hidden until Fleet view is pressed.
+    """
     return html.Div([
+        html.Div([
+            html.Button(preset['label'], id={'type': 'camera-preset', 'name': name}, n_clicks=0,
+                        style={'marginRight': '5px', 'padding': '4px 10px', 'fontSize': '11px',
+                               'backgroundColor': '#334155', 'color': 'white', 'border': 'none',
+                               'borderRadius': '3px', 'cursor': 'pointer'})
+            for name, preset in CAMERA_PRESETS.items()
+        ] + [
+            # Name of the package under the mouse in compact figures (clientside lookup by id)
+            html.Span(id='hover-package-info', style={'marginLeft': '10px', 'fontSize': '12px', 'color': '#cbd5e1'})
+        ], style={'padding': '8px'}),
         dcc.Graph(
             id='truck-3d-graph',
-            figure=create_figure(INITIAL_PACKAGES),
+            figure=create_placeholder_figure(),
             style={'height': '100vh'}
-        )
-    ], style={'flex': '1'})
+        ),
+        html.Div([
+            html.Button('✖ Close fleet view', id='fleet-close-btn', n_clicks=0,
+                        style={'margin': '8px', 'padding': '5px 10px', 'fontSize': '11px'}),
+            dcc.Graph(id='fleet-graph', figure=create_placeholder_figure())
+        ], id='fleet-panel', style={'display': 'none'})
+    ], style={'flex': '1', 'height': '100vh', 'overflowY': 'auto', 'backgroundColor': '#1e293b'})
+
+
+def create_placeholder_figure():
+    """Plain-dict figure shown until the first render (no plotly import)"""
+    return {
+        'data': [],
+        'layout': {
+            'height': 700,
+            'margin': {'l': 0, 'r': 0, 't': 40, 'b': 0},
+            'paper_bgcolor': '#1e293b',
+            'plot_bgcolor': '#1e293b',
+            'xaxis': {'visible': False},
+            'yaxis': {'visible': False}
+        }
+    }
 
 
 def create_data_stores():
@@ -300,10 +454,19 @@ def create_data_stores():
     return [
         dcc.Store(id='packages-store', data=INITIAL_PACKAGES),
         dcc.Store(id='selected-package-id', data=None),
+        dcc.Store(id='selected-package-ids', data=[]),  # multi-selection, moved together
         dcc.Store(id='package-counter', data=len(INITIAL_PACKAGES)),  
         dcc.Store(id='keyboard-event-store', data=None), # register keyboard events
-        dcc.Store(id='camera-store', data=None), # store camera position inbetween renders
+        dcc.Store(id='camera-store', data=None), # last camera, kept in the browser (clientside callbacks)
         dcc.Location(id='url', refresh=False), # used to fetch transport order in url parameter
+        dcc.Store(id='order-id', data=None), # order of the loaded plan (event log)
+        dcc.Store(id='customer-id', data=None), # customer from the URL, picks the load rules
+        dcc.Store(id='history-store', data={'undo': [], 'redo': []}), # undo/redo deltas
+        dcc.Store(id='render-skip', data=False), # set when the figure was already patched
+        dcc.Store(id='expanded-pallets', data=[]), # pallets drawn carton by carton
+        dcc.Store(id='selected-pallet', data=None), # selected pallet, drawn carton by carton
+        dcc.Store(id='import-job', data=None), # progress of a running file import
+        dcc.Interval(id='import-poll', interval=IMPORT_POLL_MS, disabled=True), # drives import batches
         dcc.Store(id='truck-dimensions', data={
             'length': TRUCK_LENGTH,
             'width': TRUCK_WIDTH,
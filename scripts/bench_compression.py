@@ -0,0 +1,78 @@
+"""
+Measure bytes saved by response compression on a large order
+
+Posts a real update_graph request for a 1,000-package order through the
+Flask test client, with and without Accept-Encoding, and prints the
+payload sizes.
+
+Run from the repository root:
+    python -m scripts.bench_compression [num_packages]
+"""
+
+import json
+import sys
+import time
+
+from app import app
+from config import TRUCK_LENGTH, TRUCK_WIDTH, TRUCK_HEIGHT
+from utils.compression import brotli
+from utils.workload import generate_packages
+
+
+def update_graph_request(packages):
+    """Build the _dash-update-component body the browser sends for update_graph"""
+    return {
+        'output': '..truck-3d-graph.figure...render-skip.data..',
+        'outputs': [{'id': 'truck-3d-graph', 'property': 'figure'},
+                    {'id': 'render-skip', 'property': 'data'}],
+        'inputs': [
+            {'id': 'packages-store', 'property': 'data', 'value': packages},
+            {'id': 'truck-dimensions', 'property': 'data',
+             'value': {'length': TRUCK_LENGTH, 'width': TRUCK_WIDTH, 'height': TRUCK_HEIGHT}}
+        ],
+        'changedPropIds': ['packages-store.data'],
+        'state': [{'id': 'render-skip', 'property': 'data', 'value': False},
+                  {'id': 'expanded-pallets', 'property': 'data', 'value': []},
+                  {'id': 'selected-package-id', 'property': 'data', 'value': None},
+                  {'id': 'camera-store', 'property': 'data', 'value': None}]
+    }
+
+
+def measure(client, path, accept_encoding, body=None):
+    """Send one request and return (payload bytes, elapsed ms, content encoding)"""
+    headers = {'Accept-Encoding': accept_encoding} if accept_encoding else {}
+    start = time.perf_counter()
+    if body is None:
+        response = client.get(path, headers=headers)
+    else:
+        response = client.post(path, data=json.dumps(body), content_type='application/json',
+                               headers=headers)
+    elapsed = (time.perf_counter() - start) * 1000
+    assert response.status_code == 200, response.status_code
+    return len(response.get_data()), elapsed, response.headers.get('Content-Encoding', 'identity')
+
+
+def main():
+    num_packages = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    client = app.server.test_client()
+    body = update_graph_request(generate_packages(num_packages, seed=42, scatter=True))
+
+    encodings = ['', 'gzip'] + (['br'] if brotli is not None else [])
+    targets = [
+        (f'update_graph ({num_packages} packages)', '/_dash-update-component', body),
+        ('layout', '/_dash-layout', None),
+    ]
+
+    for label, path, request_body in targets:
+        measure(client, path, '', request_body)  # warm up
+        print(f"\n{label}")
+        baseline = None
+        for accept in encodings:
+            size, elapsed, encoding = measure(client, path, accept, request_body)
+            baseline = baseline or size
+            saved = 100 * (1 - size / baseline)
+            print(f"  {encoding:<9} {size:>10,} bytes  {elapsed:7.1f} ms  ({saved:4.1f}% saved)")
+
+
+if __name__ == '__main__':
+    main()
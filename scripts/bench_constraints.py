@@ -0,0 +1,56 @@
+"""
+Measure the load rule check over whole loads, and its cost inside placement
+
+Each order is placed with auto_place with and without the rules of a
+customer, then the placed load is checked (the check that runs after every
+edit) and the violations counted per rule.
+
+Run from the repository root:
+    python -m scripts.bench_constraints [num_packages ...] [--customer NAME]
+"""
+
+import sys
+import time
+from collections import Counter
+
+from config import TRUCK_WIDTH, TRUCK_HEIGHT
+from utils.constraints import check_load, resolve_rules
+from utils.placement import auto_place
+from utils.workload import generate_packages
+
+
+def timed(func):
+    """(result, ms) of one call"""
+    start = time.perf_counter()
+    result = func()
+    return result, (time.perf_counter() - start) * 1000
+
+
+def main():
+    args = sys.argv[1:]
+    customer = 'DEMO'
+    if '--customer' in args:
+        position = args.index('--customer')
+        customer = args[position + 1]
+        del args[position:position + 2]
+    sizes = [int(arg) for arg in args] or [1000, 5000, 20000]
+    rules = resolve_rules(customer)
+    check_load(generate_packages(2), rules)  # imports NumPy outside the timings
+
+    print(f"customer {customer}: rules for {', '.join(sorted(rules))}")
+    print(f"{'packages':>9} {'place ms':>9} {'+rules ms':>10} {'check ms':>9}  violations (no rules -> rules)")
+    for num_packages in sizes:
+        packages = generate_packages(num_packages, seed=42, mix='mixed')
+        # A long enough truck, so the whole order is placed
+        truck_dims = {'length': max(13.6, num_packages * 0.12), 'width': TRUCK_WIDTH, 'height': TRUCK_HEIGHT}
+
+        (plain, _), plain_ms = timed(lambda: auto_place(packages, truck_dims))
+        (ruled, _), ruled_ms = timed(lambda: auto_place(packages, truck_dims, rules))
+        before = Counter(violation['rule'] for violation in check_load(plain, rules))
+        violations, check_ms = timed(lambda: check_load(ruled, rules))
+        after = Counter(violation['rule'] for violation in violations)
+        print(f"{num_packages:>9} {plain_ms:>9.0f} {ruled_ms:>10.0f} {check_ms:>9.1f}  {dict(before)} -> {dict(after)}")
+
+
+if __name__ == '__main__':
+    main()
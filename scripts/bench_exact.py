@@ -0,0 +1,64 @@
+"""
+Compare exact placement with the auto_place heuristic on small orders
+
+Orders of a few repeated items (like real profile and pallet orders) are
+placed both ways; the table shows how often the exact search proves its
+plan optimal, shortens the load or fits an order the heuristic could not.
+
+Run from the repository root:
+    python -m scripts.bench_exact [orders per size] [time budget s]
+"""
+
+import sys
+from collections import Counter
+
+from config import TRUCK_LENGTH, TRUCK_WIDTH, TRUCK_HEIGHT
+from utils.exact_placement import exact_place
+from utils.geometry import calculate_load_metrics
+from utils.placement import auto_place
+from utils.workload import generate_packages
+
+ORDER_SIZES = (4, 6, 9, 12, 15)
+DISTINCT_ITEMS = 3  # item types per order, repeated to the order size
+
+
+def repeated_order(num_packages, seed, mix):
+    """An order of DISTINCT_ITEMS generated items, repeated to num_packages packages"""
+    items = generate_packages(DISTINCT_ITEMS, seed=seed, mix=mix)
+    return [dict(items[i % DISTINCT_ITEMS], id=i + 1, name=f"{items[i % DISTINCT_ITEMS]['name']}-{i + 1}")
+            for i in range(num_packages)]
+
+
+def used_length(packages):
+    return calculate_load_metrics(packages, TRUCK_LENGTH, TRUCK_WIDTH, TRUCK_HEIGHT)['used_length']
+
+
+def main():
+    num_orders = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    time_budget = float(sys.argv[2]) if len(sys.argv) > 2 else 1.0
+
+    print(f"{num_orders} orders per size, {time_budget:g} s budget")
+    print(f"{'mix':<9} {'size':>4} {'optimal':>8} {'infeas.':>8} {'timeout':>8} {'shorter':>8} "
+          f"{'saved m':>8} {'rescued':>8} {'max ms':>7}")
+    for mix in ('profiles', 'pallets', 'mixed'):
+        for size in ORDER_SIZES:
+            statuses = Counter()
+            shorter = rescued = 0
+            saved = max_ms = 0.0
+            for seed in range(num_orders):
+                packages = repeated_order(size, seed, mix)
+                heuristic, heuristic_unplaced = auto_place(packages)
+                placed, unplaced, info = exact_place(packages, time_budget=time_budget)
+                statuses[info['status']] += 1
+                max_ms = max(max_ms, info['ms'])
+                if heuristic_unplaced and not unplaced:
+                    rescued += 1
+                elif not heuristic_unplaced and info['length'] < used_length(heuristic) - 1e-9:
+                    shorter += 1
+                    saved += used_length(heuristic) - info['length']
+            print(f"{mix:<9} {size:>4} {statuses['optimal']:>8} {statuses['infeasible']:>8} "
+                  f"{statuses['timeout']:>8} {shorter:>8} {saved:>8.2f} {rescued:>8} {max_ms:>7.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,41 @@
+"""
+Compare serialized figure size of the per-package and compact encodings
+
+Run from the repository root:
+    python -m scripts.bench_figure_size [num_packages ...]
+"""
+
+import gzip
+import sys
+import time
+
+from dash._utils import to_json
+from config import TRUCK_LENGTH, TRUCK_WIDTH, TRUCK_HEIGHT
+from visualization.figures import create_figure_custom
+from utils.workload import generate_packages
+
+
+def measure(packages, compact):
+    """Build and serialize a figure, returning (bytes, gzipped bytes, build+serialize ms)"""
+    truck_dims = {'length': TRUCK_LENGTH, 'width': TRUCK_WIDTH, 'height': TRUCK_HEIGHT}
+    start = time.perf_counter()
+    payload = to_json(create_figure_custom(packages, None, truck_dims, compact=compact))
+    elapsed = (time.perf_counter() - start) * 1000
+    return len(payload), len(gzip.compress(payload.encode(), compresslevel=6)), elapsed
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [100, 500, 1000, 2000]
+
+    print(f"{'packages':>8} {'full bytes':>12} {'compact bytes':>14} {'ratio':>6} "
+          f"{'full gz':>9} {'compact gz':>10} {'full ms':>8} {'compact ms':>10}")
+    for num_packages in sizes:
+        packages = generate_packages(num_packages, seed=42, scatter=True)
+        full_size, full_gz, full_ms = measure(packages, compact=False)
+        compact_size, compact_gz, compact_ms = measure(packages, compact=True)
+        print(f"{num_packages:>8} {full_size:>12,} {compact_size:>14,} {full_size / compact_size:>5.1f}x "
+              f"{full_gz:>9,} {compact_gz:>10,} {full_ms:>8.0f} {compact_ms:>10.0f}")
+
+
+if __name__ == '__main__':
+    main()
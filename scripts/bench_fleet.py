@@ -0,0 +1,49 @@
+"""
+Time the fleet view of several trucks' plans
+
+Builds fleet figures of N trucks with M scattered packages each, and
+splits generated orders over trucks, reporting build time, payload size and
+trace count.
+
+Run from the repository root:
+    python -m scripts.bench_fleet [trucks] [packages per truck]
+"""
+
+import sys
+import time
+
+from dash._utils import to_json
+from config import TRUCK_LENGTH, TRUCK_WIDTH, TRUCK_HEIGHT
+from utils.fleet import split_over_trucks
+from utils.workload import generate_packages
+from visualization.fleet import create_fleet_figure
+
+
+def main():
+    num_trucks = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    per_truck = int(sys.argv[2]) if len(sys.argv) > 2 else 300
+    truck_dims = {'length': TRUCK_LENGTH, 'width': TRUCK_WIDTH, 'height': TRUCK_HEIGHT}
+
+    plans = [{'name': f'Truck {n + 1}', 'truck_dims': truck_dims,
+              'packages': generate_packages(per_truck, seed=n, mix='parcels', scatter=True)}
+             for n in range(num_trucks)]
+    build_ms = serialize_ms = float('inf')
+    for _ in range(3):  # the first build also loads plotly's validators
+        start = time.perf_counter()
+        figure = create_fleet_figure(plans)
+        built = time.perf_counter()
+        payload = to_json(figure)
+        build_ms = min(build_ms, (built - start) * 1000)
+        serialize_ms = min(serialize_ms, (time.perf_counter() - built) * 1000)
+    print(f"{num_trucks} trucks x {per_truck} packages: {len(figure.data)} traces, {len(payload):,} bytes, "
+          f"build {build_ms:.0f} ms + serialize {serialize_ms:.0f} ms")
+
+    packages = generate_packages(num_trucks * per_truck, seed=1, mix='parcels')
+    start = time.perf_counter()
+    fleet, left_over = split_over_trucks(packages, truck_dims, max_trucks=10 * num_trucks)
+    print(f"split {len(packages)} packages over {len(fleet)} trucks ({len(left_over)} left over) "
+          f"in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,35 @@
+"""
+Time duct nesting on large synthetic duct orders
+
+Nests orders of random standard-diameter spiral ducts and reports the time
+and how much load volume nesting saves.
+
+Run from the repository root:
+    python -m scripts.bench_nesting [num_packages ...]
+"""
+
+import sys
+import time
+
+from utils.nesting import nest_packages
+from utils.workload import generate_packages
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [1000, 5000, 10000]
+
+    print(f"{'ducts':>7} {'ms':>7} {'bundles':>8} {'nested':>7} {'volume m³':>10} {'nested m³':>10} {'saved':>6}")
+    for num_packages in sizes:
+        packages = generate_packages(num_packages, seed=1, mix='ducts')
+        best = float('inf')
+        for _ in range(5):
+            start = time.perf_counter()
+            _, stats = nest_packages(packages)
+            best = min(best, (time.perf_counter() - start) * 1000)
+        saved = 1 - stats['volume_after'] / stats['volume_before']
+        print(f"{num_packages:>7,} {best:>7.1f} {stats['bundles']:>8,} {stats['nested']:>7,} "
+              f"{stats['volume_before']:>10.1f} {stats['volume_after']:>10.1f} {saved:>6.0%}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+"""
+Lookup latency of the SQLite order source with a large database
+
+Builds a temporary database of synthetic orders (default 1,000,000) and
+times random point lookups.
+
+Run from the repository root:
+    python -m scripts.bench_order_source [num_orders] [num_lookups]
+"""
+
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+from utils.order_source import SQLiteOrderSource, bulk_import
+from utils.workload import generate_orders
+
+
+def main():
+    num_orders = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    num_lookups = int(sys.argv[2]) if len(sys.argv) > 2 else 20000
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'orders.db')
+
+        start = time.perf_counter()
+        bulk_import(path, generate_orders(num_orders, seed=7), batch_size=50000)
+        print(f"Imported {num_orders:,} orders in {time.perf_counter() - start:.1f}s "
+              f"({os.path.getsize(path) / 1e6:.0f} MB)")
+
+        source = SQLiteOrderSource(path)
+        rng = random.Random(1)
+        timings = []
+        for _ in range(num_lookups):
+            order_number = str(1000000 + rng.randrange(num_orders))
+            start = time.perf_counter()
+            assert source.get_packages(order_number)
+            timings.append((time.perf_counter() - start) * 1000)
+        source.close()
+
+    timings.sort()
+    print(f"Lookups: {num_lookups:,}")
+    print(f"  median {statistics.median(timings):.3f} ms")
+    print(f"  p99    {timings[int(len(timings) * 0.99)]:.3f} ms")
+    print(f"  max    {timings[-1]:.3f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+"""
+Measure figure size with pallets drawn as one box or carton by carton
+
+Carton orders are drawn loose, then palletized with every pallet collapsed,
+with one pallet selected and with pallets expanded up to
+PALLET_DETAIL_MAX_CARTONS cartons.
+
+Run from the repository root:
+    python -m scripts.bench_pallets [num_cartons ...]
+"""
+
+import sys
+import time
+
+from dash._utils import to_json
+from config import TRUCK_LENGTH, TRUCK_WIDTH, TRUCK_HEIGHT, COMPACT_FIGURE_THRESHOLD
+from visualization.figures import create_figure_custom
+from utils.pallets import palletize_packages, detail_ids, is_pallet
+from utils.workload import generate_packages
+
+
+def measure(packages, detailed=()):
+    """Build and serialize a figure, returning (bytes, build+serialize ms)"""
+    truck_dims = {'length': TRUCK_LENGTH, 'width': TRUCK_WIDTH, 'height': TRUCK_HEIGHT}
+    compact = len(packages) >= COMPACT_FIGURE_THRESHOLD
+    start = time.perf_counter()
+    payload = to_json(create_figure_custom(packages, None, truck_dims, compact=compact, detailed=detailed))
+    return len(payload), (time.perf_counter() - start) * 1000
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [1000, 5000, 20000]
+
+    print(f"{'cartons':>8} {'pallets':>8} {'view':<10} {'drawn':>7} {'bytes':>12} {'ms':>7}")
+    for num_cartons in sizes:
+        cartons = generate_packages(num_cartons, seed=42, mix='cartons', scatter=True)
+        start = time.perf_counter()
+        packages, stats = palletize_packages(cartons, num_cartons + 1)
+        palletize_ms = (time.perf_counter() - start) * 1000
+        pallet_ids = [pkg['id'] for pkg in packages if is_pallet(pkg)]
+
+        views = [
+            ('loose', cartons, set()),
+            ('collapsed', packages, set()),
+            ('selected', packages, detail_ids(packages, selected_id=pallet_ids[0])),
+            ('expanded', packages, detail_ids(packages, expanded=pallet_ids)),
+        ]
+        for view, view_packages, detailed in views:
+            drawn = len(view_packages) + sum(len(pkg['contents']) for pkg in view_packages if pkg['id'] in detailed)
+            size, elapsed = measure(view_packages, detailed)
+            print(f"{num_cartons:>8} {stats['pallets']:>8} {view:<10} {drawn:>7} {size:>12,} {elapsed:>7.0f}")
+        print(f"{'':>8} palletized {stats['cartons']} cartons in {palletize_ms:.0f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+"""
+Row-by-row vs vectorized bulk parsing of Power BI package strings
+
+Checks that both parsers produce byte-identical JSON and reports timings.
+
+Run from the repository root:
+    python -m scripts.bench_parser [num_rows ...]
+"""
+
+import contextlib
+import io
+import json
+import random
+import sys
+import time
+
+import callbacks.url_callbacks as url_callbacks
+from utils.bulk_parser import parse_packages_bulk
+from utils.workload import generate_rows, to_package_string
+
+
+def make_payload(num_rows, seed=11):
+    """Mixed European/dot decimal payload with ~1% malformed rows"""
+    rng = random.Random(seed)
+    rows = []
+    for i, row in enumerate(generate_rows(num_rows, seed), 1):
+        if rng.random() < 0.01:
+            rows.append(f'BROKEN {i}~1,0~2,0')
+            continue
+        rows.append(to_package_string([row], decimal_comma=rng.random() < 0.5))
+    return '|'.join(rows)
+
+
+def timed(parse, payload, repeat=5):
+    """Best-of-repeat timing in ms, plus the parse result"""
+    best = float('inf')
+    with contextlib.redirect_stdout(io.StringIO()):  # the row parser prints per bad row
+        for _ in range(repeat):
+            start = time.perf_counter()
+            packages, stats = parse(payload)
+            best = min(best, (time.perf_counter() - start) * 1000)
+    return packages, stats, best
+
+
+def row_parser(payload):
+    url_callbacks.BULK_PARSE_THRESHOLD = float('inf')
+    return url_callbacks.parse_powerbi_packages_with_stats(payload)
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [100, 2000, 20000]
+
+    print(f"{'rows':>7} {'row ms':>8} {'bulk ms':>8} {'table ms':>9} {'speedup':>8}  identical")
+    for num_rows in sizes:
+        payload = make_payload(num_rows)
+        row_packages, row_stats, row_ms = timed(row_parser, payload)
+        bulk_packages, bulk_stats, bulk_ms = timed(url_callbacks.parse_powerbi_packages_bulk, payload)
+        _, _, table_ms = timed(lambda raw: parse_packages_bulk(
+            raw, url_callbacks.PACKAGE_TYPE_COLORS, url_callbacks.DEFAULT_PACKAGE_COLOR), payload)
+        identical = (json.dumps(row_packages) == json.dumps(bulk_packages) and row_stats == bulk_stats)
+        print(f"{num_rows:>7} {row_ms:>8.1f} {bulk_ms:>8.1f} {table_ms:>9.1f} "
+              f"{row_ms / bulk_ms:>7.1f}x  {identical}")
+
+
+if __name__ == '__main__':
+    main()
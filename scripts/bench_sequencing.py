@@ -0,0 +1,48 @@
+"""
+Time the multi-drop loading planner and the unload blocking check
+
+Plans synthetic orders with many stops and checks the result, then times
+the blocking check on the worst case: packages scattered through the truck,
+overlapping each other.
+
+Run from the repository root:
+    python -m scripts.bench_sequencing [num_packages] [num_stops]
+"""
+
+import sys
+import time
+
+from config import TRUCK_LENGTH
+from utils.sequencing import plan_loading, find_blocked
+from utils.workload import generate_packages
+
+
+def best_ms(func, repeat=5):
+    """Best-of-repeat timing in ms, plus the result"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, (time.perf_counter() - start) * 1000)
+    return best, result
+
+
+def main():
+    num_packages = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    num_stops = int(sys.argv[2]) if len(sys.argv) > 2 else 30
+
+    print(f"{num_packages:,} packages, {num_stops} stops")
+    print(f"{'mix':<9} {'plan ms':>8} {'check ms':>9} {'placed':>7} {'on dock':>8} {'blocked':>8}")
+    for mix in ('parcels', 'pallets', 'mixed'):
+        packages = generate_packages(num_packages, seed=1, mix=mix, num_stops=num_stops)
+        plan_ms, (placed, unplaced) = best_ms(lambda: plan_loading(packages))
+        check_ms, blocked = best_ms(lambda: find_blocked(placed + unplaced, TRUCK_LENGTH))
+        print(f"{mix:<9} {plan_ms:>8.1f} {check_ms:>9.1f} {len(placed):>7,} {len(unplaced):>8,} {len(blocked):>8,}")
+
+    scattered = generate_packages(num_packages, seed=1, num_stops=num_stops, scatter=True)
+    check_ms, blocked = best_ms(lambda: find_blocked(scattered, TRUCK_LENGTH))
+    print(f"\nBlocking check, scattered worst case: {check_ms:.1f} ms ({len(blocked):,} blocked packages)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,48 @@
+"""
+Measure snapped moves for large orders
+
+Times move_group - bounding boxes of the packages that stay put plus one
+snap scan over them, the work of one move in the app - for packages moved
+around the truck, and counts the moves that snapped.
+
+Run from the repository root:
+    python -m scripts.bench_snapping [num_packages ...]
+"""
+
+import random
+import sys
+import time
+
+from config import TRUCK_LENGTH, TRUCK_WIDTH, TRUCK_HEIGHT
+from utils.snapping import move_group
+from utils.workload import generate_packages
+
+QUERIES = 200
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [1000, 10000, 20000]
+    truck_dims = {'length': TRUCK_LENGTH, 'width': TRUCK_WIDTH, 'height': TRUCK_HEIGHT}
+    rng = random.Random(42)
+
+    print(f"{'packages':>9} {'ms/move':>8} {'no snap ms/move':>16} {'snapped':>8}")
+    for num_packages in sizes:
+        packages = generate_packages(num_packages, seed=42, scatter=True)
+        moves = [(pkg, round(rng.uniform(0, TRUCK_LENGTH - 1), 2) - pkg['x'],
+                  round(rng.uniform(0, TRUCK_WIDTH - 0.5), 2) - pkg['y'])
+                 for pkg in rng.sample(packages, min(QUERIES, num_packages))]
+
+        start = time.perf_counter()
+        snapped_moves = [move_group(packages, {pkg['id']}, dx, dy, truck_dims) for pkg, dx, dy in moves]
+        snap_ms = (time.perf_counter() - start) * 1000 / len(moves)
+
+        start = time.perf_counter()
+        plain_moves = [move_group(packages, {pkg['id']}, dx, dy, truck_dims, snap=False) for pkg, dx, dy in moves]
+        plain_ms = (time.perf_counter() - start) * 1000 / len(moves)
+
+        snapped = sum(1 for snapped_move, plain_move in zip(snapped_moves, plain_moves) if snapped_move != plain_move)
+        print(f"{num_packages:>9} {snap_ms:>8.1f} {plain_ms:>16.1f} {snapped:>8}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+"""
+Startup benchmark: import time and time-to-first-response of the Dash app
+
+Each run starts a fresh interpreter so module caches are cold. Exits with
+status 1 if the median exceeds STARTUP_IMPORT_BUDGET_MS or
+FIRST_RESPONSE_BUDGET_MS from config.py.
+
+Run from the repository root:
+    python -m scripts.bench_startup [--runs 5] [--profile]
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+from config import STARTUP_IMPORT_BUDGET_MS, FIRST_RESPONSE_BUDGET_MS
+
+# Runs inside the fresh interpreter and prints timings as JSON
+PROBE = r'''
+import json, sys, time
+start = time.perf_counter()
+import app
+imported = time.perf_counter()
+HEAVY = ('numpy', 'plotly.graph_objects', 'visualization.figures')
+heavy_at_import = [name for name in HEAVY if name in sys.modules]
+
+client = app.app.server.test_client()
+client.get('/')
+client.get('/_dash-layout')
+client.get('/_dash-dependencies')
+body = {
+    'output': '..truck-3d-graph.figure...render-skip.data..',
+    'outputs': [{'id': 'truck-3d-graph', 'property': 'figure'},
+                {'id': 'render-skip', 'property': 'data'}],
+    'inputs': [
+        {'id': 'packages-store', 'property': 'data', 'value': __import__('config').INITIAL_PACKAGES},
+        {'id': 'truck-dimensions', 'property': 'data', 'value': None}
+    ],
+    'changedPropIds': ['packages-store.data'],
+    'state': [{'id': 'render-skip', 'property': 'data', 'value': False},
+              {'id': 'expanded-pallets', 'property': 'data', 'value': []},
+              {'id': 'selected-package-id', 'property': 'data', 'value': None},
+              {'id': 'camera-store', 'property': 'data', 'value': None}]
+}
+response = client.post('/_dash-update-component', json=body)
+assert response.status_code == 200, response.status_code
+done = time.perf_counter()
+
+print(json.dumps({
+    'import_ms': (imported - start) * 1000,
+    'first_response_ms': (done - imported) * 1000,
+    'heavy_at_import': heavy_at_import,
+    'heavy_after_first_render': [name for name in HEAVY if name in sys.modules]
+}))
+'''
+
+
+def run_probe():
+    """Run the probe in a fresh interpreter and return its timings"""
+    result = subprocess.run([sys.executable, '-c', PROBE], capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def print_import_profile(top=15):
+    """Print the slowest imports of app.py using python -X importtime"""
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import app'],
+                            capture_output=True, text=True, check=True)
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        prefix, cumulative_us, module = line.split('|')
+        self_us = prefix.split(':')[1]
+        rows.append((int(cumulative_us), int(self_us), module.strip()))
+
+    print("\nSlowest imports (cumulative):")
+    for cumulative_us, self_us, module in sorted(rows, reverse=True)[:top]:
+        print(f"  {cumulative_us / 1000:8.1f} ms  (self {self_us / 1000:6.1f} ms)  {module}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5, help='number of cold starts to measure')
+    parser.add_argument('--profile', action='store_true', help='print the slowest imports')
+    args = parser.parse_args()
+
+    runs = [run_probe() for _ in range(args.runs)]
+    import_ms = statistics.median(run['import_ms'] for run in runs)
+    first_response_ms = statistics.median(run['first_response_ms'] for run in runs)
+
+    print(f"Cold starts measured: {args.runs}")
+    print(f"  import app.py:        {import_ms:7.0f} ms  (budget {STARTUP_IMPORT_BUDGET_MS} ms)")
+    print(f"  time to first render: {first_response_ms:7.0f} ms  (budget {FIRST_RESPONSE_BUDGET_MS} ms)")
+    print(f"  heavy modules at import:       {', '.join(runs[-1]['heavy_at_import']) or '-'}")
+    print(f"  heavy modules on first render: {', '.join(runs[-1]['heavy_after_first_render']) or '-'}")
+
+    if args.profile:
+        print_import_profile()
+
+    over_budget = import_ms > STARTUP_IMPORT_BUDGET_MS or first_response_ms > FIRST_RESPONSE_BUDGET_MS
+    if over_budget:
+        print("❌ Startup over budget")
+        sys.exit(1)
+    print("✅ Startup within budget")
+
+
+if __name__ == '__main__':
+    main()
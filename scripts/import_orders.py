@@ -0,0 +1,84 @@
+"""
+Bulk import a TM extract into the local SQLite order database
+
+Accepts CSV (comma, semicolon or tab separated) in either layout:
+  - one row per order:   order,packages      (packages in Name~W~L~H~Stackable|... format)
+  - one row per package: order,name,width,length,height,stackable
+
+Run from the repository root:
+    python -m scripts.import_orders extract.csv [--db data/orders.db]
+"""
+
+import argparse
+import csv
+import sys
+import time
+
+from config import ORDER_DB_PATH
+from utils.order_source import bulk_import
+
+
+ORDER_COLUMNS = ('order', 'order_number', 'ordernumber', 'order_id')
+PACKAGE_COLUMNS = ('name', 'width', 'length', 'height', 'stackable')
+
+
+def find_column(header, names):
+    """Return the index of the first header matching any of names, or None"""
+    normalized = [h.strip().lower() for h in header]
+    for name in names:
+        if name in normalized:
+            return normalized.index(name)
+    return None
+
+
+def read_extract(path):
+    """
+    Yield (order_number, package_string) tuples from a TM extract
+
+    Streams the file row by row, so extracts of any size can be imported.
+    """
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        dialect = csv.Sniffer().sniff(f.read(4096), delimiters=',;\t')
+        f.seek(0)
+        reader = csv.reader(f, dialect)
+        header = next(reader)
+
+        order_col = find_column(header, ORDER_COLUMNS)
+        if order_col is None:
+            raise ValueError(f"No order column found in header: {header}")
+
+        packages_col = find_column(header, ('packages',))
+        if packages_col is not None:
+            for row in reader:
+                yield row[order_col], row[packages_col]
+            return
+
+        columns = [find_column(header, (name,)) for name in PACKAGE_COLUMNS]
+        if None in columns:
+            missing = [name for name, col in zip(PACKAGE_COLUMNS, columns) if col is None]
+            raise ValueError(f"Missing package columns: {', '.join(missing)}")
+
+        for row in reader:
+            yield row[order_col], '~'.join(row[col].strip() for col in columns)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Bulk import a TM extract into the order database')
+    parser.add_argument('extract', help='CSV extract file')
+    parser.add_argument('--db', default=ORDER_DB_PATH, help=f'database file (default {ORDER_DB_PATH})')
+    parser.add_argument('--batch-size', type=int, default=10000, help='rows per transaction')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    try:
+        written = bulk_import(args.db, read_extract(args.extract), args.batch_size)
+    except (OSError, ValueError) as e:
+        print(f"❌ Import failed: {e}")
+        sys.exit(1)
+
+    elapsed = time.perf_counter() - start
+    print(f"✅ Imported {written:,} rows into {args.db} in {elapsed:.1f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,145 @@
+"""
+Render the 3D loading view of many orders to standalone HTML files
+
+Reads the same CSV extracts as scripts.import_orders (one row per order or
+one row per package) and writes one HTML file per order. All files share a
+single plotly.min.js in the output directory, so each file only holds its
+own figure.
+
+Run from the repository root:
+    python -m scripts.render_orders extract.csv --out renders [--place] [--workers 8]
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from config import COMPACT_FIGURE_THRESHOLD, TRUCK_LENGTH, TRUCK_WIDTH, TRUCK_HEIGHT
+from scripts.import_orders import read_extract
+
+
+def read_orders(path):
+    """
+    Group an extract into (order_number, package_string) per order
+
+    Orders keep the order of their first row in the extract.
+    """
+    orders = {}
+    for order_number, package_string in read_extract(path):
+        order_number = str(order_number).strip()
+        if order_number and package_string:
+            orders.setdefault(order_number, []).append(package_string)
+    return [(order_number, '|'.join(parts)) for order_number, parts in orders.items()]
+
+
+def safe_filename(order_number):
+    """File name for an order (anything but letters, digits, - and _ becomes _)"""
+    return re.sub(r'[^A-Za-z0-9_-]', '_', order_number) or 'order'
+
+
+def render_order(order_number, package_string, out_dir, place, truck_dims):
+    """
+    Parse one order and write its HTML view (runs in a worker process)
+
+    Returns:
+        dict: order, packages, unplaced, malformed, path
+    """
+    from callbacks.url_callbacks import parse_powerbi_packages_with_stats
+    from visualization.figures import create_figure_custom
+    from utils.placement import auto_place
+
+    with contextlib.redirect_stdout(io.StringIO()):  # the parser logs every order
+        packages, stats = parse_powerbi_packages_with_stats(package_string)
+
+    unplaced = []
+    if place:
+        packages, unplaced = auto_place(packages, truck_dims)
+
+    fig = create_figure_custom(packages, truck_dims=truck_dims,
+                               compact=len(packages) >= COMPACT_FIGURE_THRESHOLD)
+    fig.update_layout(title_text=f'Order {order_number} - {fig.layout.title.text}')
+
+    path = os.path.join(out_dir, f'{safe_filename(order_number)}.html')
+    fig.write_html(path, include_plotlyjs='directory', full_html=True)
+
+    return {
+        'order': order_number,
+        'packages': len(packages),
+        'unplaced': len(unplaced),
+        'malformed': stats['malformed'],
+        'path': path,
+    }
+
+
+def _render_task(args):
+    return render_order(*args)
+
+
+def write_plotlyjs(out_dir):
+    """Write the plotly.js bundle referenced by include_plotlyjs='directory'"""
+    from plotly.offline import get_plotlyjs
+
+    path = os.path.join(out_dir, 'plotly.min.js')
+    if not os.path.exists(path):
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(get_plotlyjs())
+
+
+def parse_truck(value):
+    """Parse a LxWxH truck size in meters"""
+    try:
+        length, width, height = (float(v) for v in value.lower().split('x'))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected LxWxH in meters, got '{value}'")
+    return {'length': length, 'width': width, 'height': height}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Render order loading views to HTML')
+    parser.add_argument('extract', help='CSV extract file (see scripts.import_orders)')
+    parser.add_argument('--out', default='renders', help='output directory (default renders)')
+    parser.add_argument('--place', action='store_true', help='suggest package positions (utils.placement)')
+    parser.add_argument('--truck', type=parse_truck,
+                        default={'length': TRUCK_LENGTH, 'width': TRUCK_WIDTH, 'height': TRUCK_HEIGHT},
+                        help=f'truck size LxWxH in meters (default {TRUCK_LENGTH}x{TRUCK_WIDTH}x{TRUCK_HEIGHT})')
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help='worker processes')
+    args = parser.parse_args()
+
+    try:
+        orders = read_orders(args.extract)
+    except (OSError, ValueError) as e:
+        print(f"❌ Could not read {args.extract}: {e}")
+        sys.exit(1)
+
+    os.makedirs(args.out, exist_ok=True)
+    write_plotlyjs(args.out)
+    print(f"🖨️ Rendering {len(orders):,} orders with {args.workers} workers into {args.out}/")
+
+    start = time.perf_counter()
+    tasks = [(order_number, package_string, args.out, args.place, args.truck)
+             for order_number, package_string in orders]
+    unplaced = malformed = 0
+    with ProcessPoolExecutor(max_workers=args.workers) as executor:
+        for i, result in enumerate(executor.map(_render_task, tasks, chunksize=4), 1):
+            unplaced += result['unplaced']
+            malformed += result['malformed']
+            if result['unplaced']:
+                print(f"⚠️ Order {result['order']}: {result['unplaced']} of "
+                      f"{result['packages'] + result['unplaced']} packages did not fit")
+            if i % 100 == 0:
+                print(f"   {i:,} / {len(orders):,} orders")
+
+    elapsed = time.perf_counter() - start
+    print(f"✅ Rendered {len(orders):,} orders in {elapsed:.1f}s "
+          f"({len(orders) / elapsed * 60:,.0f} orders/min)")
+    if malformed:
+        print(f"⚠️ {malformed:,} malformed package rows skipped")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,428 @@
+"""
+Replay planner sessions against the registered callbacks without a browser
+
+Calls the callbacks registered by callbacks.package_callbacks, ui_callbacks
+and url_callbacks directly, with the callback_context triggers and store
+states the Dash renderer would send. Outputs are fed back into the component
+state (Patch outputs included) and chained callbacks run in dependency
+order, so one step costs what the same interaction costs in the app.
+
+A session is a JSON list of steps:
+    [{"label": "load order", "set": {"url.href": "http://localhost:8050/?order=1001&packages=..."}},
+     {"click": {"type": "package-item", "index": 1}},
+     {"set": {"slider-x.value": 3.5}},
+     {"click": "rotate-btn"}]
+
+"set" changes component props, "click" increments n_clicks. Without a
+session file a synthetic session (load, select, grid click, slider drag,
+rotate, resize, align, undo/redo, delete) is replayed.
+
+Run from the repository root:
+    python -m scripts.replay_session [session.json] [--packages 500] [--repeat 3] [--save results.json]
+"""
+
+import argparse
+import contextlib
+import copy
+import io
+import json
+import statistics
+import sys
+import time
+from urllib.parse import quote
+
+from dash._callback import NoUpdate
+from dash._callback_context import context_value
+from dash._utils import AttributeDict, stringify_id, to_json
+from dash.exceptions import PreventUpdate
+
+REPLAY_MODULES = ('callbacks.package_callbacks', 'callbacks.ui_callbacks', 'callbacks.url_callbacks')
+
+MAX_CALLS_PER_STEP = 100  # guards against callback loops
+
+
+def parse_prop(prop_id):
+    """Split 'component.prop' (or '{"type":...}.prop') into (id string, prop)"""
+    component_id, _, prop = prop_id.rpartition('.')
+    return component_id, prop
+
+
+def _browser_id(component_id):
+    """Dict id as the browser sends it (JSON.stringify writes 2.0 as 2)"""
+    return {key: int(value) if isinstance(value, float) and value.is_integer() else value
+            for key, value in component_id.items()}
+
+
+def _id_string(component_id):
+    return stringify_id(_browser_id(component_id)) if isinstance(component_id, dict) else component_id
+
+
+def _split_outputs(output_key):
+    """Output (id, prop) pairs of a callback_map key (allow_duplicate hashes removed)"""
+    multi = output_key.startswith('..')
+    parts = output_key[2:-2].split('...') if multi else [output_key]
+    return [parse_prop(part.split('@')[0]) for part in parts], multi
+
+
+def apply_patch(value, patch):
+    """Apply a serialized dash.Patch to a JSON value, as the renderer does"""
+    for operation in patch['operations']:
+        name, location, params = operation['operation'], operation['location'], operation['params']
+        if not location and name == 'Assign':
+            value = params['value']
+            continue
+        if value is None:
+            value = {} if location and isinstance(location[0], str) else []
+
+        if name in ('Assign', 'Delete', 'Add', 'Sub', 'Mul', 'Div'):
+            parent = value
+            for key in location[:-1]:
+                parent = parent[key]
+            key = location[-1]
+            if name == 'Assign':
+                parent[key] = params['value']
+            elif name == 'Delete':
+                del parent[key]
+            elif name == 'Add':
+                parent[key] += params['value']
+            elif name == 'Sub':
+                parent[key] -= params['value']
+            elif name == 'Mul':
+                parent[key] *= params['value']
+            else:
+                parent[key] /= params['value']
+            continue
+
+        target = value
+        for key in location:
+            target = target[key]
+        if name == 'Merge':
+            target.update(params['value'])
+        elif name == 'Append':
+            target.append(params['value'])
+        elif name == 'Extend':
+            target.extend(params['value'])
+        elif name == 'Prepend':
+            target.insert(0, params['value'])
+        elif name == 'Insert':
+            target.insert(params['index'], params['value'])
+        elif name == 'Remove':
+            target.remove(params['value'])
+        elif name == 'Clear':
+            target.clear()
+        elif name == 'Reverse':
+            target.reverse()
+        else:
+            raise ValueError(f"Unsupported patch operation '{name}'")
+    return value
+
+
+def _is_patch(value):
+    return isinstance(value, dict) and value.get('__dash_patch_update') == '__dash_patch_update'
+
+
+def _ignore_progress(value):
+    """set_progress stand-in for background callbacks run by the replay"""
+
+
+class SessionReplay:
+    """
+    Headless stand-in for the Dash renderer
+
+    Keeps every component prop as the JSON the browser would hold, fires the
+    callbacks whose inputs changed and records the server time and request/
+    response size of each call.
+    """
+
+    def __init__(self, app, modules=REPLAY_MODULES):
+        self.callbacks = []
+        initial = {item['output']: item.get('prevent_initial_call') for item in app._callback_list}
+        for output_key, spec in app.callback_map.items():
+            # Clientside callbacks have no Python function and run in the browser
+            func = getattr(spec.get('callback'), '__wrapped__', None)
+            if func is None or func.__module__ not in modules:
+                continue
+            # Background callbacks run inline, as they do without a job manager
+            background = spec.get('background') or {}
+            outputs, multi = _split_outputs(output_key)
+            self.callbacks.append({
+                'name': func.__name__,
+                'func': func,
+                'key': output_key,
+                'inputs': [(item['id'], item['property']) for item in spec['inputs']],
+                'state': [(item['id'], item['property']) for item in spec['state']],
+                'outputs': outputs,
+                'multi': multi,
+                'progress': bool(background.get('progress')),
+                'initial': not (initial.get(output_key) or app.config.prevent_initial_callbacks),
+            })
+
+        self.props = {}
+        self.owners = {}  # dict-id components -> output that rendered them
+        self._register(json.loads(to_json(app.layout)), owner=None)
+
+    # Component state
+
+    def _register(self, tree, owner):
+        """Record the props of every component with an id in a JSON component tree"""
+        if isinstance(tree, list):
+            for child in tree:
+                self._register(child, owner)
+            return
+        if not isinstance(tree, dict) or 'props' not in tree:
+            return
+        props = tree['props']
+        if 'id' in props:
+            component_id = _id_string(props['id'])
+            if isinstance(props['id'], dict):
+                self.owners[component_id] = (owner, _browser_id(props['id']), list(props))
+            for prop, value in props.items():
+                self.props[(component_id, prop)] = value
+        self._register(props.get('children'), owner)
+
+    def _unregister(self, owner):
+        for component_id in [cid for cid, entry in self.owners.items() if entry[0] == owner]:
+            _, _, props = self.owners.pop(component_id)
+            for prop in props:
+                self.props.pop((component_id, prop), None)
+
+    def _matches(self, pattern_id):
+        """Dict ids of rendered components matching an ALL pattern, in render order"""
+        pattern = json.loads(pattern_id)
+        matches = []
+        for _, component_id, _ in self.owners.values():
+            if component_id.keys() == pattern.keys() and all(
+                    value == ['ALL'] or component_id[key] == value for key, value in pattern.items()):
+                matches.append(component_id)
+        return matches
+
+    def _value(self, component_id, prop):
+        if component_id.startswith('{'):
+            return [self.props.get((_id_string(match), prop)) for match in self._matches(component_id)]
+        return self.props.get((component_id, prop))
+
+    def _triggered_by(self, callback, prop_id):
+        """Whether a changed 'component.prop' is one of a callback's inputs"""
+        component_id, prop = parse_prop(prop_id)
+        for input_id, input_prop in callback['inputs']:
+            if input_prop != prop:
+                continue
+            if input_id == component_id:
+                return True
+            if input_id.startswith('{') and component_id.startswith('{'):
+                if any(_id_string(match) == component_id for match in self._matches(input_id)):
+                    return True
+        return False
+
+    # Running callbacks
+
+    def _call(self, callback, triggered):
+        """Run one callback and apply its outputs; returns (record, changed prop ids)"""
+        inputs = [self._value(*item) for item in callback['inputs']]
+        state = [self._value(*item) for item in callback['state']]
+        request = to_json({'inputs': inputs, 'state': state, 'changedPropIds': triggered})
+        args = json.loads(request)  # fresh copies, like a decoded request body
+
+        context_value.set(AttributeDict(
+            triggered_inputs=[{'prop_id': prop_id, 'value': self.props.get(parse_prop(prop_id))}
+                              for prop_id in triggered],
+            input_values={f'{cid}.{prop}': value for (cid, prop), value in zip(callback['inputs'], inputs)},
+            state_values={f'{cid}.{prop}': value for (cid, prop), value in zip(callback['state'], state)},
+            updated_props={},
+        ))
+        record = {'callback': callback['name'], 'trigger': triggered, 'request_bytes': len(request)}
+        start = time.perf_counter()
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                set_progress = [_ignore_progress] if callback['progress'] else []
+                result = callback['func'](*set_progress, *args['inputs'], *args['state'])
+            values = list(result) if callback['multi'] else [result]
+            response = {f'{cid}.{prop}': value for (cid, prop), value in zip(callback['outputs'], values)
+                        if not isinstance(value, NoUpdate)}
+            payload = to_json(response)
+        except PreventUpdate:
+            response, payload, record['prevented'] = {}, '', True
+        except Exception as e:  # report and keep replaying
+            response, payload, record['error'] = {}, '', f'{type(e).__name__}: {e}'
+        finally:
+            context_value.set({})
+        record['ms'] = (time.perf_counter() - start) * 1000
+        record['response_bytes'] = len(payload)
+
+        changed = []
+        for prop_id, value in (json.loads(payload) if payload else {}).items():
+            key = parse_prop(prop_id)
+            if _is_patch(value):
+                value = apply_patch(copy.deepcopy(self.props.get(key)), value)
+            if key[1] == 'children':
+                self._unregister(prop_id)
+                self._register(value, owner=prop_id)
+            self.props[key] = value
+            changed.append(prop_id)
+        return record, changed
+
+    def _run(self, pending):
+        """Run pending callbacks (callback index -> triggering prop ids) and everything they chain to"""
+        records = []
+        while pending:
+            if len(records) >= MAX_CALLS_PER_STEP:
+                raise RuntimeError(f"More than {MAX_CALLS_PER_STEP} callbacks in one step - callback loop?")
+
+            # Like the renderer, wait for callbacks whose inputs another pending callback still sets
+            outputs = {index: {f'{cid}.{prop}' for cid, prop in self.callbacks[index]['outputs']}
+                       for index in pending}
+            ready = [index for index in pending
+                     if not any(self._triggered_by(self.callbacks[index], prop_id)
+                                for other, props in outputs.items() if other != index for prop_id in props)]
+            index = (ready or list(pending))[0]
+
+            record, changed = self._call(self.callbacks[index], pending.pop(index))
+            records.append(record)
+            for prop_id in changed:
+                for other, callback in enumerate(self.callbacks):
+                    if self._triggered_by(callback, prop_id):
+                        pending.setdefault(other, [])
+                        if prop_id not in pending[other]:
+                            pending[other].append(prop_id)
+        return records
+
+    def load(self):
+        """Fire the initial callbacks of a page load"""
+        return self._run({index: [] for index, callback in enumerate(self.callbacks) if callback['initial']})
+
+    def step(self, step):
+        """Apply one session step and run the callbacks it triggers"""
+        changed = []
+        for prop_id, value in step.get('set', {}).items():
+            self.props[parse_prop(prop_id)] = value
+            changed.append(prop_id)
+        if 'click' in step:
+            prop_id = f"{_id_string(step['click'])}.n_clicks"
+            key = parse_prop(prop_id)
+            self.props[key] = (self.props.get(key) or 0) + 1
+            changed.append(prop_id)
+
+        pending = {}
+        for prop_id in changed:
+            for index, callback in enumerate(self.callbacks):
+                if self._triggered_by(callback, prop_id):
+                    pending.setdefault(index, []).append(prop_id)
+        return self._run(pending)
+
+
+def step_label(step):
+    if 'label' in step:
+        return step['label']
+    if 'click' in step:
+        return f"click {_id_string(step['click'])}"
+    return 'set ' + ', '.join(f'{prop_id}={value}' for prop_id, value in step.get('set', {}).items())[:60]
+
+
+def synthetic_session(num_packages, seed=7):
+    """A typical planning session on a synthetic order of num_packages packages"""
+    from utils.workload import generate_package_string
+
+    href = f"http://localhost:8050/?order=REPLAY&packages={quote(generate_package_string(num_packages, seed))}"
+    steps = [
+        {'label': 'load order', 'set': {'url.href': href}},
+        {'label': 'select package', 'click': {'type': 'package-item', 'index': 1}},
+        {'label': 'click grid cell', 'click': {'type': 'grid-cell', 'x': 2.0, 'y': 1.0}},
+    ]
+    steps += [{'label': f'drag slider x ({x:.1f})', 'set': {'slider-x.value': x}}
+              for x in (2.1, 2.2, 2.3, 2.4, 2.5)]
+    steps += [
+        {'label': 'rotate', 'click': 'rotate-btn'},
+        {'label': 'resize width', 'set': {'input-width.value': 1.1}},
+        {'label': 'align floor', 'click': 'align-floor-btn'},
+        {'label': 'undo', 'click': 'undo-btn'},
+        {'label': 'undo', 'click': 'undo-btn'},
+        {'label': 'redo', 'click': 'redo-btn'},
+        {'label': 'select package', 'click': {'type': 'package-item', 'index': 2}},
+        {'label': 'delete package', 'click': {'type': 'delete-btn', 'index': 2}},
+    ]
+    return steps
+
+
+def replay(steps, repeat=1):
+    """
+    Replay a session repeat times on fresh app state
+
+    Returns:
+        list: One dict per step (label, calls, ms, request/response bytes),
+              ms being the best of the repeats
+    """
+    from app import app
+    import utils.event_log
+
+    utils.event_log.EVENT_LOG_ENABLED = False  # don't fill data/events with replays
+
+    results = None
+    for _ in range(repeat):
+        harness = SessionReplay(app)
+        runs = [('page load', harness.load())] + [(step_label(step), harness.step(step)) for step in steps]
+        if results is None:
+            results = [{'label': label, 'ms': float('inf'), 'calls': records} for label, records in runs]
+        for result, (_, records) in zip(results, runs):
+            ms = sum(record['ms'] for record in records)
+            if ms < result['ms']:
+                result.update(ms=ms, calls=records)
+
+    for result in results:
+        result['request_bytes'] = sum(record['request_bytes'] for record in result['calls'])
+        result['response_bytes'] = sum(record['response_bytes'] for record in result['calls'])
+    return results
+
+
+def print_report(results):
+    print(f"{'step':<28} {'calls':>5} {'server ms':>10} {'request KB':>11} {'response KB':>12}  callbacks")
+    for result in results:
+        names = ', '.join(record['callback'] + ('!' if 'error' in record else '')
+                          for record in result['calls'] if not record.get('prevented'))
+        print(f"{result['label'][:28]:<28} {len(result['calls']):>5} {result['ms']:>10.1f} "
+              f"{result['request_bytes'] / 1024:>11.1f} {result['response_bytes'] / 1024:>12.1f}  {names}")
+        for record in result['calls']:
+            if 'error' in record:
+                print(f"   ❌ {record['callback']}: {record['error']}")
+
+    per_callback = {}
+    for result in results:
+        for record in result['calls']:
+            per_callback.setdefault(record['callback'], []).append(record)
+    print(f"\n{'callback':<32} {'calls':>5} {'mean ms':>8} {'max ms':>8} {'max response KB':>16}")
+    for name, records in sorted(per_callback.items(), key=lambda item: -sum(r['ms'] for r in item[1])):
+        print(f"{name:<32} {len(records):>5} {statistics.mean(r['ms'] for r in records):>8.1f} "
+              f"{max(r['ms'] for r in records):>8.1f} {max(r['response_bytes'] for r in records) / 1024:>16.1f}")
+    total = sum(result['ms'] for result in results)
+    print(f"\n⏱️ {len(results)} steps, {total:.0f} ms server time, "
+          f"{sum(result['response_bytes'] for result in results) / 1024:,.0f} KB sent to the browser")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Replay a planner session against the app callbacks')
+    parser.add_argument('session', nargs='?', help='session JSON file (default: synthetic session)')
+    parser.add_argument('--packages', type=int, default=200, help='synthetic order size (default 200)')
+    parser.add_argument('--repeat', type=int, default=3, help='replays per step, best time kept (default 3)')
+    parser.add_argument('--save', help='write per-step results as JSON (for comparing runs)')
+    args = parser.parse_args()
+
+    if args.session:
+        try:
+            with open(args.session, encoding='utf-8') as f:
+                steps = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"❌ Could not read session {args.session}: {e}")
+            sys.exit(1)
+    else:
+        steps = synthetic_session(args.packages)
+
+    results = replay(steps, args.repeat)
+    print_report(results)
+
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=1)
+        print(f"💾 Results saved to {args.save}")
+
+
+if __name__ == '__main__':
+    main()
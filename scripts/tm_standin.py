@@ -0,0 +1,109 @@
+"""
+Local stand-in for the TM order HTTP API
+
+Serves GET /orders/<order_number> as {"order_number": ..., "packages": ...}
+with configurable latency and failure rate, so the async fetch layer can be
+exercised without access to the real TM. Orders come from a SQLite order
+database if one is given, otherwise synthetic packages are generated
+deterministically from the order number.
+
+Run from the repository root:
+    python -m scripts.tm_standin [--port 8060] [--latency 0.1] [--fail-rate 0.1] [--db data/orders.db]
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+from utils.order_source import SQLiteOrderSource
+from utils.workload import generate_package_string
+
+
+def synthetic_packages(order_number):
+    """Deterministic 1-8 package order for a numeric order number"""
+    return generate_package_string(random.Random(order_number).randint(1, 8), seed=order_number)
+
+
+class TMStandInHandler(BaseHTTPRequestHandler):
+    """Request handler - server attributes configure latency, failures and data"""
+
+    protocol_version = 'HTTP/1.1'  # keep-alive, like the real TM
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.request_count += 1
+
+        time.sleep(server.latency)
+
+        parts = self.path.strip('/').split('/')
+        if len(parts) != 2 or parts[0] != 'orders':
+            return self.send_json(404, {'error': 'not found'})
+
+        if random.random() < server.fail_rate:
+            return self.send_json(503, {'error': 'temporarily unavailable'})
+
+        order_number = parts[1]
+        if server.source is not None:
+            packages = server.source.get_packages(order_number)
+        else:
+            packages = synthetic_packages(order_number) if order_number.isdigit() else None
+
+        if not packages:
+            return self.send_json(404, {'error': f'order {order_number} not found'})
+        self.send_json(200, {'order_number': order_number, 'packages': packages})
+
+    def send_json(self, status, payload):
+        body = json.dumps(payload).encode()
+        try:
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # client gave up (timeout) - expected when testing timeouts
+
+    def log_message(self, format, *args):
+        pass  # keep benchmark output readable
+
+
+def start_standin(port=0, latency=0.1, fail_rate=0.0, db_path=None):
+    """
+    Start the stand-in in a background thread
+
+    Returns:
+        ThreadingHTTPServer: call .shutdown() to stop; .server_port has the port
+    """
+    server = ThreadingHTTPServer(('127.0.0.1', port), TMStandInHandler)
+    server.daemon_threads = True
+    server.latency = latency
+    server.fail_rate = fail_rate
+    server.source = SQLiteOrderSource(db_path) if db_path else None
+    server.request_count = 0
+    server.lock = threading.Lock()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Local stand-in for the TM order API')
+    parser.add_argument('--port', type=int, default=8060)
+    parser.add_argument('--latency', type=float, default=0.1, help='seconds added to every response')
+    parser.add_argument('--fail-rate', type=float, default=0.0, help='fraction of 503 responses')
+    parser.add_argument('--db', help='serve orders from this SQLite order database')
+    args = parser.parse_args()
+
+    server = start_standin(args.port, args.latency, args.fail_rate, args.db)
+    print(f"🚚 TM stand-in on http://127.0.0.1:{server.server_port}/orders/<order_number>")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
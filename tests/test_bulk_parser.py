@@ -0,0 +1,36 @@
+"""The vectorized bulk parser must give the same packages and stats as the row-by-row parser"""
+
+import json
+
+import pytest
+
+import callbacks.url_callbacks as url_callbacks
+from scripts.bench_parser import make_payload
+from utils.bulk_parser import to_float_column
+
+PAYLOADS = [
+    'KOLLI A~1,2~0,8~1,0~1|KOLLI B~ ~0.8~1.0~0|SROR~1.5~0.4~0.3~1',
+    'EMBV1~ 1.2 ~0.8~1.0~1|EMBV2~1.2~~1.0~0|EMBV2~1.2~0.8~1.0~1~',
+    'KOLLI~nan~inf~1e3~1|KOLLI~1.2~0.8~1.0~1~2|KOLLI~1.2~0.8~1.0~1~x|KOLLI~1.2~0.8~-~1',
+    'PALLET~1.2~0.8~1.0~1||PALLET~1.2~0.8~  ~1|PALLET~1.2~0.8',
+]
+
+
+def parse_both(payload, monkeypatch):
+    """(row, bulk) results of both parsers, as JSON so NaN and key order compare exactly"""
+    monkeypatch.setattr(url_callbacks, 'BULK_PARSE_THRESHOLD', float('inf'))
+    row = url_callbacks.parse_powerbi_packages_with_stats(payload)
+    bulk = url_callbacks.parse_powerbi_packages_bulk(payload)
+    return json.dumps(row), json.dumps(bulk)
+
+
+@pytest.mark.parametrize('payload', PAYLOADS + [make_payload(2000)])
+def test_bulk_matches_row_parser(payload, monkeypatch):
+    row, bulk = parse_both(payload, monkeypatch)
+    assert row == bulk
+
+
+def test_blank_dimension_is_rejected():
+    floats, bad = to_float_column(['1.5', ' ', '2'])
+    assert bad.tolist() == [False, True, False]
+    assert floats[0] == 1.5 and floats[2] == 2.0
@@ -0,0 +1,91 @@
+"""Background job layer for long-running callbacks (Dash background callbacks)"""
+
+from config import BACKGROUND_CACHE_DIR, BACKGROUND_CACHE_EXPIRE, BACKGROUND_CACHE_VERSION
+
+_managers = None
+
+
+def get_background_managers():
+    """
+    Return the (plain, cached) background callback managers
+
+    Both run jobs in separate processes through a diskcache on disk, so a
+    long job never holds a request thread and any worker can report its
+    progress. The cached manager also stores results keyed by a hash of
+    the callback source and its inputs, so an identical job returns the
+    stored result instead of running again.
+
+    Returns (None, None) if diskcache/multiprocess/psutil are not installed,
+    in which case background_callback falls back to plain callbacks.
+    """
+    global _managers
+    if _managers is None:
+        try:
+            import diskcache
+            from dash import DiskcacheManager
+
+            cache = diskcache.Cache(BACKGROUND_CACHE_DIR)
+            _managers = (
+                DiskcacheManager(cache),
+                DiskcacheManager(cache, cache_by=[lambda: BACKGROUND_CACHE_VERSION],
+                                 expire=BACKGROUND_CACHE_EXPIRE),
+            )
+        except ImportError as e:
+            print(f"⚠️ Background callbacks unavailable ({e}) - long jobs run in the request thread")
+            _managers = (None, None)
+    return _managers
+
+
+def background_callback(app, outputs, inputs, state=(), progress=None, running=None,
+                        cancel=None, cached=False, cache_args_to_ignore=None, **kwargs):
+    """
+    Register a callback that runs as a background job
+
+    Works like app.callback. If progress is given, the callback receives a
+    set_progress function as its first argument.
+
+    Args:
+        app: Dash app
+        outputs, inputs, state: As for app.callback
+        progress: Output(s) updated by set_progress while the job runs
+        running: [(Output, value_while_running, value_when_done), ...]
+        cancel: Input(s) that cancel the running job when they change
+        cached: Reuse results of identical jobs (only for pure computations -
+                the job must not have side effects the caller relies on)
+        cache_args_to_ignore: Positions of callback arguments left out of the
+                              cache key (e.g. a button's n_clicks)
+        **kwargs: Passed to app.callback (prevent_initial_call, ...)
+    """
+    plain_manager, cached_manager = get_background_managers()
+    manager = cached_manager if cached else plain_manager
+
+    def decorator(func):
+        if manager is not None:
+            return app.callback(
+                outputs, inputs, list(state),
+                background=True,
+                manager=manager,
+                progress=progress,
+                running=running,
+                cancel=cancel,
+                cache_args_to_ignore=cache_args_to_ignore,
+                **kwargs
+            )(func)
+
+        # No manager - run in the request thread, progress is only logged
+        if progress is None:
+            return app.callback(outputs, inputs, list(state), **kwargs)(func)
+
+        def run_inline(*args):
+            return func(_log_progress, *args)
+
+        run_inline.__name__ = func.__name__
+        return app.callback(outputs, inputs, list(state), **kwargs)(run_inline)
+
+    return decorator
+
+
+def _log_progress(value):
+    """set_progress stand-in used when callbacks run inline"""
+    if isinstance(value, str):
+        print(f"⏳ {value}")
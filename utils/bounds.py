@@ -0,0 +1,169 @@
+"""Lower bounds on loading length and number of trucks, to judge and stop packing searches"""
+
+import math
+from bisect import bisect_left, bisect_right
+from config import TRUCK_LENGTH, TRUCK_WIDTH, TRUCK_HEIGHT
+from utils.placement import footprint_options
+
+BOUND_TOLERANCE = 1e-9  # relative slack so float sums do not round a bound up
+
+
+def _ceil(value):
+    return math.ceil(value - BOUND_TOLERANCE * max(1.0, abs(value)))
+
+
+def martello_vigo_l2(sizes, capacity):
+    """
+    Martello-Vigo L2 lower bound on the bins needed for 1D items
+
+    For every threshold a <= capacity/2, items larger than capacity - a each
+    need their own bin, items in (capacity/2, capacity - a] too, and items
+    in [a, capacity/2] can only use what those bins leave free plus new bins.
+
+    Args:
+        sizes: Item sizes (each <= capacity)
+        capacity: Bin size
+
+    Returns:
+        int: Lower bound on the number of bins (0 for no items)
+    """
+    if not sizes:
+        return 0
+    sizes = sorted(sizes)
+    prefix = [0.0]
+    for size in sizes:
+        prefix.append(prefix[-1] + size)
+    half = capacity / 2
+
+    def total(lo, hi):  # sum of sizes[lo:hi]
+        return prefix[hi] - prefix[lo]
+
+    n = len(sizes)
+    best = _ceil(prefix[-1] / capacity)  # L1
+    half_end = bisect_right(sizes, half)  # sizes[:half_end] <= capacity/2
+    for threshold in sorted(set(sizes[:half_end])) or [0.0]:
+        big = bisect_right(sizes, capacity - threshold)  # sizes[big:] > capacity - threshold
+        j2_count = big - half_end
+        j3_start = bisect_left(sizes, threshold)
+        free = j2_count * capacity - total(half_end, big)
+        extra = max(0, _ceil((total(j3_start, half_end) - free) / capacity))
+        best = max(best, (n - half_end) + extra)
+    return best
+
+
+def effective_width(sizes, width):
+    """
+    Widest the truck can be filled across with packages of these sizes
+
+    Any slice across the truck is covered by packages side by side, so by
+    at most the largest sum of package sizes that fits the width (each size
+    may be used any number of times). Sizes are rounded to millimeters.
+
+    Args:
+        sizes: Package footprint sizes across the truck (m), any orientation
+        width: Truck width (m)
+
+    Returns:
+        float: Usable width (m), at most width
+    """
+    capacity = int(round(width * 1000))
+    reachable = 1  # bit n set = n mm can be filled exactly
+    full = (1 << (capacity + 1)) - 1
+    for size in sorted({int(round(size * 1000)) for size in sizes}):
+        if not 0 < size <= capacity:
+            continue
+        for _ in range(capacity // size):
+            extended = reachable | ((reachable << size) & full)
+            if extended == reachable:
+                break
+            reachable = extended
+    return (reachable.bit_length() - 1) / 1000 or width
+
+
+def lower_bounds(packages, truck_dims=None):
+    """
+    Lower bounds on the loading length and the number of trucks
+
+    Three bounds, each valid for the stacking rules of auto_place (only
+    stackable packages are stacked, on a stackable package whose top they
+    fit within):
+
+    - volume: total volume over the truck cross-section
+    - floor: packages that are not stackable, or taller than half the truck,
+      cannot share floor area with each other, so their footprints plus the
+      volume of the rest that does not fit above the tall stackable ones
+      need floor space, over the effective_width the packages can fill
+    - wide: packages wider than half the truck in every orientation that
+      also cannot be stacked on each other need their own stretch of truck
+      length; for trucks these lengths are bin-packed (Martello-Vigo L2)
+
+    Packages that do not fit the truck in any orientation are counted in
+    'oversize' and left out of the bounds.
+
+    Args:
+        packages: List of package dicts
+        truck_dims: Dict with 'length', 'width', 'height' (defaults from config)
+
+    Returns:
+        dict: min_length (m), min_trucks, the individual bounds
+              (length_volume, length_floor, length_wide, trucks_volume,
+              trucks_floor, trucks_wide) and oversize
+    """
+    truck_dims = truck_dims or {'length': TRUCK_LENGTH, 'width': TRUCK_WIDTH, 'height': TRUCK_HEIGHT}
+    length, width, height = truck_dims['length'], truck_dims['width'], truck_dims['height']
+
+    volume = 0.0
+    exclusive_area = 0.0  # footprints that no other such package can overlap
+    rest_volume = 0.0  # short stackable packages
+    room_above = 0.0  # space above tall stackable packages
+    wide_lengths = []
+    sides = set()
+    oversize = 0
+
+    for pkg in packages:
+        depth = pkg['depth']
+        options = [(fx, fy) for fx, fy, _ in footprint_options(pkg) if fx <= length and fy <= width]
+        if depth > height or not options:
+            oversize += 1
+            continue
+        area = pkg['width'] * pkg['height']
+        volume += area * depth
+        sides.update(fy for _, fy in options)
+
+        stackable = pkg.get('stackable', False)
+        tall = depth > height / 2
+        if stackable and not tall:
+            rest_volume += area * depth
+            continue
+        exclusive_area += area
+        if stackable:
+            room_above += area * (height - depth)
+        if all(fy > width / 2 for _, fy in options):
+            wide_lengths.append(min(fx for fx, _ in options))
+
+    floor_area = exclusive_area + max(0.0, rest_volume - room_above) / height
+    usable_width = effective_width(sides, width)
+    bounds = {
+        'length_volume': round(volume / (width * height), 3),
+        'length_floor': round(floor_area / usable_width, 3),
+        'length_wide': round(sum(wide_lengths), 3),
+        'trucks_volume': _ceil(volume / (length * width * height)),
+        'trucks_floor': _ceil(floor_area / (length * usable_width)),
+        'trucks_wide': martello_vigo_l2(wide_lengths, length),
+        'oversize': oversize,
+    }
+    bounds['min_length'] = max(bounds['length_volume'], bounds['length_floor'], bounds['length_wide'])
+    bounds['min_trucks'] = max(bounds['trucks_volume'], bounds['trucks_floor'], bounds['trucks_wide'])
+    return bounds
+
+
+def optimality_gap(value, bound):
+    """How far a plan value is above its lower bound, as a fraction of the value (0 = optimal)"""
+    if value <= 0:
+        return 0.0
+    return max(0.0, (value - bound) / value)
+
+
+def bound_reached(value, bound, tolerance=0.001):
+    """Whether a plan value is at its lower bound, so searching further cannot improve it"""
+    return value <= bound + tolerance
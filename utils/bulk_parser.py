@@ -0,0 +1,229 @@
+"""Vectorized bulk parser for the Name~Width~Length~Height~Stackable[~Stop] package format"""
+
+import re
+import warnings
+import numpy as np
+
+FIELD_COUNT = 5
+STOP_FIELD_COUNT = 6  # optional delivery stop as a 6th field
+STACKABLE_VALUES = ['1', 'True', 'true', 'TRUE']
+
+# Characters that can appear in a plain decimal/nan/inf literal - anything
+# else sends the column down the exact per-value float() path
+_NUMERIC_CHARS = str.maketrans('', '', '0123456789.eE+- nNaAiIfFtTyY')
+
+# A blank entry in a joined column: np.fromstring reads it as -1 without a
+# warning, where float() rejects it
+_BLANK_ENTRY = re.compile(r'(?:^|;) *(?:;|$)')
+
+
+def tokenize_packages(package_string):
+    """
+    Split a whole payload into rows and a flat token list in one pass
+
+    Rows with the wrong number of fields are set aside so the remaining rows
+    can be split with a single str.split over the joined payload. If any row
+    has a stop field, rows without one get an empty stop so every row has
+    the same number of tokens.
+
+    Returns:
+        tuple: (row_numbers, tokens, rejected, field_count) where tokens holds
+               field_count tokens per accepted row and rejected is a list of
+               error dicts
+    """
+    rows = np.array(package_string.split('|'), dtype=str)
+
+    # Skip empty strings (from double separators)
+    present = np.char.str_len(np.char.strip(rows)) > 0
+    field_counts = np.char.count(rows, '~') + 1
+    valid = present & ((field_counts == FIELD_COUNT) | (field_counts == STOP_FIELD_COUNT))
+
+    rejected = [
+        {
+            'row': int(index) + 1,
+            'raw': str(rows[index])[:200],
+            'reason': f'expected {FIELD_COUNT} or {STOP_FIELD_COUNT} fields, got {field_counts[index]}'
+        }
+        for index in np.flatnonzero(present & ~valid)
+    ]
+
+    accepted = rows[valid]
+    field_count = FIELD_COUNT
+    if (field_counts[valid] == STOP_FIELD_COUNT).any():
+        field_count = STOP_FIELD_COUNT
+        accepted = np.where(field_counts[valid] == FIELD_COUNT, np.char.add(accepted, '~'), accepted)
+
+    accepted = accepted.tolist()
+    tokens = '~'.join(accepted).split('~') if accepted else []
+    return np.flatnonzero(valid) + 1, tokens, rejected, field_count
+
+
+def to_float_column(values):
+    """
+    Convert a column of decimal strings (comma or dot) to float64
+
+    Plain decimal columns are converted by NumPy in one call over the joined
+    column (same correctly rounded result as float()). Columns containing
+    anything else - other characters, blank entries, or text NumPy warns
+    about - fall back to per-value float(), which also finds the bad entries.
+
+    Returns:
+        tuple: (floats, bad_mask)
+    """
+    text = ';'.join(values).replace(',', '.')
+
+    if text.translate(_NUMERIC_CHARS) == ';' * (len(values) - 1) and not _BLANK_ENTRY.search(text):
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter('always')  # unparsable text may only warn
+            try:
+                floats = np.fromstring(text, sep=';')
+            except ValueError:
+                floats = None
+        if floats is not None and not caught and len(floats) == len(values):
+            return floats, np.zeros(len(values), dtype=bool)
+
+    floats = np.full(len(values), np.nan)
+    bad = np.zeros(len(values), dtype=bool)
+    for i, value in enumerate(values):
+        try:
+            floats[i] = float(value.replace(',', '.'))
+        except ValueError:
+            bad[i] = True
+    return floats, bad
+
+
+def to_stop_column(values):
+    """
+    Convert a column of stop numbers to int64 (empty means no stop)
+
+    Plain digit columns are converted by NumPy in one call, anything else
+    per value with int(), which also finds the bad entries.
+
+    Returns:
+        tuple: (stops, has_stop, bad_mask)
+    """
+    stripped = np.char.strip(np.array(values, dtype=str))
+    has_stop = np.char.str_len(stripped) > 0
+    present = stripped[has_stop]
+
+    stops = np.zeros(len(values), dtype=np.int64)
+    bad = np.zeros(len(values), dtype=bool)
+    if ''.join(present.tolist()).isascii() and np.char.isdigit(present).all():
+        stops[has_stop] = present.astype(np.int64)
+        return stops, has_stop, bad
+
+    for i in np.flatnonzero(has_stop):
+        try:
+            stops[i] = int(stripped[i])
+        except ValueError:
+            bad[i] = True
+    return stops, has_stop, bad
+
+
+def first_words(names):
+    """
+    First whitespace-separated word of each (already stripped) name
+
+    Splits on spaces in one NumPy call when the names contain no other
+    whitespace, otherwise falls back to str.split per name.
+    """
+    if ''.join(names.tolist()).isprintable():  # space is the only printable whitespace
+        return np.char.partition(names, ' ')[..., 0] if len(names) else names
+    return np.array([(name.split() or [''])[0] for name in names.tolist()], dtype=str)
+
+
+def parse_packages_bulk(package_string, type_colors, default_color):
+    """
+    Parse a package payload into a columnar package table
+
+    Args:
+        package_string: Name~Width~Length~Height~Stackable[~Stop]|Name~... payload
+        type_colors: Dict of package type (first word of name) -> color
+        default_color: Color for unknown package types
+
+    Returns:
+        tuple: (table, rejected) - table is a dict of columns ('row', 'name',
+               'width', 'depth', 'height', 'stackable', 'color', 'stop') with one
+               entry per accepted package ('stop' is None for packages
+               without a stop), rejected is a list of
+               {'row', 'raw', 'reason'} dicts
+    """
+    row_numbers, tokens, rejected, field_count = tokenize_packages(package_string or '')
+
+    names = tokens[0::field_count]
+    width, bad_width = to_float_column(tokens[1::field_count])
+    depth, bad_depth = to_float_column(tokens[2::field_count])
+    height, bad_height = to_float_column(tokens[3::field_count])
+    stackable = np.isin(np.char.strip(np.array(tokens[4::field_count], dtype=str)), STACKABLE_VALUES)
+
+    bad_dimension = bad_width | bad_depth | bad_height
+    if field_count == STOP_FIELD_COUNT:
+        stops, has_stop, bad_stop = to_stop_column(tokens[5::field_count])
+    else:
+        stops, has_stop, bad_stop = None, None, np.zeros(len(row_numbers), dtype=bool)
+
+    bad = bad_dimension | bad_stop
+    if bad.any():
+        rows = package_string.split('|')
+        for index in np.flatnonzero(bad):
+            row_number = int(row_numbers[index])
+            rejected.append({
+                'row': row_number,
+                'raw': rows[row_number - 1][:200],
+                'reason': ('could not convert dimension to float' if bad_dimension[index]
+                           else 'could not convert stop to int')
+            })
+        rejected.sort(key=lambda error: error['row'])
+
+    keep = ~bad
+    names = np.array(names, dtype=str)[keep]
+    stripped_names = np.char.strip(names)
+
+    # Color by package type (first word of the name), looked up once per distinct type
+    types, type_index = np.unique(first_words(stripped_names), return_inverse=True)
+    palette = np.array([type_colors.get(t or 'Unknown', default_color) for t in types.tolist()], dtype=object)
+
+    table = {
+        'row': row_numbers[keep],
+        'name': stripped_names.tolist(),
+        'width': width[keep],
+        'depth': depth[keep],
+        'height': height[keep],
+        'stackable': stackable[keep],
+        'color': palette[type_index.reshape(-1)].tolist() if len(names) else [],
+        'stop': ([stop if present else None for stop, present, kept
+                  in zip(stops.tolist(), has_stop.tolist(), keep.tolist()) if kept]
+                 if stops is not None else [None] * len(stripped_names)),
+    }
+    return table, rejected
+
+
+def table_to_packages(table):
+    """
+    Build package dicts from a package table
+
+    Produces the same dicts, in the same key order, as parse_powerbi_packages.
+    """
+    packages = [
+        {
+            'id': i + 1,
+            'name': name,
+            'x': 0.0,
+            'y': 0.0,
+            'z': 0.0,
+            'width': width,
+            'depth': depth,
+            'height': height,
+            'rotation': 0,
+            'color': color,
+            'stackable': stackable
+        }
+        for i, (name, width, depth, height, color, stackable) in enumerate(zip(
+            table['name'], table['width'].tolist(), table['depth'].tolist(),
+            table['height'].tolist(), table['color'], table['stackable'].tolist()
+        ))
+    ]
+    for pkg, stop in zip(packages, table['stop']):
+        if stop is not None:
+            pkg['stop'] = stop
+    return packages
@@ -0,0 +1,124 @@
+"""HTTP response compression for Dash callback and layout payloads"""
+
+import gzip
+from flask import request
+from config import (COMPRESSION_ENABLED, COMPRESSION_MIN_SIZE, COMPRESSION_LEVEL,
+                    BROTLI_QUALITY, COMPRESSION_PATHS)
+
+try:
+    import brotli
+except ImportError:  # brotli is optional - gzip is always available
+    brotli = None
+
+
+COMPRESSIBLE_MIMETYPES = ('application/json', 'text/html', 'text/plain', 'application/javascript')
+
+
+def parse_accept_encoding(header):
+    """
+    Parse an Accept-Encoding header into a dict of encoding -> q-value
+
+    Args:
+        header: Raw Accept-Encoding header value, e.g. 'gzip, br;q=0.8'
+
+    Returns:
+        dict: {'gzip': 1.0, 'br': 0.8}
+    """
+    encodings = {}
+    for part in (header or '').split(','):
+        part = part.strip()
+        if not part:
+            continue
+
+        name, _, params = part.partition(';')
+        q = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+
+        encodings[name.strip().lower()] = q
+
+    return encodings
+
+
+def choose_encoding(accept_encoding):
+    """
+    Pick the best supported encoding the client accepts
+
+    Brotli is preferred over gzip when the brotli package is installed.
+    Returns None if the client accepts neither.
+    """
+    accepted = parse_accept_encoding(accept_encoding)
+    wildcard = accepted.get('*', 0)
+
+    candidates = ['br', 'gzip'] if brotli is not None else ['gzip']
+    for encoding in candidates:
+        if accepted.get(encoding, wildcard) > 0:
+            return encoding
+
+    return None
+
+
+def compress_payload(data, encoding):
+    """
+    Compress raw bytes with the given encoding ('br' or 'gzip')
+
+    Returns:
+        bytes: Compressed payload
+    """
+    if encoding == 'br':
+        return brotli.compress(data, quality=BROTLI_QUALITY)
+    # mtime=0 keeps the output deterministic for identical payloads
+    return gzip.compress(data, compresslevel=COMPRESSION_LEVEL, mtime=0)
+
+
+def should_compress(response, path, min_size=COMPRESSION_MIN_SIZE):
+    """Check if a response is eligible for compression"""
+    if response.status_code != 200 or response.direct_passthrough or response.is_streamed:
+        return False
+    if 'Content-Encoding' in response.headers:
+        return False
+    if response.mimetype not in COMPRESSIBLE_MIMETYPES:
+        return False
+    if not any(path.endswith(p) for p in COMPRESSION_PATHS):
+        return False
+
+    return response.content_length is not None and response.content_length >= min_size
+
+
+def compress_response(response, accept_encoding, path):
+    """
+    Compress a Flask response in place if it is eligible and the client accepts it
+
+    Args:
+        response: Flask response object
+        accept_encoding: Accept-Encoding header sent by the client
+        path: Request path (only COMPRESSION_PATHS are compressed)
+
+    Returns:
+        The (possibly compressed) response
+    """
+    if not should_compress(response, path):
+        return response
+
+    encoding = choose_encoding(accept_encoding)
+    if encoding is None:
+        return response
+
+    response.set_data(compress_payload(response.get_data(), encoding))
+    response.headers['Content-Encoding'] = encoding
+    response.vary.add('Accept-Encoding')
+    return response
+
+
+def register_compression(server):
+    """Register the compression after-request hook on the Flask server"""
+    if not COMPRESSION_ENABLED:
+        return
+
+    @server.after_request
+    def compress_dash_response(response):
+        return compress_response(response, request.headers.get('Accept-Encoding', ''), request.path)
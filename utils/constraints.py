@@ -0,0 +1,281 @@
+"""Load rules per customer and package type, compiled to NumPy checks over the whole load"""
+
+import math
+from config import (LOAD_RULES, INCOMPATIBLE_FAMILIES, PACKAGE_DENSITY, CONSTRAINT_SUPPORT_GAP,
+                    CONSTRAINT_TOUCH_GAP, CONSTRAINT_CHUNK)
+from utils.nesting import package_type
+from utils.pallets import bounding_box, is_pallet, iter_contents, pallet_base
+
+# (weight, max load on top, max stack height, can carry) of a package without rules
+NO_LIMITS = (0.0, math.inf, math.inf, True)
+
+
+def resolve_rules(customer=None, rules=LOAD_RULES):
+    """
+    Rules per package type for one customer
+
+    The '*' rules apply to everyone; the customer's own entry (matched
+    case-insensitively) overrides them key by key for each type.
+
+    Returns:
+        dict: package type -> rule dict (see LOAD_RULES in config.py)
+    """
+    resolved = {ptype: dict(rule) for ptype, rule in rules.get('*', {}).items()}
+    own = rules.get(str(customer).upper(), {}) if customer else {}
+    for ptype, rule in own.items():
+        resolved[ptype] = {**resolved.get(ptype, {}), **rule}
+    return resolved
+
+
+def package_weight(pkg, rule):
+    """Weight (kg): the package's own 'weight', else its volume times the type's density"""
+    if pkg.get('weight') is not None:
+        return float(pkg['weight'])
+    return pkg['width'] * pkg['height'] * pkg['depth'] * rule.get('density', PACKAGE_DENSITY)
+
+
+def compile_rules(packages, type_rules, families=INCOMPATIBLE_FAMILIES):
+    """
+    Turn the rules of a load into one NumPy array per rule and per box side
+
+    Each package gets its type's rule (no rule = no limit: inf, False or
+    family -1), so every check is a mask or array operation over the whole
+    load instead of a loop over packages and rules.
+
+    Args:
+        packages: List of package dicts
+        type_rules: Package type -> rule dict (see resolve_rules)
+        families: Pairs of families that must not touch
+
+    Returns:
+        dict: ids, x0, y0, z0, x1, y1, z1 (bounding boxes), weight,
+              max_top, max_load, fragile, upright, family (code, -1 for
+              none), family_names and incompatible (family x family mask)
+    """
+    import numpy as np  # keep it off the startup path
+
+    rules = [type_rules.get(package_type(pkg), {}) for pkg in packages]
+    names = sorted({rule['family'] for rule in rules if rule.get('family')}
+                   | {family for pair in families for family in pair})
+    codes = {family: code for code, family in enumerate(names)}
+
+    incompatible = np.zeros((len(names), len(names)), dtype=bool)
+    for first, second in families:
+        incompatible[codes[first], codes[second]] = incompatible[codes[second], codes[first]] = True
+
+    boxes = np.array([bounding_box(pkg) for pkg in packages], dtype=float).reshape(-1, 6)
+    return {
+        'ids': np.array([pkg['id'] for pkg in packages]),
+        'x0': boxes[:, 0], 'y0': boxes[:, 1], 'z0': boxes[:, 2],
+        'x1': boxes[:, 3], 'y1': boxes[:, 4], 'z1': boxes[:, 5],
+        'weight': np.array([package_weight(pkg, rule) for pkg, rule in zip(packages, rules)], dtype=float),
+        'max_top': np.array([rule.get('max_stack_height', np.inf) for rule in rules], dtype=float),
+        'max_load': np.array([rule.get('max_load_on_top', np.inf) for rule in rules], dtype=float),
+        'fragile': np.array([bool(rule.get('fragile')) for rule in rules], dtype=bool),
+        'upright': np.array([bool(rule.get('upright')) for rule in rules], dtype=bool),
+        'family': np.array([codes.get(rule.get('family'), -1) for rule in rules], dtype=int),
+        'family_names': names,
+        'incompatible': incompatible,
+    }
+
+
+def support_pairs(load, gap=CONSTRAINT_SUPPORT_GAP):
+    """
+    Which packages rest on which: (lower, upper, area) index arrays
+
+    A package rests on another when its bottom is at most `gap` above the
+    other's top (and not more than `gap` below it) and their footprints
+    overlap. Tops are sorted by (level, x0), so each package off the floor
+    finds its candidates with searchsorted in the three levels around its
+    bottom, among the packages starting at most one package length before
+    it - no package x package matrix.
+    """
+    import numpy as np
+
+    x0, y0, z0, x1, y1, z1 = (load[key] for key in ('x0', 'y0', 'z0', 'x1', 'y1', 'z1'))
+    uppers = np.flatnonzero(z0 > gap)
+    if not len(uppers):
+        return np.zeros(0, dtype=int), np.zeros(0, dtype=int), np.zeros(0)
+
+    span = float((x1 - x0).max())
+    stride = 2 * (float(np.abs(x0).max()) + span + 1)  # keeps levels apart in the combined key
+    level = np.floor(z1 / gap)
+    order = np.argsort(level * stride + x0, kind='stable')
+    keys = (level * stride + x0)[order]
+
+    up_level = np.floor(z0[uppers] / gap)
+    lower_parts, upper_parts = [], []
+    for offset in (-1, 0, 1):
+        base = (up_level + offset) * stride
+        start = np.searchsorted(keys, base + x0[uppers] - span, side='left')
+        end = np.searchsorted(keys, base + x1[uppers], side='left')
+        counts = end - start
+        total = int(counts.sum())
+        if total:
+            # Concatenated ranges start..end of every upper package, without a Python loop
+            shift = np.repeat(start - (np.cumsum(counts) - counts), counts)
+            lower_parts.append(order[np.arange(total) + shift])
+            upper_parts.append(np.repeat(uppers, counts))
+    if not lower_parts:
+        return np.zeros(0, dtype=int), np.zeros(0, dtype=int), np.zeros(0)
+
+    lower, upper = np.concatenate(lower_parts), np.concatenate(upper_parts)
+    overlap_x = np.minimum(x1[lower], x1[upper]) - np.maximum(x0[lower], x0[upper])
+    overlap_y = np.minimum(y1[lower], y1[upper]) - np.maximum(y0[lower], y0[upper])
+    rise = z0[upper] - z1[lower]
+    resting = (lower != upper) & (overlap_x > 1e-6) & (overlap_y > 1e-6) & (rise >= -gap) & (rise <= gap)
+    return lower[resting], upper[resting], (overlap_x * overlap_y)[resting]
+
+
+def stack_loads(load, pairs):
+    """
+    Weight on top of every package and the top of the stack it is in
+
+    Uppers pass their weight plus everything on them down to the packages
+    under them, split by overlap area, one height level at a time from the
+    top (each level is one np.add.at / np.maximum.at).
+
+    Returns:
+        tuple: (load_on_top kg, stack_top m) arrays
+    """
+    import numpy as np
+
+    lower, upper, area = pairs
+    on_top = np.zeros(len(load['weight']))
+    stack_top = load['z1'].copy()
+    if not len(lower):
+        return on_top, stack_top
+
+    share = area / np.bincount(upper, weights=area, minlength=len(on_top))[upper]
+    levels = np.round(load['z0'][upper], 3)
+    for level in np.unique(levels)[::-1]:
+        at = levels == level
+        np.add.at(on_top, lower[at], (load['weight'][upper[at]] + on_top[upper[at]]) * share[at])
+        np.maximum.at(stack_top, lower[at], stack_top[upper[at]])
+    return on_top, stack_top
+
+
+def touching_pairs(load, gap=CONSTRAINT_TOUCH_GAP, chunk=CONSTRAINT_CHUNK):
+    """(first, second) index arrays of packages of incompatible families closer than gap"""
+    import numpy as np
+
+    family, incompatible = load['family'], load['incompatible']
+    ruled = np.flatnonzero(family >= 0)
+    if not len(ruled) or not incompatible.any():
+        return np.zeros(0, dtype=int), np.zeros(0, dtype=int)
+    ruled = ruled[incompatible[family[ruled]].any(axis=1)]
+    if not len(ruled):
+        return np.zeros(0, dtype=int), np.zeros(0, dtype=int)
+
+    boxes = {key: load[key][ruled] for key in ('x0', 'y0', 'z0', 'x1', 'y1', 'z1')}
+    firsts, seconds = [], []
+    for start in range(0, len(ruled), chunk):
+        a = np.arange(start, min(start + chunk, len(ruled)))[:, None]
+        near = np.ones((len(a), len(ruled)), dtype=bool)
+        for axis in 'xyz':
+            low, high = boxes[axis + '0'], boxes[axis + '1']
+            near &= (low < high[a] + gap) & (high > low[a] - gap)
+        near &= incompatible[family[ruled][a], family[ruled]] & (np.arange(len(ruled)) > a)
+        rows, columns = np.nonzero(near)
+        firsts.append(ruled[a[rows, 0]])
+        seconds.append(ruled[columns])
+    return np.concatenate(firsts), np.concatenate(seconds)
+
+
+def check_load(packages, type_rules, truck_length=None):
+    """
+    Check a whole load against the rules
+
+    Pallets are checked as their base plus the cartons on it, so the rules
+    apply between cartons, and to whatever is stacked on a pallet's cartons.
+
+    Args:
+        packages: List of package dicts
+        type_rules: Package type -> rule dict (see resolve_rules)
+        truck_length: If given, packages on the dock behind the door are skipped
+
+    Returns:
+        list: Violations sorted by package id, each a dict with id, name,
+              rule and message
+    """
+    if truck_length is not None:
+        packages = [pkg for pkg in packages if pkg['x'] < truck_length - 1e-3]
+    if not packages or not type_rules:
+        return []
+    import numpy as np
+
+    packages = [part for pkg in packages
+                for part in ([pallet_base(pkg), *iter_contents(pkg)] if is_pallet(pkg) else [pkg])]
+    load = compile_rules(packages, type_rules)
+    pairs = support_pairs(load)
+    on_top, stack_top = stack_loads(load, pairs)
+    lower, upper, area = pairs
+    carried = np.bincount(lower, minlength=len(packages))
+    supported = np.bincount(upper, weights=area, minlength=len(packages))
+    base = (load['x1'] - load['x0']) * (load['y1'] - load['y0'])
+
+    checks = [
+        ('max_stack_height', stack_top > load['max_top'] + 1e-6,
+         lambda i: f"stack reaches {stack_top[i]:.2f} m, max {load['max_top'][i]:.2f} m"),
+        ('max_load_on_top', on_top > load['max_load'] + 1e-6,
+         lambda i: f"{on_top[i]:.0f} kg on top, max {load['max_load'][i]:.0f} kg"),
+        ('fragile', load['fragile'] & (carried > 0),
+         lambda i: f"fragile, carries {carried[i]} package(s)"),
+        ('upright', load['upright'] & (load['z0'] > CONSTRAINT_SUPPORT_GAP) & (supported < base * 0.999),
+         lambda i: f"must stand level, {100 * supported[i] / base[i]:.0f}% of its base supported"),
+    ]
+
+    violations = []
+    for rule, mask, describe in checks:
+        for i in np.flatnonzero(mask).tolist():
+            violations.append({'id': packages[i]['id'], 'name': packages[i]['name'], 'rule': rule,
+                               'message': describe(i)})
+
+    names = load['family_names']
+    for first, second in zip(*(indices.tolist() for indices in touching_pairs(load))):
+        for i, j in ((first, second), (second, first)):
+            violations.append({'id': packages[i]['id'], 'name': packages[i]['name'], 'rule': 'family',
+                               'message': f"{names[load['family'][i]]} touches {packages[j]['name']} "
+                                          f"({names[load['family'][j]]})"})
+    violations.sort(key=lambda violation: violation['id'])
+    return violations
+
+
+def stack_limits(packages, type_rules):
+    """
+    What the placement searches keep to when stacking, per package id
+
+    Returns:
+        dict: id -> (weight kg, max load on top kg, max stack height m,
+              can carry) - empty without rules (see NO_LIMITS)
+    """
+    if not packages or not type_rules:
+        return {}
+    load = compile_rules(packages, type_rules)
+    return {package_id: (weight, max_load, max_top, not fragile)
+            for package_id, weight, max_load, max_top, fragile
+            in zip(load['ids'].tolist(), load['weight'].tolist(), load['max_load'].tolist(),
+                   load['max_top'].tolist(), load['fragile'].tolist())}
+
+
+def new_stack(limit, height):
+    """[load room kg, height limit m] of a stack started by a package on the floor"""
+    return [limit[1], min(height, limit[2])]
+
+
+def stack_fits(stack, limit, depth):
+    """
+    Whether a package may go on top of a placement stack
+
+    Stacks are lists [x, y, x_size, y_size, top_z, top_can_carry, load_room,
+    height_limit] as kept by auto_place and plan_loading.
+    """
+    return stack[5] and limit[0] <= stack[6] and stack[4] + depth <= min(stack[7], limit[2])
+
+
+def add_to_stack(stack, limit, depth):
+    """Put a package on a placement stack (see stack_fits)"""
+    stack[4] += depth
+    stack[5] = stack[5] and limit[3]
+    stack[6] = min(stack[6] - limit[0], limit[1])
+    stack[7] = min(stack[7], limit[2])
@@ -0,0 +1,153 @@
+"""Buffered append-only log of planner actions (training data for load planning)"""
+
+import atexit
+import json
+import os
+import threading
+import time
+from config import (EVENT_LOG_ENABLED, EVENT_LOG_DIR, EVENT_LOG_FLUSH_INTERVAL,
+                    EVENT_LOG_BATCH_SIZE, EVENT_LOG_MAX_BYTES)
+
+# Package fields recorded before and after each change
+PACKAGE_STATE_FIELDS = ('x', 'y', 'z', 'rotation', 'width', 'depth', 'height', 'stackable', 'load_seq')
+
+
+class EventLog:
+    """
+    In-memory event buffer flushed to rotating JSONL files by a background thread
+
+    record() only appends to a list, so logging a click costs microseconds;
+    the flush thread writes whole batches every flush_interval seconds, or
+    as soon as batch_size events are waiting. Each process writes its own
+    files (events-<date>-<pid>-<part>.jsonl), starting a new part when a
+    file reaches max_bytes.
+    """
+
+    def __init__(self, log_dir=EVENT_LOG_DIR, flush_interval=EVENT_LOG_FLUSH_INTERVAL,
+                 batch_size=EVENT_LOG_BATCH_SIZE, max_bytes=EVENT_LOG_MAX_BYTES):
+        self.log_dir = log_dir
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.max_bytes = max_bytes
+        self.stats = {'recorded': 0, 'written': 0, 'flushes': 0}
+
+        self._buffer = []
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._closed = False
+        self._thread = None
+        self._part = 0
+
+    def record(self, action, **fields):
+        """Queue an event (the flush thread is started on first use)"""
+        event = {'ts': round(time.time(), 3), 'action': action, **fields}
+        with self._lock:
+            self._buffer.append(event)
+            waiting = len(self._buffer)
+            if self._thread is None:
+                self._start()
+        self.stats['recorded'] += 1
+        if waiting >= self.batch_size:
+            self._wake.set()
+
+    def _start(self):
+        os.makedirs(self.log_dir, exist_ok=True)
+        self._thread = threading.Thread(target=self._run, name='event-log', daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def _run(self):
+        while not self._closed:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+
+    def flush(self):
+        """Write all queued events to the current log file"""
+        with self._lock:
+            events, self._buffer = self._buffer, []
+        if not events:
+            return
+
+        data = ''.join(json.dumps(event, separators=(',', ':')) + '\n' for event in events)
+        with self._write_lock:
+            try:
+                with open(self._current_path(), 'a', encoding='utf-8') as f:
+                    f.write(data)
+            except OSError as e:
+                print(f"⚠️ Could not write {len(events)} events to the event log: {e}")
+                return
+        self.stats['written'] += len(events)
+        self.stats['flushes'] += 1
+
+    def _current_path(self):
+        """Path of the file to append to, moving to a new part when it is full"""
+        date = time.strftime('%Y%m%d')
+        while True:
+            path = os.path.join(self.log_dir, f'events-{date}-{os.getpid()}-{self._part:04d}.jsonl')
+            if not os.path.exists(path) or os.path.getsize(path) < self.max_bytes:
+                return path
+            self._part += 1
+
+    def close(self):
+        """Flush remaining events and stop the flush thread"""
+        self._closed = True
+        self._wake.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout=5)
+        self.flush()
+
+
+_event_log = None
+
+
+def get_event_log():
+    """Return the process-wide event log"""
+    global _event_log
+    if _event_log is None:
+        _event_log = EventLog()
+    return _event_log
+
+
+def package_state(pkg):
+    """Recorded subset of a package dict (None for a missing package)"""
+    if pkg is None:
+        return None
+    return {field: pkg.get(field) for field in PACKAGE_STATE_FIELDS}
+
+
+def log_package_change(action, order_id, before, after, **details):
+    """
+    Record a change to one package
+
+    Args:
+        action: Callback/action name, e.g. 'rotate_package'
+        order_id: Order the plan belongs to (order-id store)
+        before, after: Package dict before and after the change (None if the
+                       package was added/deleted)
+        **details: Extra fields, e.g. trigger='align-left-btn'
+    """
+    if not EVENT_LOG_ENABLED:
+        return
+
+    before_state, after_state = package_state(before), package_state(after)
+    if before_state == after_state:
+        return
+
+    pkg = after or before
+    get_event_log().record(
+        action,
+        order=order_id,
+        package_id=pkg['id'],
+        name=pkg.get('name'),
+        before=before_state,
+        after=after_state,
+        **details
+    )
+
+
+def flush_event_log():
+    """Write queued events now (for callbacks that run in short-lived job processes)"""
+    if _event_log is not None:
+        _event_log.flush()
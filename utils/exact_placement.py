@@ -0,0 +1,339 @@
+"""Exact branch-and-bound placement for small orders, with heuristic fallback"""
+
+import math
+import time
+from config import (TRUCK_LENGTH, TRUCK_WIDTH, TRUCK_HEIGHT,
+                    EXACT_MAX_PACKAGES, EXACT_TIME_BUDGET, EXACT_MEMO_SIZE)
+from utils.bounds import lower_bounds, effective_width
+from utils.geometry import calculate_load_metrics
+from utils.placement import auto_place, footprint_options
+from utils.constraints import NO_LIMITS, stack_limits, new_stack, stack_fits, add_to_stack
+
+TIME_CHECK_NODES = 256  # search nodes between time budget checks
+
+
+class _Timeout(Exception):
+    pass
+
+
+def _mm(value):
+    return int(round(value * 1000))
+
+
+def _package_types(packages, length, width, height, limits=None):
+    """
+    Group interchangeable packages, so the search never tries swapping two of them
+
+    Packages that cannot be stacked with any other package (not stackable or
+    too tall to share a stack) stay on the floor, so only their footprint
+    matters and they are grouped by footprint alone. Stackable packages are
+    also grouped by their stacking limits (see utils.constraints.stack_limits),
+    with the maximum stack height in mm like every size in the search.
+
+    Returns:
+        list: Types sorted by footprint area (largest first), each a dict
+              with packages, options [(fx, fy, rotation)] in mm, depth,
+              area, stackable and limit; None if a package fits in no orientation
+    """
+    limits = limits or {}
+    stackable_depths = sorted(_mm(pkg['depth']) for pkg in packages if pkg.get('stackable', False))
+
+    groups = {}
+    for pkg in packages:
+        depth = _mm(pkg['depth'])
+        # Shortest other stackable package this one could carry or rest on
+        others = stackable_depths[1:] if stackable_depths and stackable_depths[0] == depth else stackable_depths
+        stackable = pkg.get('stackable', False) and bool(others) and depth + others[0] <= height
+        limit = NO_LIMITS
+        if stackable:
+            weight, max_load, max_top, can_carry = limits.get(pkg['id'], NO_LIMITS)
+            limit = (weight, max_load, _mm(max_top) if max_top != math.inf else math.inf, can_carry)
+        key = (_mm(pkg['width']), _mm(pkg['height']), depth if stackable else None, stackable, limit)
+        groups.setdefault(key, []).append(pkg)
+
+    types = []
+    for (w, h, _, stackable, limit), members in groups.items():
+        depth = max(_mm(pkg['depth']) for pkg in members)
+        options = [(_mm(fx), _mm(fy), rotation) for fx, fy, rotation in footprint_options(members[0])
+                   if _mm(fx) <= length and _mm(fy) <= width]
+        if depth > height or not options:
+            return None
+        types.append({'packages': members, 'options': options, 'depth': depth, 'area': w * h,
+                      'stackable': stackable, 'limit': limit})
+    types.sort(key=lambda t: (t['area'], t['depth']), reverse=True)
+    return types
+
+
+def _side_positions(types, width):
+    """
+    Normal patterns across the truck: every sum of package footprint sizes
+
+    A package pushed towards the side wall rests against the wall or a
+    package beside it, so its y is one of these sums.
+    """
+    smallest = min(fy for t in types for _, fy, _ in t['options'])
+    sums = {0}
+    for package_type in types:
+        sizes = {fy for _, fy, _ in package_type['options']}
+        for _ in package_type['packages']:
+            sums |= {total + size for total in sums for size in sizes if total + size <= width - smallest}
+    return sorted(sums)
+
+
+class _Search:
+    """Depth-first branch and bound over front-pushed floor placements (all sizes in mm)"""
+
+    def __init__(self, types, length, width, height, lower_bound, best_length, deadline):
+        self.types = types
+        self.length, self.width, self.height = length, width, height
+        self.lower_bound = lower_bound
+        self.best_length = best_length  # incumbent: only strictly shorter plans are searched
+        self.best_boxes = None
+        self.deadline = deadline
+        self.nodes = 0
+        self.seen = set()
+        self.side_positions = _side_positions(types, width)
+        self.usable_width = int(round(effective_width([fy / 1000 for t in types for _, fy, _ in t['options']],
+                                                      width / 1000) * 1000))
+        self.remaining = [len(t['packages']) for t in types]
+        # carriers[i]: types whose top package type i could be stacked on
+        self.carriers = [[j for j, base in enumerate(types)
+                          if t['stackable'] and base['stackable'] and base['limit'][3]
+                          and t['depth'] + base['depth'] <= height
+                          and any(fx <= bx and fy <= by for fx, fy, _ in t['options'] for bx, by, _ in base['options'])]
+                         for t in types]
+        self.min_length = [min(fx for fx, _, _ in t['options']) for t in types]
+
+    def run(self):
+        self._dfs([], [], [], 0, 0, (0, -1))
+
+    def _floor_positions(self, rects, fx, fy, limit, last):
+        """
+        Floor positions after `last` (x, y) where a footprint is pushed against the front wall or a package
+
+        Floor packages are placed in (x, y) order, so a package's neighbour in
+        front of it is always placed before it.
+        """
+        xs = sorted({0, *(r[2] for r in rects)})
+        positions = []
+        for x in xs:
+            if x < last[0]:
+                continue
+            if x + fx > limit:
+                break
+            x1 = x + fx
+            front = [r for r in rects if r[2] == x] if x else None
+            for y in self.side_positions:
+                if y + fy > self.width:
+                    break
+                if x == last[0] and y <= last[1]:
+                    continue
+                y1 = y + fy
+                if any(r[0] < x1 and x < r[2] and r[1] < y1 and y < r[3] for r in rects):
+                    continue
+                if front is not None and not any(r[1] < y1 and y < r[3] for r in front):
+                    continue  # could slide towards the front wall
+                positions.append((x1, x, y))
+        positions.sort()
+        return positions
+
+    def _floor_needed(self, stacks):
+        """
+        Floor area the remaining packages still need, and the longest of them that must go on the floor
+
+        A package has to go on the floor if no stack top and no remaining
+        package can carry it. The others need floor area for whatever of
+        their volume does not fit above stackable stack tops and above the
+        packages that must go on the floor.
+
+        Returns:
+            tuple: (floor area, shortest footprint length of the longest floor package)
+        """
+        area, length = 0, 0
+        volume, room = 0, 0
+        for stack in stacks:
+            if stack[5]:
+                room += stack[2] * stack[3] * (self.height - stack[4])
+        for index, count in enumerate(self.remaining):
+            if not count:
+                continue
+            package_type = self.types[index]
+            carried = package_type['stackable'] and (
+                any(self.remaining[j] > (j == index) for j in self.carriers[index])
+                or any(stack[5] and stack[4] + package_type['depth'] <= self.height
+                       and any(fx <= stack[2] and fy <= stack[3] for fx, fy, _ in package_type['options'])
+                       for stack in stacks))
+            if carried:
+                volume += count * package_type['area'] * package_type['depth']
+            else:
+                area += count * package_type['area']
+                length = max(length, self.min_length[index])
+                if package_type['stackable']:
+                    room += count * package_type['area'] * (self.height - package_type['depth'])
+        return area + max(0, volume - room) // self.height, length
+
+    def _dfs(self, rects, stacks, boxes, used_length, floor_area, last):
+        if self.best_length <= self.lower_bound:
+            return  # proven optimal: unwind the whole search
+        self.nodes += 1
+        if self.nodes % TIME_CHECK_NODES == 0 and time.perf_counter() > self.deadline:
+            raise _Timeout
+
+        if not any(self.remaining):
+            self.best_length, self.best_boxes = used_length, list(boxes)
+            return
+
+        # Bounds: loading length so far, the order's lower bound, and the floor area still
+        # needed in total and beyond the last floor package (the rest is placed after it)
+        floor_area_left, floor_length = self._floor_needed(stacks)
+        beyond = sum((r[2] - max(r[0], last[0])) * (r[3] - r[1]) for r in rects if r[2] > last[0])
+        area_bound = max(-(-(floor_area + floor_area_left) // self.usable_width),
+                         last[0] + -(-(beyond + floor_area_left) // self.usable_width),
+                         last[0] + floor_length)
+        if max(used_length, self.lower_bound, area_bound) >= self.best_length:
+            return
+
+        key = frozenset(boxes)
+        if key in self.seen:
+            return
+        if len(self.seen) < EXACT_MEMO_SIZE:
+            self.seen.add(key)
+
+        for index, package_type in enumerate(self.types):
+            if not self.remaining[index]:
+                continue
+            self.remaining[index] -= 1
+            depth = package_type['depth']
+
+            # On top of a stack (never makes the load longer), within the load rules
+            rule = package_type['limit']
+            if package_type['stackable']:
+                for stack in stacks:
+                    if not stack_fits(stack, rule, depth):
+                        continue
+                    for fx, fy, rotation in package_type['options']:
+                        if fx <= stack[2] and fy <= stack[3]:
+                            saved = stack[2:]
+                            stack[2:4] = [fx, fy]
+                            add_to_stack(stack, rule, depth)
+                            boxes.append((index, stack[0], stack[1], saved[2], fx, fy, rotation))
+                            self._dfs(rects, stacks, boxes, used_length, floor_area, last)
+                            boxes.pop()
+                            stack[2:] = saved
+
+            # On the floor
+            for fx, fy, rotation in package_type['options']:
+                limit = min(self.length, self.best_length - 1)
+                for x1, x, y in self._floor_positions(rects, fx, fy, limit, last):
+                    if x1 >= self.best_length:
+                        break
+                    rects.append((x, y, x1, y + fy))
+                    stacks.append([x, y, fx, fy, depth, package_type['stackable'] and rule[3],
+                                   *new_stack(rule, self.height)])
+                    boxes.append((index, x, y, 0, fx, fy, rotation))
+                    self._dfs(rects, stacks, boxes, max(used_length, x1), floor_area + fx * fy, (x, y))
+                    boxes.pop()
+                    stacks.pop()
+                    rects.pop()
+
+            self.remaining[index] += 1
+
+
+def exact_place(packages, truck_dims=None, time_budget=EXACT_TIME_BUDGET, rules=None):
+    """
+    Place packages with the shortest possible loading length
+
+    Branch and bound over placements on the floor and on stacks, with the
+    stacking rules of auto_place. A floor package touches the front wall or
+    a package in front of it, and the side wall or a package beside it
+    (its y is a sum of package sizes). Any layout, e.g. one on the MOVE_STEP
+    grid, can be pushed into that form without getting longer, so a
+    completed search proves the plan optimal or the order infeasible.
+    Floor packages are placed in (x, y) order and identical packages are
+    never swapped (symmetry), partial layouts that were already searched
+    are skipped (memo), and branches that cannot beat
+    the best plan so far (started from auto_place) are cut using the
+    lower bounds of utils.bounds. The search stops as soon as a plan
+    reaches the lower bound. With load rules, stacks keep to them as in
+    auto_place (utils.constraints.stack_fits), so the plan is the shortest
+    that keeps the rules.
+
+    Args:
+        packages: List of package dicts
+        truck_dims: Dict with 'length', 'width', 'height' (defaults from config)
+        time_budget: Seconds before giving up with the best plan so far
+        rules: Optional package type -> rule dict (see utils.constraints)
+
+    Returns:
+        tuple: (placed, unplaced, info) - like auto_place, plus info with
+               method, status ('optimal', 'infeasible' or 'timeout'),
+               length, lower_bound, nodes and ms
+    """
+    start = time.perf_counter()
+    truck_dims = truck_dims or {'length': TRUCK_LENGTH, 'width': TRUCK_WIDTH, 'height': TRUCK_HEIGHT}
+    length, width, height = _mm(truck_dims['length']), _mm(truck_dims['width']), _mm(truck_dims['height'])
+
+    placed, unplaced = auto_place(packages, truck_dims, rules)
+    info = {'method': 'exact', 'status': None, 'length': None, 'nodes': 0,
+            'lower_bound': lower_bounds(packages, truck_dims)['min_length']}
+    if not unplaced:
+        info['length'] = calculate_load_metrics(placed, truck_dims['length'], truck_dims['width'],
+                                                truck_dims['height'])['used_length']
+
+    types = _package_types(packages, length, width, height, stack_limits(packages, rules))
+    if types is None:
+        info['status'] = 'infeasible'  # some package fits in no orientation
+    else:
+        best_length = _mm(info['length']) if info['length'] is not None else length + 1
+        lower_bound = math.ceil(info['lower_bound'] * 1000 - 1e-6)
+        search = _Search(types, length, width, height, lower_bound, best_length,
+                         deadline=start + time_budget)
+        try:
+            search.run()
+            info['status'] = 'optimal' if search.best_length <= length else 'infeasible'
+        except _Timeout:
+            info['status'] = 'timeout'
+        info['nodes'] = search.nodes
+
+        if search.best_boxes is not None:
+            placed, unplaced = _to_packages(types, search.best_boxes), []
+            info['length'] = round(search.best_length / 1000, 3)
+
+    info['ms'] = round((time.perf_counter() - start) * 1000, 1)
+    return placed, unplaced, info
+
+
+def _to_packages(types, boxes):
+    """Package dicts for the boxes of a search plan"""
+    members = [list(t['packages']) for t in types]
+    placed = []
+    for index, x, y, z, fx, fy, rotation in boxes:
+        pkg = dict(members[index].pop())
+        pkg.update(x=x / 1000, y=y / 1000, z=z / 1000, rotation=rotation)
+        placed.append(pkg)
+    placed.sort(key=lambda p: p['id'])
+    return placed
+
+
+def place_packages(packages, truck_dims=None, time_budget=EXACT_TIME_BUDGET, rules=None):
+    """
+    Placement mode for the app: exact for small orders, heuristics otherwise
+
+    Orders with delivery stops use utils.sequencing.plan_loading, orders
+    above EXACT_MAX_PACKAGES use auto_place, and the rest exact_place
+    (which keeps the auto_place plan if its time budget runs out first).
+    All of them keep to the load rules when stacking, if rules are given.
+
+    Returns:
+        tuple: (placed, unplaced, info) - see exact_place; info['method']
+               is 'exact', 'auto_place' or 'plan_loading'
+    """
+    from utils.sequencing import has_stops, plan_loading
+
+    if has_stops(packages):
+        placed, unplaced = plan_loading(packages, truck_dims, rules)
+        return placed, unplaced, {'method': 'plan_loading', 'status': 'stops'}
+    if len(packages) > EXACT_MAX_PACKAGES:
+        placed, unplaced = auto_place(packages, truck_dims, rules)
+        return placed, unplaced, {'method': 'auto_place', 'status': 'too_large'}
+    return exact_place(packages, truck_dims, time_budget, rules)
@@ -0,0 +1,43 @@
+"""Split an order over as many trucks as it needs (consolidated shipments)"""
+
+from config import TRUCK_LENGTH, TRUCK_WIDTH, TRUCK_HEIGHT, FLEET_MAX_TRUCKS
+from utils.geometry import calculate_load_metrics
+from utils.placement import auto_place
+from utils.sequencing import has_stops, plan_loading
+
+
+def split_over_trucks(packages, truck_dims=None, max_trucks=FLEET_MAX_TRUCKS, rules=None):
+    """
+    Load an order into trucks of one size, one truck after the other
+
+    Each truck is filled with what the previous ones left over, by the
+    stop-ordered planner (utils.sequencing) when packages have delivery
+    stops, otherwise by utils.placement.auto_place, keeping to the load rules.
+
+    Args:
+        packages: List of package dicts
+        truck_dims: Dict with 'length', 'width', 'height' (defaults from config)
+        max_trucks: Stop after this many trucks
+        rules: Optional package type -> rule dict (see utils.constraints)
+
+    Returns:
+        tuple: (plans, left_over) - one plan per truck as a dict with name,
+               packages (placed copies), truck_dims and metrics
+               (calculate_load_metrics), and the packages no truck took
+    """
+    truck_dims = truck_dims or {'length': TRUCK_LENGTH, 'width': TRUCK_WIDTH, 'height': TRUCK_HEIGHT}
+    plans = []
+    remaining = list(packages)
+    while remaining and len(plans) < max_trucks:
+        place = plan_loading if has_stops(remaining) else auto_place
+        placed, remaining = place(remaining, truck_dims, rules=rules)
+        if not placed:  # what is left does not fit an empty truck
+            break
+        plans.append({
+            'name': f'Truck {len(plans) + 1}',
+            'packages': placed,
+            'truck_dims': truck_dims,
+            'metrics': calculate_load_metrics(placed, truck_dims['length'], truck_dims['width'],
+                                              truck_dims['height']),
+        })
+    return plans, remaining
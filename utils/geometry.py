@@ -28,4 +28,50 @@ def calculate_totals(packages):
         tuple: (total_volume)
     """
     total_volume = sum(pkg['width'] * pkg['height'] * pkg['depth'] for pkg in packages)
-    return total_volume
\ No newline at end of file
+    return total_volume
+
+def loading_sequence(packages):
+    """
+    Order in which packages are loaded
+
+    Uses each package's 'load_seq' if every package has one, otherwise loads
+    from the front of the truck (x = 0) backwards, bottom before top.
+
+    Returns:
+        list: Package ids in loading order
+    """
+    if packages and all(pkg.get('load_seq') is not None for pkg in packages):
+        return [pkg['id'] for pkg in sorted(packages, key=lambda p: p['load_seq'])]
+    return [pkg['id'] for pkg in sorted(packages, key=lambda p: (p['x'], p['z'], p['y'], p['id']))]
+
+
+def calculate_load_metrics(packages, truck_length, truck_width, truck_height):
+    """
+    Calculate utilization and loading meter (LDM) metrics of a load plan
+
+    Args:
+        packages: List of package dictionaries
+        truck_length, truck_width, truck_height: Truck cargo space in meters
+
+    Returns:
+        dict: package_count, total_volume, volume_utilization (%),
+              used_length (m of truck length occupied), ldm (floor area of
+              floor-level packages / truck width) and floor_utilization (%)
+    """
+    total_volume = calculate_totals(packages)
+    floor_area = 0.0
+    used_length = 0.0
+    for pkg in packages:
+        actual_width, actual_height = rotate_dimensions(pkg['width'], pkg['height'], pkg.get('rotation', 0))
+        used_length = max(used_length, pkg['x'] + actual_width)
+        if pkg['z'] == 0:
+            floor_area += actual_width * actual_height
+
+    return {
+        'package_count': len(packages),
+        'total_volume': round(total_volume, 4),
+        'volume_utilization': round(total_volume / (truck_length * truck_width * truck_height) * 100, 2),
+        'used_length': round(used_length, 3),
+        'ldm': round(floor_area / truck_width, 3),
+        'floor_utilization': round(floor_area / (truck_length * truck_width) * 100, 2),
+    }
@@ -0,0 +1,129 @@
+"""Undo/redo history of package edits, stored as per-operation deltas"""
+
+import time
+from dash import Patch, no_update
+from config import HISTORY_DEPTH, HISTORY_COALESCE_SECONDS
+from utils.event_log import package_state
+
+EMPTY_HISTORY = {'undo': [], 'redo': []}
+
+
+def package_change(before, after, index=None):
+    """
+    Delta for one package
+
+    Moves/rotations/resizes keep only the changed package's state fields
+    (see event_log.PACKAGE_STATE_FIELDS); a deleted package keeps the whole
+    dict so undo can restore it, and an added one so redo can.
+
+    Args:
+        before: Package before the edit (None if it was added)
+        after: Package after the edit (None if it was deleted)
+        index: Position of a deleted/added package in the list it is in, so
+               undo/redo put it back in the same place (and the figure trace
+               order stays the same)
+    """
+    change = {
+        'id': (after or before)['id'],
+        'before': package_state(before) if after is not None else dict(before),
+        'after': package_state(after) if before is not None else dict(after),
+    }
+    if index is not None:
+        change['index'] = index
+    return change
+
+
+def push_history(history, action, changes, coalesce_key=None):
+    """
+    Add an operation to the history
+
+    Consecutive operations with the same coalesce_key (e.g. one slider being
+    dragged) within HISTORY_COALESCE_SECONDS of each other are merged into
+    one undo step. The redo stack is cleared and the undo stack is capped at
+    HISTORY_DEPTH operations.
+
+    Args:
+        history: Current history-store data
+        action: Name of the edit, e.g. 'rotate_package'
+        changes: List of package_change() deltas
+        coalesce_key: Key of edits that may merge into the previous step
+
+    Returns:
+        Patch for history-store, or no_update if nothing changed
+    """
+    history = history or EMPTY_HISTORY
+    changes = [change for change in changes if change['before'] != change['after']]
+    if not changes:
+        return no_update
+
+    now = round(time.time(), 3)
+    undo = history['undo']
+    patch = Patch()
+
+    last = undo[-1] if undo else None
+    if (coalesce_key and last and last.get('key') == coalesce_key
+            and now - last['ts'] <= HISTORY_COALESCE_SECONDS
+            and [change['id'] for change in last['changes']] == [change['id'] for change in changes]):
+        # Extend the previous step: keep its 'before', take the new 'after'
+        index = len(undo) - 1
+        patch['undo'][index]['ts'] = now
+        for n, change in enumerate(changes):
+            patch['undo'][index]['changes'][n]['after'] = change['after']
+    else:
+        patch['undo'].append({'action': action, 'ts': now, 'key': coalesce_key, 'changes': changes})
+        if len(undo) >= HISTORY_DEPTH:
+            del patch['undo'][0]
+
+    if history['redo']:
+        patch['redo'] = []
+    return patch
+
+
+def apply_operation(packages, operation, direction):
+    """
+    Work out how to undo ('before') or redo ('after') an operation
+
+    Returns:
+        tuple: (packages_patch, changed, structural) - a Patch for
+               packages-store, the (index, new package dict) of packages that
+               changed in place, and whether packages were added or removed
+               (which needs a full figure render)
+    """
+    packages_patch = Patch()
+    changed = []
+    structural = False
+    ids = [pkg['id'] for pkg in packages]
+    by_id = {pkg['id']: pkg for pkg in packages}
+
+    restored = []  # (index, package) put back where they were, once the others are done
+    changes = operation['changes'] if direction == 'after' else reversed(operation['changes'])
+    for change in changes:
+        target = change[direction]
+        index = ids.index(change['id']) if change['id'] in by_id else None
+
+        if target is None:
+            # Package did not exist on this side of the operation
+            if index is not None:
+                del packages_patch[index]
+                del ids[index]
+                by_id.pop(change['id'])
+                structural = True
+        elif index is None:
+            if 'index' in change:
+                restored.append((change['index'], target))
+            else:
+                packages_patch.append(target)
+                ids.append(change['id'])
+            by_id[change['id']] = target
+            structural = True
+        else:
+            packages_patch[index].update(target)
+            by_id[change['id']] = {**by_id[change['id']], **target}
+            changed.append((index, by_id[change['id']]))
+
+    # In ascending order each package lands on its index in the restored list
+    for index, target in sorted(restored, key=lambda item: item[0]):
+        packages_patch.insert(index, target)
+        ids.insert(index, target['id'])
+
+    return packages_patch, changed, structural
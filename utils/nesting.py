@@ -0,0 +1,132 @@
+"""Nest round ducts inside larger ones before loading (telescoping bundles)"""
+
+from bisect import bisect_left
+from collections import deque
+from config import NESTABLE_TYPES, DUCT_ROUND_TOLERANCE, DUCT_NEST_CLEARANCE
+from utils.geometry import calculate_totals, rotate_dimensions
+
+
+def package_type(pkg):
+    """Package type: first word of the name, e.g. 'SROR' for 'SROR 250 3000'"""
+    return pkg['name'].split(maxsplit=1)[0].upper() if pkg['name'].strip() else ''
+
+
+def is_nestable(pkg, tolerance=DUCT_ROUND_TOLERANCE):
+    """Whether a package is a round duct: a NESTABLE_TYPES type with a round (square) cross-section"""
+    return package_type(pkg) in NESTABLE_TYPES and abs(pkg['height'] - pkg['depth']) <= tolerance
+
+
+def match_bundles(ducts, clearance=DUCT_NEST_CLEARANCE):
+    """
+    Group ducts into telescoping bundles
+
+    Ducts are taken from the largest diameter down and each goes into the
+    free duct (one with nothing inside yet) with the shortest length it fits
+    in - a best-fit matching that keeps long ducts free for long ducts - or
+    starts a new bundle. Free ducts wait in a queue until the diameters
+    reach `clearance` below them, and are kept sorted by length, so this
+    runs in O(n log n).
+
+    Args:
+        ducts: List of (diameter, length, key)
+        clearance: Minimum diameter difference (m) for one duct to go in another
+
+    Returns:
+        dict: outer duct key -> keys of the ducts nested in it, largest first
+    """
+    bundles = {}
+    waiting = deque()  # (diameter, length, outer key): innermost ducts, largest diameter first
+    free_lengths, free_outers = [], []  # innermost ducts something can go into, sorted by length
+
+    for diameter, length, key in sorted(ducts, key=lambda duct: (-duct[0], -duct[1])):
+        while waiting and waiting[0][0] >= diameter + clearance - 1e-9:
+            _, free_length, outer = waiting.popleft()
+            position = bisect_left(free_lengths, free_length)
+            free_lengths.insert(position, free_length)
+            free_outers.insert(position, outer)
+
+        position = bisect_left(free_lengths, length - 1e-9)
+        if position < len(free_lengths):
+            del free_lengths[position]
+            outer = free_outers.pop(position)
+            bundles[outer].append(key)
+        else:
+            outer = key
+            bundles[outer] = []
+        waiting.append((diameter, length, outer))
+    return bundles
+
+
+def nest_packages(packages, clearance=DUCT_NEST_CLEARANCE):
+    """
+    Bundle round ducts so smaller diameters travel inside larger ones
+
+    A duct fits in another if its diameter is at least `clearance` smaller
+    and it is no longer (see match_bundles). Only ducts for the same
+    delivery stop are nested together. The outer duct of a bundle stays in
+    the list with the inner ducts (from the largest in) under 'nested';
+    everything else is unchanged, so the load plan, meshes and volume totals
+    only see the outer envelope.
+
+    Args:
+        packages: List of package dicts
+        clearance: Minimum diameter difference (m) for one duct to go in another
+
+    Returns:
+        tuple: (packages, stats) - the packages without the nested ducts, and
+               stats with ducts, bundles, nested, volume_before, volume_after
+    """
+    by_stop = {}
+    for index, pkg in enumerate(packages):
+        if is_nestable(pkg) and not pkg.get('nested'):
+            by_stop.setdefault(pkg.get('stop'), []).append((max(pkg['height'], pkg['depth']), pkg['width'], index))
+
+    bundles = {}
+    for ducts in by_stop.values():
+        bundles.update(match_bundles(ducts, clearance))
+
+    nested_in = {inner for inners in bundles.values() for inner in inners}
+    result = []
+    for index, pkg in enumerate(packages):
+        if index in nested_in:
+            continue
+        if bundles.get(index):
+            pkg = {**pkg, 'nested': [_nested_entry(packages[inner]) for inner in bundles[index]]}
+        result.append(pkg)
+
+    stats = {
+        'ducts': len(bundles) + len(nested_in),
+        'bundles': sum(1 for inners in bundles.values() if inners),
+        'nested': len(nested_in),
+        'volume_before': round(calculate_totals(packages), 4),
+        'volume_after': round(calculate_totals(result), 4),
+    }
+    return result, stats
+
+
+def _nested_entry(pkg):
+    """What is kept of a duct inside a bundle (its position follows the outer duct)"""
+    return {key: pkg[key] for key in ('id', 'name', 'width', 'depth', 'height', 'color', 'stackable', 'stop')
+            if key in pkg}
+
+
+def nested_count(packages):
+    """Number of ducts travelling inside other packages"""
+    return sum(len(pkg.get('nested', ())) for pkg in packages)
+
+
+def iter_nested_positions(pkg):
+    """
+    Yield (nested duct, x, y, z, size_x, size_y) for the ducts inside a package
+
+    Inner ducts are centered in the outer duct and turned the same way.
+    """
+    rotation = pkg.get('rotation', 0)
+    outer_x, outer_y = rotate_dimensions(pkg['width'], pkg['height'], rotation)
+    for inner in pkg.get('nested', ()):
+        size_x, size_y = rotate_dimensions(inner['width'], inner['height'], rotation)
+        yield (inner,
+               round(pkg['x'] + (outer_x - size_x) / 2, 3),
+               round(pkg['y'] + (outer_y - size_y) / 2, 3),
+               round(pkg['z'] + (pkg['depth'] - inner['depth']) / 2, 3),
+               size_x, size_y)
@@ -0,0 +1,176 @@
+"""Async order fetching from the transport management system (TM) over HTTP"""
+
+import asyncio
+import concurrent.futures
+import random
+import threading
+from urllib.parse import quote
+import aiohttp
+from config import (TM_BASE_URL, TM_POOL_SIZE, TM_MAX_CONCURRENCY, TM_TIMEOUT,
+                    TM_RETRIES, TM_BACKOFF)
+from utils.order_source import OrderSource
+
+
+class OrderNotFound(Exception):
+    """Raised when the TM has no order with the requested number"""
+
+
+class InvalidOrderResponse(Exception):
+    """Raised when the TM reply is not the expected JSON object with a 'packages' string"""
+
+
+class TMOrderFetcher:
+    """
+    Fetch order packages from the TM on a shared background event loop
+
+    All fetches run on one asyncio loop in a daemon thread with a pooled
+    aiohttp session, so many planners opening orders at once share a few
+    keep-alive connections instead of each holding a socket. Concurrent
+    requests for the same order are coalesced into one HTTP call.
+
+    Expected TM response for GET {base_url}/orders/{order_number}:
+        {"order_number": "123", "packages": "Name~W~L~H~Stackable|..."}
+    """
+
+    def __init__(self, base_url=TM_BASE_URL, pool_size=TM_POOL_SIZE,
+                 max_concurrency=TM_MAX_CONCURRENCY, timeout=TM_TIMEOUT,
+                 retries=TM_RETRIES, backoff=TM_BACKOFF):
+        self.base_url = base_url.rstrip('/')
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.stats = {'requests': 0, 'coalesced': 0, 'retries': 0, 'failures': 0}
+
+        self._in_flight = {}
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name='tm-fetch', daemon=True)
+        self._thread.start()
+
+        # Session and semaphore must be created on the loop that uses them
+        self._session, self._semaphore = asyncio.run_coroutine_threadsafe(
+            self._setup(max_concurrency), self._loop
+        ).result()
+
+    async def _setup(self, max_concurrency):
+        connector = aiohttp.TCPConnector(limit=self.pool_size, keepalive_timeout=30)
+        session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=self.timeout)
+        )
+        return session, asyncio.Semaphore(max_concurrency)
+
+    async def fetch(self, order_number):
+        """
+        Fetch the package string of an order (coroutine, runs on the fetch loop)
+
+        Raises:
+            OrderNotFound: The TM returned 404
+            InvalidOrderResponse: The reply was not a JSON object
+            aiohttp.ClientError / asyncio.TimeoutError: All retries failed
+        """
+        order_number = str(order_number)
+        task = self._in_flight.get(order_number)
+        if task is not None:
+            self.stats['coalesced'] += 1
+            return await asyncio.shield(task)
+
+        task = asyncio.ensure_future(self._fetch_with_retry(order_number))
+        self._in_flight[order_number] = task
+        task.add_done_callback(lambda _: self._in_flight.pop(order_number, None))
+        return await asyncio.shield(task)
+
+    async def _fetch_with_retry(self, order_number):
+        # The order number comes from the browser: escaped, it can only name an order
+        url = f"{self.base_url}/orders/{quote(str(order_number), safe='')}"
+
+        for attempt in range(self.retries + 1):
+            try:
+                async with self._semaphore:
+                    self.stats['requests'] += 1
+                    async with self._session.get(url) as response:
+                        if response.status == 404:
+                            raise OrderNotFound(order_number)
+                        response.raise_for_status()
+                        try:
+                            data = await response.json(content_type=None)
+                        except ValueError as e:  # json.JSONDecodeError, or a body that is not text
+                            raise InvalidOrderResponse(f'{url}: {e}') from e
+                        if not isinstance(data, dict):
+                            raise InvalidOrderResponse(f'{url}: expected a JSON object')
+                        packages = data.get('packages')
+                        if packages is not None and not isinstance(packages, str):
+                            raise InvalidOrderResponse(f"{url}: 'packages' is not a string")
+                        return packages or None
+
+            except OrderNotFound:
+                raise
+            except InvalidOrderResponse:
+                # A malformed reply won't get better on retry
+                self.stats['failures'] += 1
+                raise
+            except aiohttp.ClientResponseError as e:
+                # Client errors other than 404 won't succeed on retry
+                if e.status < 500 or attempt == self.retries:
+                    self.stats['failures'] += 1
+                    raise
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                if attempt == self.retries:
+                    self.stats['failures'] += 1
+                    raise
+
+            # Exponential backoff with jitter so retries don't arrive in lockstep
+            self.stats['retries'] += 1
+            await asyncio.sleep(self.backoff * (2 ** attempt) * (0.5 + random.random()))
+
+    def fetch_packages(self, order_number, timeout=None):
+        """
+        Fetch an order from a (non-async) Dash callback thread
+
+        The calling thread only waits on the result; the HTTP work runs on the
+        shared fetch loop. If the wait times out, the fetch is cancelled so
+        nothing is left running on the loop for a caller that has given up.
+
+        Returns:
+            str or None: Package string, None if the order is unknown
+        """
+        future = asyncio.run_coroutine_threadsafe(self.fetch(order_number), self._loop)
+        total_timeout = timeout or self.timeout * (self.retries + 1) + self.backoff * 2 ** (self.retries + 1)
+        try:
+            return future.result(total_timeout)
+        except OrderNotFound:
+            return None
+        except TimeoutError:
+            future.cancel()
+            self._loop.call_soon_threadsafe(self._cancel_in_flight, str(order_number))
+            raise
+
+    def _cancel_in_flight(self, order_number):
+        """Cancel the shared HTTP task of an order (runs on the fetch loop)"""
+        task = self._in_flight.pop(order_number, None)
+        if task is not None and not task.done():
+            task.cancel()
+
+    def close(self):
+        """Close the session and stop the fetch loop"""
+        asyncio.run_coroutine_threadsafe(self._session.close(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+
+
+class TMOrderSource(OrderSource):
+    """Order source backed by the TM HTTP API (see TMOrderFetcher)"""
+
+    def __init__(self, base_url=TM_BASE_URL):
+        self.fetcher = TMOrderFetcher(base_url)
+
+    def get_packages(self, order_number):
+        try:
+            return self.fetcher.fetch_packages(order_number)
+        except (aiohttp.ClientError, asyncio.TimeoutError, TimeoutError, InvalidOrderResponse,
+                concurrent.futures.CancelledError) as e:
+            print(f"❌ TM fetch failed for order {order_number}: {e!r}")
+            return None
+
+    def close(self):
+        self.fetcher.close()
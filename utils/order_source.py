@@ -0,0 +1,178 @@
+"""Order data sources - look up package strings by order number"""
+
+import os
+import queue
+import sqlite3
+import time
+from contextlib import contextmanager
+from config import ORDER_SOURCE, ORDER_DB_PATH, ORDER_DB_POOL_SIZE, ORDER_SOURCE_RETRY
+
+
+# Statements are constants so sqlite3's per-connection statement cache
+# reuses the compiled (prepared) query on every lookup
+SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS orders (
+        order_number TEXT PRIMARY KEY,
+        packages TEXT NOT NULL
+    ) WITHOUT ROWID
+'''
+SELECT_PACKAGES = 'SELECT packages FROM orders WHERE order_number = ?'
+REPLACE_ORDER = 'INSERT OR REPLACE INTO orders (order_number, packages) VALUES (?, ?)'
+APPEND_ORDER = '''
+    INSERT INTO orders (order_number, packages) VALUES (?, ?)
+    ON CONFLICT(order_number) DO UPDATE SET packages = packages || '|' || excluded.packages
+'''
+
+
+class OrderSource:
+    """
+    Base class for order data sources
+
+    A source returns the raw package string of an order in the Power BI
+    format (Name~Width~Length~Height~Stackable|...) so it goes through the
+    same parse path as the URL parameter.
+    """
+
+    def get_packages(self, order_number):
+        """Return the package string for an order, or None if unknown"""
+        raise NotImplementedError
+
+    def close(self):
+        """Release any held resources"""
+
+
+class SQLiteOrderSource(OrderSource):
+    """
+    Read-only SQLite order source with a small connection pool
+
+    Lookups go through the order_number primary key (a clustered index on a
+    WITHOUT ROWID table), so a lookup is a single B-tree search regardless
+    of how many orders are stored.
+    """
+
+    def __init__(self, path, pool_size=ORDER_DB_POOL_SIZE):
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"Order database not found: {path}")
+
+        self.path = path
+        self._pool = queue.LifoQueue(maxsize=pool_size)
+        for _ in range(pool_size):
+            self._pool.put(self._connect())
+
+    def _connect(self):
+        """Open a read-only connection tuned for point lookups"""
+        conn = sqlite3.connect(f'file:{self.path}?mode=ro', uri=True,
+                               check_same_thread=False, cached_statements=32)
+        conn.execute('PRAGMA query_only = ON')
+        conn.execute('PRAGMA mmap_size = 268435456')  # 256 MB
+        conn.execute('PRAGMA cache_size = -16384')  # 16 MB
+        return conn
+
+    @contextmanager
+    def connection(self):
+        """Borrow a pooled connection (blocks if all are in use)"""
+        conn = self._pool.get()
+        try:
+            yield conn
+        finally:
+            self._pool.put(conn)
+
+    def get_packages(self, order_number):
+        with self.connection() as conn:
+            row = conn.execute(SELECT_PACKAGES, (str(order_number),)).fetchone()
+        return row[0] if row else None
+
+    def close(self):
+        while not self._pool.empty():
+            self._pool.get_nowait().close()
+
+
+def _create_tm_source():
+    # Imported here so aiohttp is only needed when the TM source is configured
+    from utils.order_fetch import TMOrderSource
+    return TMOrderSource()
+
+
+ORDER_SOURCES = {
+    'sqlite': lambda: SQLiteOrderSource(ORDER_DB_PATH),
+    'tm': _create_tm_source,
+}
+
+_source = None
+_retry_at = 0.0  # time.monotonic() after which a failed open is tried again
+
+
+def get_order_source():
+    """
+    Return the configured order source (created once per process)
+
+    Returns None if ORDER_SOURCE is not set or the source can't be opened,
+    in which case callers fall back to demo data. Only a successful open is
+    kept: after a failure the source is opened again on the first call
+    ORDER_SOURCE_RETRY seconds later, so e.g. a database file that appears
+    after startup is picked up without a restart.
+    """
+    global _source, _retry_at
+    if _source is None and ORDER_SOURCE and time.monotonic() >= _retry_at:
+        try:
+            _source = ORDER_SOURCES[ORDER_SOURCE]()
+            print(f"🗄️ Using '{ORDER_SOURCE}' order source")
+        except (KeyError, ImportError, FileNotFoundError, sqlite3.Error) as e:
+            _retry_at = time.monotonic() + ORDER_SOURCE_RETRY
+            print(f"⚠️ Order source '{ORDER_SOURCE}' unavailable: {e} (retrying in {ORDER_SOURCE_RETRY}s)")
+    return _source
+
+
+def bulk_import(path, orders, batch_size=10000):
+    """
+    Bulk load orders into a SQLite order database
+
+    The first occurrence of an order in this import replaces any stored
+    packages; later occurrences are appended, so extracts with one row per
+    package don't need to be grouped or sorted.
+
+    Args:
+        path: Database file (created if missing)
+        orders: Iterable of (order_number, package_string) tuples
+        batch_size: Rows written per transaction
+
+    Returns:
+        int: Number of rows written
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    conn = sqlite3.connect(path)
+    conn.execute('PRAGMA journal_mode = WAL')
+    conn.execute('PRAGMA synchronous = OFF')
+    conn.execute(SCHEMA)
+
+    seen = set()
+    written = 0
+    replace_batch, append_batch = [], []
+
+    def flush():
+        with conn:
+            conn.executemany(REPLACE_ORDER, replace_batch)
+            conn.executemany(APPEND_ORDER, append_batch)
+        replace_batch.clear()
+        append_batch.clear()
+
+    for order_number, package_string in orders:
+        order_number = str(order_number).strip()
+        if not order_number or not package_string:
+            continue
+
+        if order_number in seen:
+            append_batch.append((order_number, package_string))
+        else:
+            seen.add(order_number)
+            replace_batch.append((order_number, package_string))
+        written += 1
+
+        if len(replace_batch) + len(append_batch) >= batch_size:
+            flush()
+
+    flush()
+    conn.execute('PRAGMA optimize')
+    conn.execute('PRAGMA journal_mode = DELETE')  # readers open the file read-only
+    conn.close()
+    return written
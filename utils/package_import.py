@@ -0,0 +1,296 @@
+"""Chunked import of package lists from uploaded CSV/Excel files"""
+
+import base64
+import csv
+import os
+import re
+import time
+import uuid
+from config import (PACKAGE_TYPE_COLORS, DEFAULT_PACKAGE_COLOR, IMPORT_UPLOAD_DIR,
+                    IMPORT_BATCH_SIZE, IMPORT_DELIMITER, NEST_DUCTS)
+from utils.nesting import nest_packages
+
+try:
+    import openpyxl
+except ImportError:  # openpyxl is optional - only needed for .xlsx uploads
+    openpyxl = None
+
+
+# Header names accepted for each package field (case-insensitive)
+IMPORT_COLUMNS = {
+    'name': ('name', 'package', 'package_name', 'description'),
+    'width': ('width', 'w'),
+    'length': ('length', 'depth', 'l'),
+    'height': ('height', 'h'),
+    'stackable': ('stackable', 'stack'),
+    'stop': ('stop', 'drop', 'delivery_stop'),
+}
+REQUIRED_COLUMNS = ('name', 'width', 'length', 'height')
+
+MAX_REPORTED_ERRORS = 20
+UPLOAD_MAX_AGE = 24 * 3600  # seconds - abandoned uploads are removed after this
+DECODE_CHUNK = 4 * 1024 * 1024  # base64 characters decoded per write (multiple of 4)
+UPLOAD_TOKEN = re.compile(r'[0-9a-f]{32}\.csv|[0-9a-f]{32}\.txt')
+DELIMITERS = ';,\t'
+DECIMAL_COMMA = re.compile(r'\s*-?\d+,\d+\s*')
+
+
+def save_upload(contents, filename, upload_dir=IMPORT_UPLOAD_DIR):
+    """
+    Decode a dcc.Upload payload to a CSV file on disk
+
+    dcc.Upload sends the whole base64 payload to the callback, so the upload
+    itself is held in memory once. It is decoded to disk in chunks and .xlsx
+    files are converted row by row, so no decoded copy is kept alongside it.
+
+    Args:
+        contents: dcc.Upload contents ('data:<mime>;base64,<data>')
+        filename: Uploaded file name (the extension selects CSV or Excel)
+        upload_dir: Directory for the decoded file
+
+    Returns:
+        str: Upload token - the name of the CSV file in upload_dir (see upload_path)
+    """
+    extension = os.path.splitext(filename or '')[1].lower()
+    if extension not in ('.csv', '.txt', '.xlsx'):
+        raise ValueError(f"Unsupported file type '{extension or filename}' - use .csv or .xlsx")
+    if extension == '.xlsx' and openpyxl is None:
+        raise ValueError("Excel import needs the openpyxl package - upload a CSV instead")
+
+    os.makedirs(upload_dir, exist_ok=True)
+    _prune_uploads(upload_dir)
+
+    path = os.path.join(upload_dir, f'{uuid.uuid4().hex}{extension}')
+    data_start = contents.index(',') + 1
+    with open(path, 'wb') as f:
+        for start in range(data_start, len(contents), DECODE_CHUNK):
+            f.write(base64.b64decode(contents[start:start + DECODE_CHUNK]))
+
+    if extension != '.xlsx':
+        return os.path.basename(path)
+
+    csv_path = f'{path[:-len(extension)]}.csv'
+    try:
+        xlsx_to_csv(path, csv_path)
+    finally:
+        os.remove(path)
+    return os.path.basename(csv_path)
+
+
+def upload_path(token, upload_dir=IMPORT_UPLOAD_DIR):
+    """
+    Server-side path of an upload token
+
+    The token comes back from the browser with the import job, so it is
+    only accepted if it has the form save_upload gives out and resolves to
+    a file inside upload_dir.
+
+    Raises:
+        ValueError: The token does not name an upload
+    """
+    if not isinstance(token, str) or not UPLOAD_TOKEN.fullmatch(token):
+        raise ValueError('Invalid upload token')
+    root = os.path.realpath(upload_dir)
+    path = os.path.realpath(os.path.join(root, token))
+    if os.path.dirname(path) != root:
+        raise ValueError('Invalid upload token')
+    return path
+
+
+def xlsx_to_csv(xlsx_path, csv_path):
+    """Stream the first worksheet of an Excel file into a CSV file"""
+    workbook = openpyxl.load_workbook(xlsx_path, read_only=True, data_only=True)
+    try:
+        with open(csv_path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            for row in workbook.worksheets[0].iter_rows(values_only=True):
+                writer.writerow(['' if value is None else value for value in row])
+    finally:
+        workbook.close()
+
+
+def _prune_uploads(upload_dir, max_age=UPLOAD_MAX_AGE):
+    """Remove uploads left behind by imports that were never finished"""
+    cutoff = time.time() - max_age
+    for name in os.listdir(upload_dir):
+        path = os.path.join(upload_dir, name)
+        try:
+            if os.path.getmtime(path) < cutoff:
+                os.remove(path)
+        except OSError:
+            pass  # removed by another worker
+
+
+def find_columns(header):
+    """
+    Map package fields to column indexes of a CSV header
+
+    Returns:
+        dict: field -> column index (stackable and stop are None if absent)
+    """
+    normalized = [h.strip().lower() for h in header]
+    columns = {}
+    for field, names in IMPORT_COLUMNS.items():
+        columns[field] = next((normalized.index(name) for name in names if name in normalized), None)
+
+    missing = [field for field in REQUIRED_COLUMNS if columns[field] is None]
+    if missing:
+        raise ValueError(f"Missing columns: {', '.join(missing)} (header: {', '.join(header)})")
+    return columns
+
+
+def detect_delimiter(sample):
+    """
+    Guess the delimiter of a CSV sample
+
+    Only ';', ',' and tab are considered. A sample that the sniffer splits on
+    ',' is read as ';' separated when its ';' fields hold decimal commas
+    (e.g. '1,2;0,8'), as European exports do.
+
+    Returns:
+        str: Delimiter
+    """
+    try:
+        delimiter = csv.Sniffer().sniff(sample, delimiters=DELIMITERS).delimiter
+    except csv.Error:
+        delimiter = ';' if ';' in sample.partition('\n')[0] else ','
+
+    if delimiter == ',' and ';' in sample:
+        rows = csv.reader(sample.splitlines()[:20], delimiter=';')
+        if any(DECIMAL_COMMA.fullmatch(value) for row in rows for value in row):
+            delimiter = ';'
+    return delimiter
+
+
+def _read_records(f, offset, delimiter):
+    """
+    Yield (record, end_offset, lines) for each CSV record from a byte offset
+
+    end_offset is the byte position just after the record, so an import can
+    stop after any record and resume there on the next batch. lines is the
+    number of physical lines read from offset up to the end of the record
+    (quoted fields may span several).
+    """
+    position = offset
+    f.seek(offset)
+
+    def lines():
+        nonlocal position
+        for line in iter(f.readline, b''):
+            position += len(line)
+            yield line.decode('utf-8')
+
+    # csv.reader only pulls more lines for quoted multi-line fields, so
+    # position is at the end of the record it just returned
+    reader = csv.reader(lines(), delimiter=delimiter)
+    for record in reader:
+        yield record, position, reader.line_num
+
+
+def start_import(token, filename):
+    """
+    Read the header of an uploaded file and create the import job
+
+    The job is a plain dict (kept in a dcc.Store) that records how far the
+    import has got, so each batch can run in any worker. It holds the upload
+    token, never a file path - the browser can edit it.
+
+    Returns:
+        dict: Import job
+    """
+    path = upload_path(token)
+    with open(path, 'rb') as f:
+        sample = f.read(4096).decode('utf-8', errors='ignore')
+        offset = 3 if sample.startswith('\ufeff') else 0  # skip UTF-8 BOM
+        delimiter = IMPORT_DELIMITER or detect_delimiter(sample.lstrip('\ufeff'))
+        header, offset, lines = next(_read_records(f, offset, delimiter), ([], offset, 0))
+
+    return {
+        'upload': token,
+        'filename': filename,
+        'delimiter': delimiter,
+        'columns': find_columns(header),
+        'offset': offset,
+        'size': os.path.getsize(path),
+        'line': lines,
+        'rows': 0,
+        'parsed': 0,
+        'malformed': 0,
+        'errors': [],
+        'batches': 0,
+        'done': False,
+    }
+
+
+def import_batch(job, batch_size=IMPORT_BATCH_SIZE):
+    """
+    Parse the next batch of rows of an import job
+
+    Rows are validated with the same bulk parser as the URL payload, so an
+    uploaded row gives exactly the package dict its Power BI string would.
+    The upload file is removed once the last batch is read.
+
+    Returns:
+        tuple: (packages, job) - the new packages (ids continue from the
+               previous batches) and the updated job
+    """
+    from utils.bulk_parser import parse_packages_bulk, table_to_packages  # numpy - keep it off the startup path
+
+    job = dict(job)
+    columns = job['columns']
+    fields = [columns.get(field) for field in ('name', 'width', 'length', 'height', 'stackable', 'stop')]
+
+    line_numbers, row_strings, invalid = [], [], []
+    read = 0  # physical lines read by this batch
+    with open(upload_path(job['upload']), 'rb') as f:
+        for record, offset, lines in _read_records(f, job['offset'], job['delimiter']):
+            line = job['line'] + read + 1  # first line of the record
+            read = lines
+            job['offset'] = offset
+            if not any(value.strip() for value in record):
+                continue  # blank line
+
+            values = [record[col].strip() if col is not None and col < len(record) else ''
+                      for col in fields]
+            if any('~' in value or '|' in value for value in values):
+                invalid.append({'row': line, 'raw': ','.join(record)[:200],
+                               'reason': "'~' and '|' are not allowed in values"})
+            else:
+                line_numbers.append(line)
+                row_strings.append('~'.join(values))
+
+            if len(row_strings) + len(invalid) >= batch_size:
+                break
+        else:
+            job['done'] = True
+
+    table, rejected = parse_packages_bulk('|'.join(row_strings), PACKAGE_TYPE_COLORS, DEFAULT_PACKAGE_COLOR)
+    for error in rejected:
+        error['row'] = line_numbers[error['row'] - 1]
+    errors = sorted(invalid + rejected, key=lambda error: error['row'])
+
+    packages = table_to_packages(table)
+    for pkg in packages:
+        pkg['id'] += job['parsed']
+    parsed = len(packages)
+    if NEST_DUCTS:
+        packages, _ = nest_packages(packages)  # ducts are nested within each batch
+
+    job['line'] += read
+    job['batches'] += 1
+    job['rows'] += len(row_strings) + len(invalid)
+    job['parsed'] += parsed
+    job['malformed'] += len(errors)
+    job['errors'] = (job['errors'] + errors)[:MAX_REPORTED_ERRORS]
+
+    if job['done']:
+        cancel_import(job)
+    return packages, job
+
+
+def cancel_import(job):
+    """Remove the upload file of an import job"""
+    try:
+        os.remove(upload_path(job.get('upload')))
+    except (ValueError, OSError):
+        pass
@@ -0,0 +1,271 @@
+"""Pallets of cartons: packages that carry other packages, handled as one box until opened"""
+
+import math
+from config import PALLETIZE_TYPES, PALLET_BASE, PALLET_MAX_DEPTH, PALLET_COLOR, PALLET_DETAIL_MAX_CARTONS
+from utils.geometry import rotate_dimensions, calculate_totals
+from utils.nesting import package_type
+from utils.placement import footprint_options
+
+
+def is_pallet(pkg):
+    """Whether a package carries cartons (under 'contents')"""
+    return bool(pkg.get('contents'))
+
+
+def carton_count(packages):
+    """Number of cartons carried on pallets"""
+    return sum(len(pkg.get('contents', ())) for pkg in packages)
+
+
+def bounding_box(pkg):
+    """(x1, y1, z1, x2, y2, z2) of a package in the truck - for a pallet, around the base and all cartons"""
+    size_x, size_y = rotate_dimensions(pkg['width'], pkg['height'], pkg.get('rotation', 0))
+    return pkg['x'], pkg['y'], pkg['z'], pkg['x'] + size_x, pkg['y'] + size_y, pkg['z'] + pkg['depth']
+
+
+def iter_contents(pkg):
+    """
+    Yield the cartons on a pallet as package dicts placed in the truck
+
+    Cartons are stored relative to the pallet corner with the pallet
+    unturned; here they are turned with the pallet and moved to its position.
+    """
+    rotation = pkg.get('rotation', 0)
+    for carton in pkg.get('contents', ()):
+        size_x, size_y = rotate_dimensions(carton['width'], carton['height'], carton.get('rotation', 0))
+        x, y = carton['x'], carton['y']
+        if rotation == 90:
+            x, y = y, pkg['width'] - x - size_x
+        elif rotation == 180:
+            x, y = pkg['width'] - x - size_x, pkg['height'] - y - size_y
+        elif rotation == 270:
+            x, y = pkg['height'] - y - size_y, x
+        yield {**carton,
+               'x': round(pkg['x'] + x, 3), 'y': round(pkg['y'] + y, 3), 'z': round(pkg['z'] + carton['z'], 3),
+               'rotation': (carton.get('rotation', 0) + rotation) % 360}
+
+
+def pallet_base(pkg):
+    """The pallet base of a pallet as a package dict placed in the truck (for drawing)"""
+    return {'id': pkg['id'], 'name': pkg['name'], 'x': pkg['x'], 'y': pkg['y'], 'z': pkg['z'],
+            'width': pkg['width'], 'depth': pkg.get('base', 0.0), 'height': pkg['height'],
+            'rotation': pkg.get('rotation', 0), 'color': PALLET_COLOR}
+
+
+def top_under(other, x1, y1, x2, y2):
+    """
+    Top of a package under the footprint x1..x2, y1..y2, or None if it is not under it
+
+    Parent first: the pallet's bounding box is checked, and only if it
+    overlaps the footprint are its cartons looked at, so a package set on a
+    pallet rests on the cartons it actually covers, not on the tallest one.
+    """
+    ox1, oy1, _, ox2, oy2, oz2 = bounding_box(other)
+    if x2 <= ox1 or x1 >= ox2 or y2 <= oy1 or y1 >= oy2:
+        return None
+    if not is_pallet(other):
+        return oz2
+
+    top = other['z'] + other.get('base', 0.0)
+    for carton in iter_contents(other):
+        cx1, cy1, _, cx2, cy2, cz2 = bounding_box(carton)
+        if not (x2 <= cx1 or x1 >= cx2 or y2 <= cy1 or y1 >= cy2):
+            top = max(top, cz2)
+    return top
+
+
+def detail_ids(packages, expanded=(), selected_id=None, max_cartons=PALLET_DETAIL_MAX_CARTONS):
+    """
+    Pallets to draw carton by carton (level of detail)
+
+    The selected pallet comes first, then expanded pallets in list order,
+    while the cartons drawn stay within max_cartons; all other pallets are
+    drawn as one box. This keeps the figure size bounded however many
+    cartons an order has.
+
+    Returns:
+        set: Package ids of pallets to draw in detail
+    """
+    pallets = {pkg['id']: len(pkg['contents']) for pkg in packages if is_pallet(pkg)}
+    wanted = [selected_id] if selected_id in pallets else []
+    wanted += [pallet_id for pallet_id in expanded or () if pallet_id in pallets and pallet_id != selected_id]
+
+    detailed, cartons = set(), 0
+    for pallet_id in wanted:
+        if cartons + pallets[pallet_id] > max_cartons and detailed:
+            break
+        detailed.add(pallet_id)
+        cartons += pallets[pallet_id]
+    return detailed
+
+
+def can_palletize(pkg, base=PALLET_BASE, max_depth=PALLET_MAX_DEPTH):
+    """Whether a package is a stackable PALLETIZE_TYPES carton that fits on a pallet"""
+    return (package_type(pkg) in PALLETIZE_TYPES and pkg.get('stackable', False) and not is_pallet(pkg)
+            and pkg['depth'] <= max_depth - base['depth']
+            and any(fx <= base['width'] and fy <= base['height'] for fx, fy, _ in footprint_options(pkg)))
+
+
+def _supported(layer, z, x1, y1, x2, y2):
+    """Whether the cartons of a layer with their top at z cover the footprint x1..x2, y1..y2"""
+    area = sum(max(0.0, min(x2, rx2) - max(x1, rx1)) * max(0.0, min(y2, ry2) - max(y1, ry1))
+               for rx1, ry1, rx2, ry2, top in layer if abs(top - z) <= 1e-9)
+    return area >= (x2 - x1) * (y2 - y1) - 1e-9
+
+
+def build_pallet_loads(cartons, base=PALLET_BASE, max_depth=PALLET_MAX_DEPTH, limits=None, upright=()):
+    """
+    Stack cartons onto as few pallets as a layer-by-layer fill needs
+
+    Cartons are taken tallest first, so each layer is as tall as its first
+    carton, and laid in rows along the pallet (long side along it where it
+    fits), rows across it, then a new layer on top - or a new pallet when
+    the next layer would be higher than max_depth. One pass, O(n log n).
+
+    With load rules (limits), every carton counts as carrying all the
+    weight in the layers above it, a pallet is no higher than the lowest
+    max stack height of its cartons, fragile cartons come last and only in
+    the top layer of a pallet, and upright cartons above the bottom layer
+    only go where the layer below covers their whole footprint.
+
+    Args:
+        cartons: Package dicts that pass can_palletize
+        base: Pallet size {'width', 'height', 'depth'} (m)
+        max_depth: Height of a loaded pallet including the base (m)
+        limits: Optional id -> (weight, max load on top, max stack height,
+                can carry), see utils.constraints.stack_limits
+        upright: Ids of cartons that must stand level
+
+    Returns:
+        list: One list per pallet of carton copies with x, y, z (relative to
+              the pallet corner, z from the floor under the pallet) and rotation
+    """
+    from utils.constraints import NO_LIMITS
+
+    limits = limits or {}
+    loads = []
+    row_x = row_y = row_size = layer_z = layer_top = 0.0
+    # Weight the layer may still add, lowest max load in the layer, height limit of the pallet
+    room = layer_load = top_limit = math.inf
+    layer_fragile = False
+    layer, below = [], []  # (x1, y1, x2, y2, top) of the cartons in this layer and the one under it
+
+    def order(carton):
+        fragile = not limits.get(carton['id'], NO_LIMITS)[3]
+        return fragile, -carton['depth'], -carton['width'] * carton['height'], carton['id']
+
+    for carton in sorted(cartons, key=order):
+        weight, max_load, max_top, can_carry = limits.get(carton['id'], NO_LIMITS)
+        # Fit tests allow 1e-9 m, so three 0.4 m cartons (1.2000000000000002) fill a 1.2 m pallet
+        width, length = base['width'] + 1e-9, base['height'] + 1e-9
+        options = sorted((o for o in footprint_options(carton) if o[0] <= width and o[1] <= length),
+                         key=lambda o: -o[0])
+        level = carton['id'] in upright
+
+        def stands(x, y, o, under, z):
+            return not level or z <= base['depth'] + 1e-9 or _supported(under, z, x, y, x + o[0], y + o[1])
+
+        option = None
+        if loads and layer_top <= max_top + 1e-9 and weight <= room + 1e-9:
+            option = next((o for o in options if row_x + o[0] <= width and row_y + o[1] <= length
+                           and stands(row_x, row_y, o, below, layer_z)), None)
+            if option is None:  # next row across the pallet
+                row_x, row_y, row_size = 0.0, row_y + row_size, 0.0
+                option = next((o for o in options if row_y + o[1] <= length
+                               and stands(row_x, row_y, o, below, layer_z)), None)
+        if (option is None and loads and not layer_fragile and weight <= min(room, layer_load) + 1e-9
+                and layer_top + carton['depth'] <= min(max_depth, top_limit, max_top) + 1e-9):  # next layer up
+            option = next((o for o in options if stands(0.0, 0.0, o, layer, layer_top)), None)
+            if option is not None:
+                layer_z, layer_top = layer_top, layer_top + carton['depth']
+                room, layer_load, layer_fragile = min(room, layer_load), math.inf, False
+                layer, below = [], layer
+                row_x = row_y = row_size = 0.0
+        if option is None:  # next pallet
+            loads.append([])
+            layer_z, layer_top = base['depth'], base['depth'] + carton['depth']
+            room = layer_load = top_limit = math.inf
+            layer_fragile = False
+            layer, below = [], []
+            row_x = row_y = row_size = 0.0
+            option = options[0]
+
+        fx, fy, rotation = option
+        loads[-1].append({**carton, 'x': round(row_x, 3), 'y': round(row_y, 3), 'z': round(layer_z, 3),
+                          'rotation': rotation})
+        layer.append((row_x, row_y, row_x + fx, row_y + fy, layer_z + carton['depth']))
+        row_x += fx
+        row_size = max(row_size, fy)
+        room -= weight
+        layer_load = min(layer_load, max_load)
+        layer_fragile = layer_fragile or not can_carry
+        top_limit = min(top_limit, max_top)
+    return loads
+
+
+def palletize_packages(packages, next_id, base=PALLET_BASE, max_depth=PALLET_MAX_DEPTH, dock_x=0.0,
+                       rules=None):
+    """
+    Build loose cartons onto pallets
+
+    Cartons (see can_palletize) for the same delivery stop are stacked onto
+    pallets with build_pallet_loads. Each pallet is a package of the pallet
+    footprint and the height of its load, with the cartons under 'contents',
+    so placement, stacking and volume totals treat it as one box. Other
+    packages are kept as they are; pallets are added at the end, parked at
+    x = dock_x (the truck length: on the dock behind the door, like packages
+    auto-place could not fit) so they never overlap the load. With load
+    rules, the pallets keep to them (see build_pallet_loads); cartons whose
+    max stack height is below the pallet base plus the carton stay loose.
+
+    Args:
+        packages: List of package dicts
+        next_id: Id of the first pallet (following ids for the rest)
+        base: Pallet size {'width', 'height', 'depth'} (m)
+        max_depth: Height of a loaded pallet including the base (m)
+        dock_x: X of the new pallets (m)
+        rules: Optional package type -> rule dict (see utils.constraints)
+
+    Returns:
+        tuple: (packages, stats) - the new package list, and stats with
+               cartons, pallets, volume_before, volume_after
+    """
+    from utils.constraints import NO_LIMITS, stack_limits
+
+    candidates = [pkg for pkg in packages if can_palletize(pkg, base, max_depth)]
+    limits = stack_limits(candidates, rules)
+    upright = {pkg['id'] for pkg in candidates if (rules or {}).get(package_type(pkg), {}).get('upright')}
+    by_stop = {}
+    for pkg in candidates:
+        if base['depth'] + pkg['depth'] <= limits.get(pkg['id'], NO_LIMITS)[2] + 1e-9:
+            by_stop.setdefault(pkg.get('stop'), []).append(pkg)
+
+    pallets = []
+    for stop, cartons in sorted(by_stop.items(), key=lambda item: (item[0] is None, item[0] or 0)):
+        for load in build_pallet_loads(cartons, base, max_depth, limits, upright):
+            pallet = {
+                'id': next_id + len(pallets),
+                'name': f'PALLET {len(pallets) + 1}',
+                'x': float(dock_x), 'y': 0.0, 'z': 0.0,
+                'width': base['width'],
+                'depth': round(max(carton['z'] + carton['depth'] for carton in load), 3),
+                'height': base['height'],
+                'rotation': 0,
+                'color': PALLET_COLOR,
+                'stackable': False,
+                'base': base['depth'],
+                'contents': load,
+            }
+            if stop is not None:
+                pallet['stop'] = stop
+            pallets.append(pallet)
+
+    palletized = {pkg['id'] for cartons in by_stop.values() for pkg in cartons}
+    result = [pkg for pkg in packages if pkg['id'] not in palletized] + pallets
+    stats = {
+        'cartons': len(palletized),
+        'pallets': len(pallets),
+        'volume_before': round(calculate_totals(packages), 4),
+        'volume_after': round(calculate_totals(result), 4),
+    }
+    return result, stats
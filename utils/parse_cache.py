@@ -0,0 +1,151 @@
+"""Bounded LRU/TTL cache for parsed package strings, shared across workers on disk"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from config import PARSE_CACHE_SIZE, PARSE_CACHE_TTL, PARSE_CACHE_DIR, PARSE_CACHE_DISK_ENTRIES
+
+
+class ParseCache:
+    """
+    Two-level cache keyed by a hash of the raw input
+
+    Level 1 is an in-process LRU dict; level 2 is a directory of JSON files
+    that every worker process on the machine reads and writes, so an order
+    parsed by one worker is a cache hit in the others. Both levels expire
+    entries after ttl seconds. The disk level is LRU as well: a hit stamps
+    the file's access time, and pruning drops the least recently used files
+    (the modification time stays the write time, for the ttl).
+    """
+
+    def __init__(self, max_entries=PARSE_CACHE_SIZE, ttl=PARSE_CACHE_TTL,
+                 disk_dir=PARSE_CACHE_DIR, disk_entries=PARSE_CACHE_DISK_ENTRIES):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.disk_dir = disk_dir
+        self.disk_entries = disk_entries
+        self.stats = {'memory_hits': 0, 'disk_hits': 0, 'misses': 0}
+
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._writes = 0
+
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+
+    @staticmethod
+    def make_key(raw, version=''):
+        """Hash raw input (plus a parser version) into a cache key"""
+        return hashlib.sha256(f'{version}\0{raw}'.encode('utf-8')).hexdigest()
+
+    def get(self, key):
+        """Return the cached value for key, or None"""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    self.stats['memory_hits'] += 1
+                    return value
+                del self._entries[key]
+
+        value = self._read_disk(key, now)
+        if value is not None:
+            self.stats['disk_hits'] += 1
+            self._remember(key, value, now)
+        return value
+
+    def set(self, key, value):
+        """Store a JSON-serializable value in memory and on disk"""
+        now = time.time()
+        self._remember(key, value, now)
+        self._write_disk(key, value)
+
+    def get_or_compute(self, raw, compute, version=''):
+        """
+        Return compute(raw), reusing a cached result for identical input
+
+        Returns:
+            tuple: (value, hit) where hit is True if the value came from cache
+        """
+        key = self.make_key(raw, version)
+        value = self.get(key)
+        if value is not None:
+            return value, True
+
+        self.stats['misses'] += 1
+        value = compute(raw)
+        self.set(key, value)
+        return value, False
+
+    def _remember(self, key, value, now):
+        with self._lock:
+            self._entries[key] = (now + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _path(self, key):
+        return os.path.join(self.disk_dir, f'{key}.json')
+
+    def _read_disk(self, key, now):
+        if not self.disk_dir:
+            return None
+        path = self._path(key)
+        try:
+            written = os.path.getmtime(path)
+            if written + self.ttl < now:
+                os.remove(path)
+                return None
+            with open(path, encoding='utf-8') as f:
+                value = json.load(f)
+            os.utime(path, (now, written))  # recently used, for _prune_disk
+            return value
+        except (OSError, ValueError):
+            return None
+
+    def _write_disk(self, key, value):
+        if not self.disk_dir:
+            return
+        path = self._path(key)
+        tmp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(value, f, separators=(',', ':'))
+            os.replace(tmp_path, path)  # atomic - readers never see partial files
+        except OSError as e:
+            print(f"⚠️ Could not write parse cache entry: {e}")
+            return
+
+        self._writes += 1
+        if self._writes % 100 == 0:
+            self._prune_disk()
+
+    def _prune_disk(self):
+        """Drop the least recently used disk entries beyond disk_entries"""
+        try:
+            files = [os.path.join(self.disk_dir, name) for name in os.listdir(self.disk_dir)
+                     if name.endswith('.json')]
+            if len(files) <= self.disk_entries:
+                return
+            files.sort(key=os.path.getatime)
+            for path in files[:len(files) - self.disk_entries]:
+                os.remove(path)
+        except OSError:
+            pass  # another worker is pruning at the same time
+
+
+_cache = None
+
+
+def get_parse_cache():
+    """Return the process-wide parse cache"""
+    global _cache
+    if _cache is None:
+        _cache = ParseCache()
+    return _cache
@@ -0,0 +1,93 @@
+"""Automatic placement of packages in the truck (loading suggestion)"""
+
+from config import TRUCK_LENGTH, TRUCK_WIDTH, TRUCK_HEIGHT
+
+
+def footprint_options(pkg):
+    """
+    Floor footprints (x extent, y extent, rotation) a package can use
+
+    The footprint is width x height on the floor (depth is vertical, as in
+    create_box_mesh), either as is or turned 90 degrees.
+    """
+    options = [(pkg['width'], pkg['height'], 0)]
+    if pkg['width'] != pkg['height']:
+        options.append((pkg['height'], pkg['width'], 90))
+    return options
+
+
+def auto_place(packages, truck_dims=None, rules=None):
+    """
+    Suggest positions for packages with a first-fit decreasing heuristic
+
+    Packages are placed largest footprint first. A stackable package goes on
+    top of the first stack whose top is stackable, large enough to carry it
+    and low enough to fit it - and, with load rules, whose packages are not
+    fragile and can take its weight and height. Everything else is placed on
+    the floor in rows across the truck width, filling the truck from the
+    front (x = 0).
+
+    Args:
+        packages: List of package dicts
+        truck_dims: Dict with 'length', 'width', 'height' (defaults from config)
+        rules: Optional package type -> rule dict (see utils.constraints)
+
+    Returns:
+        tuple: (placed, unplaced) - copies of the packages with x, y, z and
+               rotation set, and the packages that did not fit
+    """
+    from utils.constraints import NO_LIMITS, stack_limits, new_stack, stack_fits, add_to_stack
+
+    truck_dims = truck_dims or {'length': TRUCK_LENGTH, 'width': TRUCK_WIDTH, 'height': TRUCK_HEIGHT}
+    length, width, height = truck_dims['length'], truck_dims['width'], truck_dims['height']
+    limits = stack_limits(packages, rules)
+
+    order = sorted(packages, key=lambda p: (p['width'] * p['height'], p['depth']), reverse=True)
+
+    placed, unplaced = [], []
+    stacks = []  # [x, y, x_size, y_size, top_z, top_can_carry, load_room, height_limit]
+    row_x, row_length, row_y = 0.0, 0.0, 0.0
+
+    for pkg in order:
+        pkg = dict(pkg)
+        options = footprint_options(pkg)
+        limit = limits.get(pkg['id'], NO_LIMITS)
+
+        if pkg.get('stackable', False):
+            stack = next(
+                (s for s in stacks for fx, fy, _ in options
+                 if fx <= s[2] and fy <= s[3] and stack_fits(s, limit, pkg['depth'])),
+                None
+            )
+            if stack is not None:
+                fx, fy, rotation = next(o for o in options if o[0] <= stack[2] and o[1] <= stack[3])
+                pkg.update(x=stack[0], y=stack[1], z=round(stack[4], 3), rotation=rotation)
+                stack[2], stack[3] = fx, fy
+                add_to_stack(stack, limit, pkg['depth'])
+                placed.append(pkg)
+                continue
+
+        if pkg['depth'] > height:
+            unplaced.append(pkg)
+            continue
+
+        # Floor: continue the current row across the width, or start a new row
+        fitting = [o for o in options if o[1] <= width - row_y and row_x + o[0] <= length]
+        if not fitting or (row_length and min(o[0] for o in fitting) > row_length and row_y > 0):
+            row_x, row_length, row_y = row_x + row_length, 0.0, 0.0
+            fitting = [o for o in options if o[1] <= width and row_x + o[0] <= length]
+            if not fitting:
+                unplaced.append(pkg)
+                continue
+
+        # Prefer the orientation closest to the row length so rows stay tight
+        fx, fy, rotation = min(fitting, key=lambda o: (abs(o[0] - row_length) if row_length else -o[1], o[0]))
+        pkg.update(x=round(row_x, 3), y=round(row_y, 3), z=0.0, rotation=rotation)
+        stacks.append([pkg['x'], pkg['y'], fx, fy, pkg['depth'], pkg.get('stackable', False) and limit[3],
+                       *new_stack(limit, height)])
+        row_length = max(row_length, fx)
+        row_y += fy
+        placed.append(pkg)
+
+    placed.sort(key=lambda p: p['id'])
+    return placed, unplaced
@@ -0,0 +1,272 @@
+"""Streaming export of load plans as JSON, CSV and Parquet"""
+
+import csv
+import importlib.util
+import io
+import json
+import os
+import re
+import time
+import uuid
+from datetime import datetime, timezone
+from flask import Response, abort
+from config import EXPORT_DIR, EXPORT_MAX_AGE, TRUCK_LENGTH, TRUCK_WIDTH, TRUCK_HEIGHT
+from utils.geometry import rotate_dimensions, loading_sequence, calculate_load_metrics
+from utils.nesting import iter_nested_positions
+from utils.pallets import iter_contents
+
+# pyarrow is optional (only needed for Parquet) and imported on first use
+PARQUET_AVAILABLE = importlib.util.find_spec('pyarrow') is not None
+
+
+PLAN_SCHEMA = 'truck-load-plan'
+PLAN_SCHEMA_VERSION = 2
+
+# One record per package, in the same order in every format. size_x/y/z are
+# the extents along truck length/width/height after rotation. Ducts nested in
+# another duct (utils/nesting.py) and cartons on a pallet (utils/pallets.py)
+# follow it with its seq and its id in nested_in.
+PLAN_FIELDS = ('seq', 'id', 'name', 'x', 'y', 'z', 'size_x', 'size_y', 'size_z',
+               'rotation', 'width', 'depth', 'height', 'stackable', 'nested_in')
+
+EXPORT_FORMATS = {
+    'json': 'application/json',
+    'csv': 'text/csv',
+    'parquet': 'application/vnd.apache.parquet',
+}
+
+STREAM_BATCH_SIZE = 1000  # packages per chunk written to the response
+
+
+def plan_header(packages, truck_dims=None, order_number=None):
+    """Schema, truck and metrics part of an export (everything but the packages)"""
+    truck_dims = truck_dims or {'length': TRUCK_LENGTH, 'width': TRUCK_WIDTH, 'height': TRUCK_HEIGHT}
+    return {
+        'schema': PLAN_SCHEMA,
+        'schema_version': PLAN_SCHEMA_VERSION,
+        'order': order_number,
+        'exported_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'truck': {key: truck_dims[key] for key in ('length', 'width', 'height')},
+        'metrics': calculate_load_metrics(packages, truck_dims['length'], truck_dims['width'],
+                                          truck_dims['height']),
+    }
+
+
+def iter_plan_records(packages):
+    """Yield one PLAN_FIELDS tuple per package, in loading order, each followed by its nested ducts or cartons"""
+    by_id = {pkg['id']: pkg for pkg in packages}
+    for seq, package_id in enumerate(loading_sequence(packages), 1):
+        pkg = by_id[package_id]
+        rotation = pkg.get('rotation', 0)
+        size_x, size_y = rotate_dimensions(pkg['width'], pkg['height'], rotation)
+        yield (seq, pkg['id'], pkg['name'], pkg['x'], pkg['y'], pkg['z'],
+               size_x, size_y, pkg['depth'], rotation,
+               pkg['width'], pkg['depth'], pkg['height'], bool(pkg.get('stackable', False)), None)
+        for inner, x, y, z, size_x, size_y in iter_nested_positions(pkg):
+            yield (seq, inner['id'], inner['name'], x, y, z, size_x, size_y, inner['depth'], rotation,
+                   inner['width'], inner['depth'], inner['height'], bool(inner.get('stackable', False)), pkg['id'])
+        for carton in iter_contents(pkg):
+            size_x, size_y = rotate_dimensions(carton['width'], carton['height'], carton['rotation'])
+            yield (seq, carton['id'], carton['name'], carton['x'], carton['y'], carton['z'],
+                   size_x, size_y, carton['depth'], carton['rotation'], carton['width'], carton['depth'],
+                   carton['height'], bool(carton.get('stackable', False)), pkg['id'])
+
+
+def _batches(records, size=STREAM_BATCH_SIZE):
+    batch = []
+    for record in records:
+        batch.append(record)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def iter_plan_json(packages, truck_dims=None, order_number=None):
+    """
+    Yield a plan as JSON text in chunks
+
+    {"schema": ..., "schema_version": 2, "order": ..., "truck": {...},
+     "metrics": {...}, "packages": [{<PLAN_FIELDS>}, ...]}
+    """
+    header = json.dumps(plan_header(packages, truck_dims, order_number), separators=(',', ':'))
+    yield header[:-1] + ',"packages":['
+
+    first = True
+    for batch in _batches(iter_plan_records(packages)):
+        chunk = ','.join(json.dumps(dict(zip(PLAN_FIELDS, record)), separators=(',', ':'))
+                         for record in batch)
+        yield chunk if first else ',' + chunk
+        first = False
+    yield ']}'
+
+
+def iter_plan_csv(packages, truck_dims=None, order_number=None):
+    """
+    Yield a plan as CSV text in chunks
+
+    The schema, truck and metrics are written as leading '# key=value'
+    comment lines (pandas: read_csv(..., comment='#')), followed by a
+    PLAN_FIELDS header row and one row per package.
+    """
+    header = plan_header(packages, truck_dims, order_number)
+    lines = [f"# {key}={value}" for key, value in header.items() if not isinstance(value, dict)]
+    lines += [f"# {section}.{key}={value}" for section in ('truck', 'metrics')
+              for key, value in header[section].items()]
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator='\n')
+    buffer.write('\n'.join(lines) + '\n')
+    writer.writerow(PLAN_FIELDS)
+
+    for batch in _batches(iter_plan_records(packages)):
+        writer.writerows(batch)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file that hands written bytes to the caller chunk by chunk"""
+
+    def __init__(self):
+        self.chunks = []
+        self.position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def take(self):
+        data = b''.join(self.chunks)
+        self.chunks.clear()
+        return data
+
+
+def iter_plan_parquet(packages, truck_dims=None, order_number=None):
+    """
+    Yield a plan as a Parquet file in chunks (one row group per batch)
+
+    The schema, truck and metrics are stored as JSON in the file metadata
+    under the 'truck-load-plan' key.
+    """
+    if not PARQUET_AVAILABLE:
+        raise ValueError("Parquet export needs the pyarrow package")
+    import pyarrow
+    import pyarrow.parquet
+
+    schema = pyarrow.schema([
+        ('seq', pyarrow.int32()), ('id', pyarrow.int64()), ('name', pyarrow.string()),
+        ('x', pyarrow.float64()), ('y', pyarrow.float64()), ('z', pyarrow.float64()),
+        ('size_x', pyarrow.float64()), ('size_y', pyarrow.float64()), ('size_z', pyarrow.float64()),
+        ('rotation', pyarrow.int16()), ('width', pyarrow.float64()), ('depth', pyarrow.float64()),
+        ('height', pyarrow.float64()), ('stackable', pyarrow.bool_()), ('nested_in', pyarrow.int64()),
+    ], metadata={PLAN_SCHEMA: json.dumps(plan_header(packages, truck_dims, order_number))})
+
+    sink = _ChunkSink()
+    with pyarrow.parquet.ParquetWriter(sink, schema, compression='zstd') as writer:
+        for batch in _batches(iter_plan_records(packages)):
+            columns = list(zip(*batch))
+            writer.write_table(pyarrow.Table.from_arrays(
+                [pyarrow.array(column, type=field.type) for column, field in zip(columns, schema)],
+                schema=schema
+            ))
+            yield sink.take()
+    yield sink.take()
+
+
+PLAN_WRITERS = {
+    'json': iter_plan_json,
+    'csv': iter_plan_csv,
+    'parquet': iter_plan_parquet,
+}
+
+
+def write_plan(path, packages, truck_dims=None, order_number=None, fmt=None):
+    """
+    Stream a plan to a file (format from fmt or the file extension)
+
+    Returns:
+        str: The format written
+    """
+    fmt = fmt or os.path.splitext(path)[1].lstrip('.').lower()
+    if fmt not in PLAN_WRITERS:
+        raise ValueError(f"Unknown export format '{fmt}' - use {', '.join(PLAN_WRITERS)}")
+
+    chunks = PLAN_WRITERS[fmt](packages, truck_dims, order_number)
+    binary = fmt == 'parquet'
+    with open(path, 'wb' if binary else 'w', **({} if binary else {'encoding': 'utf-8', 'newline': ''})) as f:
+        for chunk in chunks:
+            f.write(chunk)
+    return fmt
+
+
+def save_plan_snapshot(packages, truck_dims=None, order_number=None, export_dir=EXPORT_DIR):
+    """
+    Store the current plan so the export route can stream it
+
+    Returns:
+        str: Token for /export/<token>.<format>
+    """
+    os.makedirs(export_dir, exist_ok=True)
+    _prune_snapshots(export_dir)
+
+    token = uuid.uuid4().hex
+    with open(os.path.join(export_dir, f'{token}.json'), 'w', encoding='utf-8') as f:
+        json.dump({'packages': packages, 'truck_dims': truck_dims, 'order': order_number}, f,
+                  separators=(',', ':'))
+    return token
+
+
+def _prune_snapshots(export_dir, max_age=EXPORT_MAX_AGE):
+    """Remove plan snapshots older than max_age seconds"""
+    cutoff = time.time() - max_age
+    for name in os.listdir(export_dir):
+        path = os.path.join(export_dir, name)
+        try:
+            if os.path.getmtime(path) < cutoff:
+                os.remove(path)
+        except OSError:
+            pass  # removed by another worker
+
+
+def register_plan_export(server, export_dir=EXPORT_DIR, routes_prefix='/'):
+    """
+    Register the /export/<token>.<format> download route on the Flask server
+
+    routes_prefix is the Dash app's routes_pathname_prefix, so the route
+    sits next to the app's own routes when it is served under a sub-path.
+    """
+
+    @server.route(f'{routes_prefix}export/<token>.<fmt>')
+    def export_plan(token, fmt):
+        if not re.fullmatch(r'[0-9a-f]{32}', token) or fmt not in PLAN_WRITERS:
+            abort(404)
+        if fmt == 'parquet' and not PARQUET_AVAILABLE:
+            abort(501, description="Parquet export needs the pyarrow package")
+
+        try:
+            with open(os.path.join(export_dir, f'{token}.json'), encoding='utf-8') as f:
+                snapshot = json.load(f)
+        except (OSError, ValueError):
+            abort(404)
+
+        order_number = snapshot.get('order')
+        filename = f"load-plan-{re.sub(r'[^A-Za-z0-9_-]', '_', str(order_number or 'export'))}.{fmt}"
+        chunks = PLAN_WRITERS[fmt](snapshot['packages'], snapshot.get('truck_dims'), order_number)
+        return Response(
+            chunks,
+            mimetype=EXPORT_FORMATS[fmt],
+            headers={'Content-Disposition': f'attachment; filename="{filename}"'}
+        )
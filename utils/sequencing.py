@@ -0,0 +1,168 @@
+"""Multi-drop loading: stop-ordered placement and unload blocking checks"""
+
+from config import TRUCK_LENGTH, TRUCK_WIDTH, TRUCK_HEIGHT
+from utils.geometry import rotate_dimensions
+from utils.placement import footprint_options
+
+BLOCKING_TOLERANCE = 0.001  # m - touching faces are not in each other's way
+BLOCKING_CHUNK = 1024  # packages compared per vectorized block (memory is chunk x packages)
+
+
+def unload_rank(pkg):
+    """Sort key of when a package leaves the truck (no stop = stays on to the end)"""
+    stop = pkg.get('stop')
+    return (stop is None, stop or 0)
+
+
+def has_stops(packages):
+    """Whether any package has a delivery stop"""
+    return any(pkg.get('stop') is not None for pkg in packages)
+
+
+def on_dock(pkg, truck_length):
+    """Whether a package is outside the truck, behind the rear door (not loaded)"""
+    return pkg['x'] >= truck_length - BLOCKING_TOLERANCE
+
+
+def plan_loading(packages, truck_dims=None, rules=None):
+    """
+    Place packages so that no later stop blocks an earlier one
+
+    The truck is loaded through the rear door (x = length) towards the front
+    wall (x = 0), so the last stop is loaded first. Packages are taken in
+    reverse unload order (largest footprint first within a stop) and placed
+    in rows across the truck width from the front wall. A stackable package
+    is only stacked within the row being loaded, so every row holds packages
+    for the same or an earlier stop than the rows in front of it, and a
+    package only ever rests on one that leaves at the same or a later stop.
+    Stacking keeps to the load rules as in auto_place. Packages that do not
+    fit are left on the dock behind the door (x = length).
+
+    Args:
+        packages: List of package dicts (packages without 'stop' stay on
+                  the truck and are loaded first)
+        truck_dims: Dict with 'length', 'width', 'height' (defaults from config)
+        rules: Optional package type -> rule dict (see utils.constraints)
+
+    Returns:
+        tuple: (placed, unplaced) - copies of the packages with x, y, z,
+               rotation and load_seq set, and the packages that did not fit
+               (on the dock, load_seq None)
+    """
+    from utils.constraints import NO_LIMITS, stack_limits, new_stack, stack_fits, add_to_stack
+
+    truck_dims = truck_dims or {'length': TRUCK_LENGTH, 'width': TRUCK_WIDTH, 'height': TRUCK_HEIGHT}
+    length, width, height = truck_dims['length'], truck_dims['width'], truck_dims['height']
+    limits = stack_limits(packages, rules)
+
+    order = sorted(packages, key=lambda p: (unload_rank(p), p['width'] * p['height'], p['depth']),
+                   reverse=True)
+
+    placed, unplaced = [], []
+    # stacks of the current row: [x, y, x_size, y_size, top_z, top_can_carry, load_room, height_limit]
+    row_stacks = []
+    row_x, row_length, row_y = 0.0, 0.0, 0.0
+
+    for pkg in order:
+        pkg = dict(pkg)
+        options = footprint_options(pkg)
+        limit = limits.get(pkg['id'], NO_LIMITS)
+
+        if pkg.get('stackable', False):
+            stack = next(
+                (s for s in row_stacks for fx, fy, _ in options
+                 if fx <= s[2] and fy <= s[3] and stack_fits(s, limit, pkg['depth'])),
+                None
+            )
+            if stack is not None:
+                fx, fy, rotation = next(o for o in options if o[0] <= stack[2] and o[1] <= stack[3])
+                pkg.update(x=stack[0], y=stack[1], z=round(stack[4], 3), rotation=rotation)
+                stack[2], stack[3] = fx, fy
+                add_to_stack(stack, limit, pkg['depth'])
+                pkg['load_seq'] = len(placed) + 1
+                placed.append(pkg)
+                continue
+
+        if pkg['depth'] > height:
+            unplaced.append(pkg)
+            continue
+
+        # Floor: continue the current row across the width, or start a new row. Unlike
+        # auto_place a row may grow longer - stops keep changing the package sizes
+        fitting = [o for o in options if o[1] <= width - row_y and row_x + o[0] <= length]
+        if not fitting:
+            row_x, row_length, row_y = row_x + row_length, 0.0, 0.0
+            row_stacks = []
+            fitting = [o for o in options if o[1] <= width and row_x + o[0] <= length]
+            if not fitting:
+                unplaced.append(pkg)
+                continue
+
+        fx, fy, rotation = min(fitting, key=lambda o: (abs(o[0] - row_length) if row_length else -o[1], o[0]))
+        pkg.update(x=round(row_x, 3), y=round(row_y, 3), z=0.0, rotation=rotation)
+        row_stacks.append([pkg['x'], pkg['y'], fx, fy, pkg['depth'], pkg.get('stackable', False) and limit[3],
+                           *new_stack(limit, height)])
+        row_length = max(row_length, fx)
+        row_y += fy
+        pkg['load_seq'] = len(placed) + 1
+        placed.append(pkg)
+
+    for pkg in unplaced:
+        pkg.update(x=length, y=0.0, z=0.0, load_seq=None)
+
+    placed.sort(key=lambda p: p['id'])
+    return placed, unplaced
+
+
+def find_blocked(packages, truck_length=None, tolerance=BLOCKING_TOLERANCE):
+    """
+    Find packages that cannot be unloaded at their stop
+
+    Package a is blocked by package b when b leaves the truck later (a later
+    stop, or no stop) and either rests on top of a, or is in a's way to the
+    rear door: b overlaps a's width/height cross-section and reaches further
+    towards the door than a. All pairs are compared with NumPy, one block of
+    BLOCKING_CHUNK packages at a time.
+
+    Args:
+        packages: List of package dicts
+        truck_length: If given, packages on the dock (see on_dock) are ignored
+        tolerance: Overlaps smaller than this (m) are ignored
+
+    Returns:
+        dict: blocked package id -> list of ids of the packages blocking it
+    """
+    if truck_length is not None:
+        packages = [pkg for pkg in packages if not on_dock(pkg, truck_length)]
+    if not has_stops(packages):
+        return {}
+    import numpy as np  # keep it off the startup path
+
+    x0 = np.array([pkg['x'] for pkg in packages], dtype=float)
+    y0 = np.array([pkg['y'] for pkg in packages], dtype=float)
+    z0 = np.array([pkg['z'] for pkg in packages], dtype=float)
+    footprints = np.array([rotate_dimensions(pkg['width'], pkg['height'], pkg.get('rotation', 0))
+                           for pkg in packages], dtype=float)
+    x1 = x0 + footprints[:, 0]
+    y1 = y0 + footprints[:, 1]
+    z1 = z0 + np.array([pkg['depth'] for pkg in packages], dtype=float)
+    rank = np.array([np.inf if pkg.get('stop') is None else pkg['stop'] for pkg in packages], dtype=float)
+    ids = np.array([pkg['id'] for pkg in packages])
+
+    blocked = {}
+    candidates = np.flatnonzero(np.isfinite(rank))
+    for start in range(0, len(candidates), BLOCKING_CHUNK):
+        a = candidates[start:start + BLOCKING_CHUNK, None]  # column: blocked candidates, row: all packages
+        y_overlap = (y0 < y1[a] - tolerance) & (y1 > y0[a] + tolerance)
+        in_path = ((z0 < z1[a] - tolerance) & (z1 > z0[a] + tolerance) & y_overlap
+                   & (x1 > x1[a] + tolerance))
+        on_top = ((np.abs(z0 - z1[a]) <= tolerance) & y_overlap
+                  & (x0 < x1[a] - tolerance) & (x1 > x0[a] + tolerance))
+        blocking = (rank > rank[a]) & (in_path | on_top)
+
+        rows, columns = np.nonzero(blocking)
+        if len(rows):
+            starts = np.flatnonzero(np.r_[True, rows[1:] != rows[:-1]])
+            for package_id, blockers in zip(ids[a[rows[starts], 0]].tolist(), np.split(ids[columns], starts[1:])):
+                blocked[package_id] = blockers.tolist()
+    return blocked
@@ -0,0 +1,87 @@
+"""Magnetic snapping: moved packages pull flush against neighbouring packages and the truck walls"""
+
+from config import SNAP_TOLERANCE
+from utils.pallets import bounding_box
+
+
+def _beside(box, other, axis, tolerance):
+    """Whether other is level with box and alongside it on `axis` (so their faces can touch)"""
+    return (other[axis] < box[axis + 3] + tolerance and other[axis + 3] > box[axis] - tolerance
+            and other[2] < box[5] and other[5] > box[2])
+
+
+def snap_offset(box, others, truck_dims, axes=(0, 1), tolerance=SNAP_TOLERANCE):
+    """
+    Shift that makes a box flush with the nearest neighbour face or wall
+
+    On each axis the box's low side snaps to the far side of a neighbour or
+    the front/left wall, and its high side to the near side of a neighbour
+    or the far wall, whichever is nearest within tolerance. Only neighbours
+    level with the box and alongside it on the other axis count.
+
+    One scan over the other packages per move: building any index over them
+    costs more than the scan, as the packages change between moves.
+
+    Args:
+        box: (x1, y1, z1, x2, y2, z2) of the moved package or group
+        others: Bounding boxes of the packages that stay put
+        truck_dims: {'length', 'width', ...} of the truck (m)
+        axes: Axes to snap on (0 = X, 1 = Y)
+        tolerance: Snapping distance (m)
+
+    Returns:
+        tuple: (dx, dy) in meters, 0 on an axis with nothing in reach
+    """
+    shift = [0.0, 0.0]
+    for axis in axes:
+        low, high = box[axis], box[axis + 3]
+        best = None
+        for coord, edge in ((0.0, low), ((truck_dims['length'], truck_dims['width'])[axis], high)):
+            if abs(coord - edge) <= tolerance:
+                best = coord - edge if best is None or abs(coord - edge) < abs(best) else best
+        for other in others:
+            if not _beside(box, other, 1 - axis, tolerance):
+                continue
+            for coord, edge in ((other[axis + 3], low), (other[axis], high)):
+                if abs(coord - edge) <= tolerance and (best is None or abs(coord - edge) < abs(best)):
+                    best = coord - edge
+        shift[axis] = round(best or 0.0, 3)
+    return shift[0], shift[1]
+
+
+def move_group(packages, group_ids, dx, dy, truck_dims, snap=True, axes=(0, 1), tolerance=SNAP_TOLERANCE):
+    """
+    Move a set of packages together, snapping the group as one box
+
+    The group's bounding box is moved by (dx, dy), snapped against the
+    packages outside the group (see snap_offset) and kept inside the truck.
+
+    Args:
+        packages: All package dicts
+        group_ids: Ids of the packages to move (one id for a single package)
+        dx, dy: Requested move (m)
+        truck_dims: {'length', 'width', ...} of the truck (m)
+        snap: Whether to snap to neighbours and walls
+        axes: Axes the move is along (only these snap)
+        tolerance: Snapping distance (m)
+
+    Returns:
+        dict: package id -> new (x, y)
+    """
+    members = [pkg for pkg in packages if pkg['id'] in group_ids]
+    if not members:
+        return {}
+
+    boxes = [bounding_box(pkg) for pkg in members]
+    x1, y1, z1 = (min(box[axis] for box in boxes) for axis in range(3))
+    x2, y2, z2 = (max(box[axis] for box in boxes) for axis in range(3, 6))
+
+    if snap:
+        others = [bounding_box(pkg) for pkg in packages if pkg['id'] not in group_ids]
+        snap_x, snap_y = snap_offset((x1 + dx, y1 + dy, z1, x2 + dx, y2 + dy, z2), others, truck_dims,
+                                     axes, tolerance)
+        dx, dy = dx + snap_x, dy + snap_y
+
+    dx = max(-x1, min(truck_dims['length'] - x2, dx))
+    dy = max(-y1, min(truck_dims['width'] - y2, dy))
+    return {pkg['id']: (round(pkg['x'] + dx, 3), round(pkg['y'] + dy, 3)) for pkg in members}
@@ -0,0 +1,129 @@
+"""Find the cheapest truck profile an order fits in"""
+
+import atexit
+import os
+from concurrent.futures import ProcessPoolExecutor
+from config import (TRUCK_PROFILES, TRUCK_FIT_WORKERS, TRUCK_FIT_PARALLEL_MIN_PACKAGES, TRUCK_FIT_EXACT_BUDGET,
+                    EXACT_MAX_PACKAGES)
+from utils.bounds import lower_bounds
+from utils.geometry import calculate_load_metrics
+
+_pool = None
+
+
+def quick_reject(packages, truck_dims):
+    """
+    Reason an order cannot fit a truck without trying to place it, or None
+
+    Checks that each package fits the cargo space in at least one floor
+    orientation and that the lower bounds (utils.bounds) allow one truck.
+    """
+    length, width, height = truck_dims['length'], truck_dims['width'], truck_dims['height']
+    for pkg in packages:
+        footprint_fits = ((pkg['width'] <= length and pkg['height'] <= width)
+                          or (pkg['height'] <= length and pkg['width'] <= width))
+        if pkg['depth'] > height or not footprint_fits:
+            return f"{pkg['name']} does not fit"
+    bounds = lower_bounds(packages, truck_dims)
+    if bounds['min_trucks'] > 1:
+        return f"needs {bounds['min_trucks']}+ trucks ({bounds['min_length']:.1f} m of loading length)"
+    return None
+
+
+def check_fit(packages, truck_dims, rules=None):
+    """
+    Try to load an order into one truck
+
+    Uses the stop-ordered planner (utils.sequencing) when packages have
+    delivery stops, otherwise utils.placement.auto_place, and for small
+    orders that auto_place cannot fit a short exact search. All of them
+    keep to the load rules, so a truck only fits if it can be loaded legally.
+
+    Args:
+        packages: List of package dicts
+        truck_dims: Dict with 'length', 'width', 'height'
+        rules: Optional package type -> rule dict (see utils.constraints)
+
+    Returns:
+        dict: fits, unplaced (count), utilization (% of volume), ldm and
+              reason (why it does not fit, or None)
+    """
+    from utils.placement import auto_place
+    from utils.sequencing import has_stops, plan_loading
+    from utils.exact_placement import exact_place
+
+    reason = quick_reject(packages, truck_dims)
+    if reason:
+        return {'fits': False, 'unplaced': None, 'utilization': None, 'ldm': None, 'reason': reason}
+
+    place = plan_loading if has_stops(packages) else auto_place
+    placed, unplaced = place(packages, truck_dims, rules=rules)
+    if unplaced and place is auto_place and len(packages) <= EXACT_MAX_PACKAGES:
+        # Small order: an exact search may find the arrangement the heuristic missed
+        placed, unplaced, _ = exact_place(packages, truck_dims, time_budget=TRUCK_FIT_EXACT_BUDGET, rules=rules)
+    metrics = calculate_load_metrics(placed, truck_dims['length'], truck_dims['width'], truck_dims['height'])
+    return {
+        'fits': not unplaced,
+        'unplaced': len(unplaced),
+        'utilization': metrics['volume_utilization'],
+        'ldm': metrics['ldm'],
+        'reason': f'{len(unplaced)} packages left over' if unplaced else None,
+    }
+
+
+def _check_profile(args):
+    name, packages, truck_dims, rules = args
+    return name, check_fit(packages, truck_dims, rules)
+
+
+def _get_pool(workers):
+    """Process pool shared by all fit checks (started on first use)"""
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=workers)
+        atexit.register(_pool.shutdown, cancel_futures=True)
+    return _pool
+
+
+def find_smallest_truck(packages, profiles=None, workers=TRUCK_FIT_WORKERS, rules=None):
+    """
+    Check an order against every truck profile and pick the cheapest that fits
+
+    Profiles are checked in parallel worker processes, except for orders
+    below TRUCK_FIT_PARALLEL_MIN_PACKAGES: one check of 500 packages takes
+    a few milliseconds, less than sending the order to another process.
+    Those are checked from the cheapest profile up, stopping at the first
+    that fits; later profiles are reported as not checked.
+
+    Args:
+        packages: List of package dicts
+        profiles: {name: {'label', 'length', 'width', 'height', 'cost'}}
+                  (default TRUCK_PROFILES)
+        workers: Worker processes, capped at the CPU count (1 = check in
+                 this process)
+        rules: Optional package type -> rule dict (see utils.constraints)
+
+    Returns:
+        tuple: (best profile name or None, {name: check_fit result})
+    """
+    profiles = profiles or TRUCK_PROFILES
+    by_cost = sorted(profiles, key=lambda name: (profiles[name]['cost'], profiles[name]['length']))
+    tasks = [(name, packages, {key: profiles[name][key] for key in ('length', 'width', 'height')}, rules)
+             for name in by_cost]
+
+    workers = min(workers, os.cpu_count() or 1)
+    if workers > 1 and len(packages) >= TRUCK_FIT_PARALLEL_MIN_PACKAGES:
+        results = dict(_get_pool(workers).map(_check_profile, tasks))
+    else:
+        results = {}
+        for task in tasks:
+            name, result = _check_profile(task)
+            results[name] = result
+            if result['fits']:
+                break
+        for name in by_cost[len(results):]:
+            results[name] = {'fits': False, 'unplaced': None, 'utilization': None, 'ldm': None,
+                             'reason': 'not checked (a cheaper truck fits)'}
+
+    best = next((name for name in by_cost if results[name]['fits']), None)
+    return best, results
@@ -0,0 +1,162 @@
+"""Deterministic synthetic orders for benchmarks, load tests and packing experiments"""
+
+import random
+from config import (PACKAGE_TYPE_COLORS, DEFAULT_PACKAGE_COLOR,
+                    TRUCK_LENGTH, TRUCK_WIDTH, TRUCK_HEIGHT)
+
+# Package types: size ranges in meters in store terms - width along the
+# truck (X), height across it (Y) and depth vertical (Z) - and the share of
+# stackable packages. In the URL format (Name~Width~Length~Height~Stackable)
+# depth is the Length field.
+PACKAGE_TYPES = {
+    'EMBV1': {'width': (1.2, 1.2), 'height': (0.8, 0.8), 'depth': (0.5, 1.8), 'stackable': 0.6},
+    'EMBV2': {'width': (1.2, 1.2), 'height': (1.0, 1.0), 'depth': (0.5, 2.0), 'stackable': 0.5},
+    'SROR': {'width': (2.0, 6.0), 'height': (0.6, 1.2), 'depth': (0.5, 1.2), 'stackable': 0.8},
+    'KOLLI': {'width': (0.4, 1.2), 'height': (0.4, 0.8), 'depth': (0.5, 0.8), 'stackable': 0.9},
+    # Round spiral duct lines (named SROR like the profile bundles): a standard
+    # diameter as both height and depth, cut to length
+    'DUCT': {'name': 'SROR', 'width': (0.5, 3.0), 'diameters': (0.08, 0.1, 0.125, 0.16, 0.2, 0.25, 0.315,
+                                                                0.4, 0.5, 0.63, 0.8, 1.0, 1.25),
+             'stackable': 1.0},
+    # Small cartons (KOLLI like parcels), built onto pallets by Palletize
+    'CARTON': {'name': 'KOLLI', 'width': (0.2, 0.6), 'height': (0.2, 0.4), 'depth': (0.15, 0.4), 'stackable': 0.95},
+}
+
+# Order mixes: share of each package type
+WORKLOAD_MIXES = {
+    'mixed': {'EMBV1': 0.4, 'EMBV2': 0.3, 'SROR': 0.2, 'KOLLI': 0.1},
+    'pallets': {'EMBV1': 0.6, 'EMBV2': 0.4},
+    'profiles': {'SROR': 1.0},
+    'parcels': {'KOLLI': 0.8, 'EMBV1': 0.2},
+    'ducts': {'DUCT': 1.0},
+    'cartons': {'CARTON': 1.0},
+}
+
+MAX_WORKLOAD_PACKAGES = 20000
+
+
+def generate_rows(num_packages, seed=0, mix='mixed', stackable_ratio=None, num_stops=None):
+    """
+    Generate the package rows of one order
+
+    The same arguments always give the same rows. Sizes are rounded to
+    centimeters, like TM extracts.
+
+    Args:
+        num_packages: Number of packages (1 to MAX_WORKLOAD_PACKAGES)
+        seed: Any int or str (e.g. an order number)
+        mix: Name in WORKLOAD_MIXES, or a {type: share} dict
+        stackable_ratio: Share of stackable packages (default: per type)
+        num_stops: If given, each package gets a delivery stop 1..num_stops
+
+    Returns:
+        list: Dicts with name, width, depth, height, stackable (and stop)
+    """
+    if not 1 <= num_packages <= MAX_WORKLOAD_PACKAGES:
+        raise ValueError(f"num_packages must be 1-{MAX_WORKLOAD_PACKAGES:,}, got {num_packages}")
+    shares = WORKLOAD_MIXES[mix] if isinstance(mix, str) else mix
+
+    rng = random.Random(seed)
+    types = rng.choices(list(shares), weights=list(shares.values()), k=num_packages)
+    rows = []
+    for i, package_type in enumerate(types, 1):
+        spec = PACKAGE_TYPES[package_type]
+        stackable = spec['stackable'] if stackable_ratio is None else stackable_ratio
+        if 'diameters' in spec:
+            width, diameter = round(rng.uniform(*spec['width']), 2), rng.choice(spec['diameters'])
+            depth = height = diameter
+        else:
+            width = round(rng.uniform(*spec['width']), 2)
+            depth = round(rng.uniform(*spec['depth']), 2)
+            height = round(rng.uniform(*spec['height']), 2)
+        rows.append({
+            'name': f"{spec.get('name', package_type)} {i}",
+            'width': width,
+            'depth': depth,
+            'height': height,
+            'stackable': rng.random() < stackable,
+        })
+        if num_stops:
+            rows[-1]['stop'] = rng.randint(1, num_stops)
+    return rows
+
+
+def to_package_string(rows, decimal_comma=False):
+    """Rows in the URL/TM format: Name~Width~Length~Height~Stackable[~Stop]|..."""
+    def number(value):
+        text = f'{value:.2f}'
+        return text.replace('.', ',') if decimal_comma else text
+
+    return '|'.join(
+        f"{row['name']}~{number(row['width'])}~{number(row['depth'])}~{number(row['height'])}"
+        f"~{int(row['stackable'])}" + (f"~{row['stop']}" if 'stop' in row else '')
+        for row in rows
+    )
+
+
+def to_store_packages(rows, scatter_seed=None, truck_dims=None):
+    """
+    Rows in the packages-store format (same dicts the URL parser produces)
+
+    Args:
+        rows: generate_rows() output
+        scatter_seed: If given, spread packages at random positions inside
+                      the truck (for rendering benchmarks) instead of the
+                      origin
+        truck_dims: Truck size for scattering (default config truck)
+    """
+    truck_dims = truck_dims or {'length': TRUCK_LENGTH, 'width': TRUCK_WIDTH, 'height': TRUCK_HEIGHT}
+    rng = random.Random(scatter_seed) if scatter_seed is not None else None
+
+    packages = []
+    for i, row in enumerate(rows, 1):
+        pkg = {
+            'id': i,
+            'name': row['name'],
+            'x': 0.0, 'y': 0.0, 'z': 0.0,
+            'width': row['width'],
+            'depth': row['depth'],
+            'height': row['height'],
+            'rotation': 0,
+            'color': PACKAGE_TYPE_COLORS.get(row['name'].split()[0], DEFAULT_PACKAGE_COLOR),
+            'stackable': row['stackable'],
+        }
+        if 'stop' in row:
+            pkg['stop'] = row['stop']
+        if rng is not None:
+            pkg['x'] = rng.uniform(0, max(truck_dims['length'] - row['width'], 0))
+            pkg['y'] = rng.uniform(0, max(truck_dims['width'] - row['height'], 0))
+            pkg['z'] = rng.uniform(0, max(truck_dims['height'] - row['depth'], 0))
+        packages.append(pkg)
+    return packages
+
+
+def generate_package_string(num_packages, seed=0, mix='mixed', stackable_ratio=None, num_stops=None,
+                            decimal_comma=False):
+    """One synthetic order in the URL/TM format (see generate_rows)"""
+    return to_package_string(generate_rows(num_packages, seed, mix, stackable_ratio, num_stops), decimal_comma)
+
+
+def generate_packages(num_packages, seed=0, mix='mixed', stackable_ratio=None, num_stops=None, scatter=False):
+    """One synthetic order in the packages-store format (see generate_rows)"""
+    return to_store_packages(generate_rows(num_packages, seed, mix, stackable_ratio, num_stops),
+                             scatter_seed=seed if scatter else None)
+
+
+def order_size(rng, min_packages=1, max_packages=MAX_WORKLOAD_PACKAGES):
+    """Draw an order size, log-uniform so small orders are common and huge ones rare"""
+    return min(max_packages, int(min_packages * (max_packages / min_packages) ** rng.random()))
+
+
+def generate_orders(num_orders, seed=0, min_packages=1, max_packages=8, mix='mixed', first_order=1000000):
+    """
+    Yield (order_number, package_string) for num_orders synthetic orders
+
+    Each order is seeded by its order number, so order N is the same no
+    matter how many orders are generated.
+    """
+    rng = random.Random(seed)
+    for n in range(num_orders):
+        order_number = str(first_order + n)
+        yield order_number, generate_package_string(order_size(rng, min_packages, max_packages),
+                                                    seed=f'{seed}:{order_number}', mix=mix)
@@ -1,9 +1,35 @@
 """3D visualization functions for truck loading"""
 
+import base64
 import plotly.graph_objects as go
 import numpy as np
 from config import TRUCK_LENGTH, TRUCK_WIDTH, TRUCK_HEIGHT, DEFAULT_CAMERA
 from utils.geometry import rotate_dimensions, calculate_totals
+from utils.pallets import is_pallet, iter_contents, pallet_base
+
+
+# Unit box corners (same order as create_box_mesh) and the 12 surface triangles
+BOX_CORNERS = np.array([
+    [0, 0, 0], [1, 0, 0], [1, 1, 0], [0, 1, 0],
+    [0, 0, 1], [1, 0, 1], [1, 1, 1], [0, 1, 1]
+], dtype=np.float64)
+BOX_I = np.array([0, 0, 4, 4, 0, 0, 3, 3, 0, 0, 1, 1])
+BOX_J = np.array([1, 2, 5, 6, 1, 5, 2, 6, 3, 7, 2, 6])
+BOX_K = np.array([2, 3, 6, 7, 5, 4, 6, 7, 7, 4, 6, 5])
+
+# Constant uirevision: the browser keeps the user's camera (and legend
+# toggles) when a new figure arrives, so edits never reset the view
+FIGURE_UIREVISION = 'truck-view'
+
+# One hover template shared by all compact traces - per-package values come from customdata
+# (size mm, package id, rotation); the name is looked up by id in the browser (see ui_callbacks)
+COMPACT_HOVERTEMPLATE = (
+    '<b>Package #%{customdata[3]}</b> (%{fullData.name})<br>' +
+    'Corner: (%{x:.2f}, %{y:.2f}, %{z:.2f})<br>' +
+    'Size: %{customdata[0]} × %{customdata[1]} × %{customdata[2]}mm<br>' +
+    'Rotation: %{customdata[4]}°<br>' +
+    '<extra></extra>'
+)
 
 
 def create_box_mesh(x, y, z, width, height, depth, color, name, rotation):
@@ -45,6 +71,175 @@ def create_box_mesh(x, y, z, width, height, depth, color, name, rotation):
     )
 
 
+def package_mesh_update(pkg):
+    """
+    Trace properties of a package mesh that change when it moves, rotates or
+    is resized - for patching one trace of a figure in place
+    """
+    mesh = create_box_mesh(
+        pkg['x'], pkg['y'], pkg['z'],
+        pkg['width'], pkg['height'], pkg['depth'],
+        pkg['color'], pkg['name'], pkg.get('rotation', 0)
+    )
+    return {
+        'x': np.asarray(mesh.x).tolist(),
+        'y': np.asarray(mesh.y).tolist(),
+        'z': np.asarray(mesh.z).tolist(),
+        'hovertemplate': mesh.hovertemplate,
+    }
+
+
+def encode_typed_array(values, dtype):
+    """
+    Encode a numeric array as a Plotly base64 typed array
+
+    Args:
+        values: Array-like of numbers (1D or 2D)
+        dtype: Numpy dtype to store, e.g. 'float32' or 'uint16'
+
+    Returns:
+        dict: {'dtype': 'f4', 'bdata': '...', ['shape': 'rows, cols']}
+    """
+    arr = np.ascontiguousarray(values, dtype=np.dtype(dtype).newbyteorder('<'))
+    spec = {
+        'dtype': arr.dtype.str.lstrip('<|'),
+        'bdata': base64.b64encode(arr.tobytes()).decode('ascii')
+    }
+    if arr.ndim > 1:
+        spec['shape'] = ', '.join(str(n) for n in arr.shape)
+    return spec
+
+
+def create_box_batch(packages, color, name, own_colors=False):
+    """
+    Create one compact Mesh3d trace for many packages sharing a color
+
+    Coordinates are rounded to millimetres and stored as float32, triangle
+    indices as uint16/uint32 and per-package details (size, id, rotation)
+    as customdata, all as base64 typed arrays referenced by
+    COMPACT_HOVERTEMPLATE. The id keeps each package's identity in the merged
+    trace: hover shows it, and the name is looked up from it.
+
+    Args:
+        packages: List of package dictionaries
+        color: Mesh color for all packages in the batch
+        name: Legend name of the batch
+        own_colors: Color each box with its package's color instead
+
+    Returns:
+        plotly.graph_objects.Mesh3d
+    """
+    count = len(packages)
+    rotation = np.array([pkg.get('rotation', 0) for pkg in packages])
+    width = np.array([pkg['width'] for pkg in packages], dtype=np.float64)
+    height = np.array([pkg['height'] for pkg in packages], dtype=np.float64)
+    turned = np.isin(rotation, [90, 270])
+
+    origin = np.array([[pkg['x'], pkg['y'], pkg['z']] for pkg in packages], dtype=np.float64)
+    size = np.column_stack([
+        np.where(turned, height, width),
+        np.where(turned, width, height),
+        [pkg['depth'] for pkg in packages]
+    ])
+
+    # (count, 8, 3) corners, rounded to millimetres
+    vertices = np.round(origin[:, None, :] + BOX_CORNERS[None, :, :] * size[:, None, :], 3)
+    vertices = vertices.reshape(-1, 3)
+
+    offsets = (np.arange(count) * 8)[:, None]
+    index_dtype = 'uint16' if count * 8 <= np.iinfo(np.uint16).max else 'uint32'
+
+    # Per-vertex details for hover: rotated size in mm, package id and rotation
+    details = np.column_stack([
+        np.round(size * 1000),
+        [pkg['id'] for pkg in packages],
+        rotation
+    ]).astype(np.uint32)
+    details = np.repeat(details, 8, axis=0)
+
+    # Own colors: per-face palette index as a typed array, mapped through a discrete colorscale
+    palette = sorted({pkg['color'] for pkg in packages}) if own_colors else [color]
+    face_colors = {}
+    if len(palette) > 1:
+        index = {value: n for n, value in enumerate(palette)}
+        face_index = np.repeat(np.array([index[pkg['color']] for pkg in packages], dtype=np.uint8), len(BOX_I))
+        face_colors = dict(
+            intensity=encode_typed_array(face_index, 'uint8'), intensitymode='cell',
+            colorscale=[[n / (len(palette) - 1), value] for n, value in enumerate(palette)],
+            cmin=0, cmax=len(palette) - 1, showscale=False
+        )
+
+    return go.Mesh3d(
+        x=encode_typed_array(vertices[:, 0], 'float32'),
+        y=encode_typed_array(vertices[:, 1], 'float32'),
+        z=encode_typed_array(vertices[:, 2], 'float32'),
+        i=encode_typed_array((BOX_I[None, :] + offsets).ravel(), index_dtype),
+        j=encode_typed_array((BOX_J[None, :] + offsets).ravel(), index_dtype),
+        k=encode_typed_array((BOX_K[None, :] + offsets).ravel(), index_dtype),
+        customdata=encode_typed_array(details, 'uint32' if details.max() > 65535 else 'uint16'),
+        color=None if face_colors else palette[0],
+        **face_colors,
+        opacity=0.8,
+        name=name,
+        hovertemplate=COMPACT_HOVERTEMPLATE,
+        showlegend=True
+    )
+
+
+def create_pallet_detail(pkg):
+    """Create one Mesh3d trace of a pallet's base and every carton on it, each in its own color"""
+    cartons = [pallet_base(pkg)] + list(iter_contents(pkg))
+    return create_box_batch(cartons, pkg['color'], f"{pkg['name']} ({len(cartons) - 1})", own_colors=True)
+
+
+def package_trace(pkg, detailed=False):
+    """
+    Create the trace of one package
+
+    A pallet is drawn as one box (its bounding box) unless detailed, when
+    its base and cartons are drawn - still as one trace, so package i stays
+    figure trace i + 2 either way.
+    """
+    if detailed and is_pallet(pkg):
+        return create_pallet_detail(pkg)
+    return create_box_mesh(
+        pkg['x'], pkg['y'], pkg['z'],
+        pkg['width'], pkg['height'], pkg['depth'],
+        pkg['color'], pkg['name'], pkg.get('rotation', 0)
+    )
+
+
+def add_package_traces(fig, packages, compact=False, detailed=()):
+    """
+    Add package meshes to a figure
+
+    Args:
+        fig: plotly Figure to add traces to
+        packages: List of package dictionaries
+        compact: If True, batch packages into one typed-array trace per color
+                 instead of one trace per package (much smaller payload)
+        detailed: Ids of pallets to draw carton by carton (see
+                  utils.pallets.detail_ids); other pallets are one box
+    """
+    if not compact:
+        for pkg in packages:
+            fig.add_trace(package_trace(pkg, pkg['id'] in detailed))
+        return
+
+    groups = {}
+    for pkg in packages:
+        if pkg['id'] in detailed and is_pallet(pkg):
+            for part in [pallet_base(pkg), *iter_contents(pkg)]:
+                groups.setdefault(part['color'], []).append(part)
+            continue
+        groups.setdefault(pkg['color'], []).append(pkg)
+
+    for color, group in groups.items():
+        types = sorted({pkg['name'].split()[0] if pkg['name'].split() else '?' for pkg in group})
+        label = ', '.join(types[:3]) + (' …' if len(types) > 3 else '')
+        fig.add_trace(create_box_batch(group, color, f'{label} ({len(group)})'))
+
+
 def create_truck_wireframe():
     """Create wireframe for truck trailer"""
     edges_x = []
@@ -105,13 +300,15 @@ def create_truck_floor():
     )
 
 
-def create_figure(packages, camera=None):
+def create_figure(packages, camera=None, compact=False, detailed=()):
     """
     Create the 3D figure with truck and packages
     
     Args:
         packages: List of package dictionaries
         camera: Optional camera position dict
+        compact: Use compact typed-array encoding (see add_package_traces)
+        detailed: Ids of pallets to draw carton by carton
     
     Returns:
         plotly.graph_objects.Figure
@@ -123,12 +320,7 @@ def create_figure(packages, camera=None):
     fig.add_trace(create_truck_floor())
     
     # Add all packages
-    for pkg in packages:
-        fig.add_trace(create_box_mesh(
-            pkg['x'], pkg['y'], pkg['z'],
-            pkg['width'], pkg['height'], pkg['depth'],
-            pkg['color'], pkg['name'], pkg.get('rotation', 0)
-        ))
+    add_package_traces(fig, packages, compact, detailed)
     
     total_volume = calculate_totals(packages)
     truck_volume = TRUCK_LENGTH * TRUCK_WIDTH * TRUCK_HEIGHT
@@ -148,6 +340,7 @@ def create_figure(packages, camera=None):
             xanchor='center'
         ),
         showlegend=True,
+        uirevision=FIGURE_UIREVISION,
         height=700,
         margin=dict(l=0, r=0, t=40, b=0),
         paper_bgcolor='#1e293b',
@@ -159,7 +352,7 @@ def create_figure(packages, camera=None):
 
 
 # Custom / changing the truck dims by input fields
-def create_figure_custom(packages, camera=None, truck_dims=None):
+def create_figure_custom(packages, camera=None, truck_dims=None, compact=False, detailed=()):
     """
     Create 3D figure with custom truck dimensions
     
@@ -167,6 +360,8 @@ def create_figure_custom(packages, camera=None, truck_dims=None):
         packages: List of package dictionaries
         camera: Optional camera position dict
         truck_dims: Dict with 'length', 'width', 'height'
+        compact: Use compact typed-array encoding (see add_package_traces)
+        detailed: Ids of pallets to draw carton by carton
     """
     # Use custom dimensions or defaults
     if truck_dims:
@@ -185,12 +380,7 @@ def create_figure_custom(packages, camera=None, truck_dims=None):
     fig.add_trace(create_truck_floor_custom(truck_length, truck_width))
     
     # Add packages
-    for pkg in packages:
-        fig.add_trace(create_box_mesh(
-            pkg['x'], pkg['y'], pkg['z'],
-            pkg['width'], pkg['height'], pkg['depth'],
-            pkg['color'], pkg['name'], pkg.get('rotation', 0)
-        ))
+    add_package_traces(fig, packages, compact, detailed)
     
     total_volume = calculate_totals(packages)
     truck_volume = truck_length * truck_width * truck_height
@@ -210,6 +400,7 @@ def create_figure_custom(packages, camera=None, truck_dims=None):
             xanchor='center'
         ),
         showlegend=True,
+        uirevision=FIGURE_UIREVISION,
         height=700,
         margin=dict(l=0, r=0, t=40, b=0),
         paper_bgcolor='#1e293b',
@@ -0,0 +1,181 @@
+"""3D view of several trucks' load plans side by side in one figure"""
+
+import numpy as np
+import plotly.graph_objects as go
+from config import FLEET_GAP, DEFAULT_CAMERA
+from utils.geometry import calculate_load_metrics
+from visualization.figures import BOX_CORNERS, create_box_batch
+
+# The 12 edges of a trailer as pairs of BOX_CORNERS indices
+TRAILER_EDGES = np.array([
+    [0, 1], [1, 2], [2, 3], [3, 0],
+    [4, 5], [5, 6], [6, 7], [7, 4],
+    [0, 4], [1, 5], [2, 6], [3, 7]
+])
+
+# Traces before the per-truck package traces: outlines, floors, labels
+FLEET_STATIC_TRACES = 3
+
+# Kept across fleet renders, so the fleet view keeps its camera (see figures.FIGURE_UIREVISION)
+FLEET_UIREVISION = 'fleet-view'
+
+
+def truck_offsets(plans, gap=FLEET_GAP):
+    """Y offset of each truck when the trucks stand side by side, gap meters apart"""
+    offsets = []
+    y = 0.0
+    for plan in plans:
+        offsets.append(round(y, 3))
+        y += plan['truck_dims']['width'] + gap
+    return offsets
+
+
+def create_trailer_outlines(plans, offsets):
+    """
+    One Scatter3d with the outline of every trailer
+
+    The unit box edges are scaled and moved per truck, so the static
+    geometry stays a single trace however many trucks there are (an empty
+    trace for no trucks).
+    """
+    if not plans:
+        return go.Scatter3d(x=[], y=[], z=[], mode='lines', name='Trailers', hoverinfo='skip', showlegend=False)
+
+    segments = []
+    for plan, offset in zip(plans, offsets):
+        dims = plan['truck_dims']
+        corners = BOX_CORNERS * [dims['length'], dims['width'], dims['height']] + [0, offset, 0]
+        segments.append(corners[TRAILER_EDGES])
+
+    # (edges, 3 points, xyz) with a NaN point after each edge to break the line
+    points = np.concatenate(segments)
+    points = np.concatenate([points, np.full((len(points), 1, 3), np.nan)], axis=1).reshape(-1, 3)
+    x, y, z = ([None if np.isnan(value) else round(float(value), 3) for value in points[:, axis]]
+               for axis in range(3))
+
+    return go.Scatter3d(
+        x=x, y=y, z=z,
+        mode='lines',
+        line=dict(color='gray', width=3),
+        name='Trailers',
+        hoverinfo='skip',
+        showlegend=False
+    )
+
+
+def create_trailer_floors(plans, offsets):
+    """One Mesh3d with the floor of every trailer (two triangles each)"""
+    x, y, i, j, k = [], [], [], [], []
+    for n, (plan, offset) in enumerate(zip(plans, offsets)):
+        length, width = plan['truck_dims']['length'], plan['truck_dims']['width']
+        x += [0, length, length, 0]
+        y += [offset, offset, offset + width, offset + width]
+        i += [4 * n, 4 * n]
+        j += [4 * n + 1, 4 * n + 2]
+        k += [4 * n + 2, 4 * n + 3]
+
+    return go.Mesh3d(
+        x=x, y=y, z=[0] * len(x),
+        i=i, j=j, k=k,
+        color='lightgray',
+        opacity=0.2,
+        name='Floors',
+        hoverinfo='skip',
+        showlegend=False
+    )
+
+
+def plan_metrics(plan):
+    """A plan's load metrics (calculated if the plan does not carry them)"""
+    if 'metrics' in plan:
+        return plan['metrics']
+    dims = plan['truck_dims']
+    return calculate_load_metrics(plan['packages'], dims['length'], dims['width'], dims['height'])
+
+
+def create_truck_labels(plans, offsets):
+    """One text trace with each truck's name, utilization and loading meters above it"""
+    metrics = [plan_metrics(plan) for plan in plans]
+    return go.Scatter3d(
+        x=[plan['truck_dims']['length'] / 2 for plan in plans],
+        y=[offset + plan['truck_dims']['width'] / 2 for plan, offset in zip(plans, offsets)],
+        z=[plan['truck_dims']['height'] + 0.4 for plan in plans],
+        mode='text',
+        text=[f"{plan['name']}: {m['volume_utilization']:.0f}% · {m['ldm']:.1f} LDM"
+              for plan, m in zip(plans, metrics)],
+        textfont=dict(color='white', size=12),
+        name='Utilization',
+        hoverinfo='skip',
+        showlegend=False
+    )
+
+
+def create_fleet_figure(plans, camera=None, gap=FLEET_GAP):
+    """
+    Create one 3D figure with several trucks side by side
+
+    Trailer outlines and floors are one trace each for the whole fleet and
+    each truck's packages one compact trace (create_box_batch), so the
+    figure has 3 + trucks traces whatever the package count. A dropdown
+    shows all trucks or one at a time.
+
+    Args:
+        plans: List of dicts with 'name', 'packages' (placed) and
+               'truck_dims', optionally 'metrics' (see utils.fleet)
+        camera: Optional camera position dict
+        gap: Meters between trailers
+
+    Returns:
+        plotly.graph_objects.Figure
+    """
+    offsets = truck_offsets(plans, gap)
+    fig = go.Figure()
+    fig.add_trace(create_trailer_outlines(plans, offsets))
+    fig.add_trace(create_trailer_floors(plans, offsets))
+    fig.add_trace(create_truck_labels(plans, offsets))
+
+    for plan, offset in zip(plans, offsets):
+        shifted = [{**pkg, 'y': pkg['y'] + offset} for pkg in plan['packages']]
+        if shifted:
+            trace = create_box_batch(shifted, shifted[0]['color'], f"{plan['name']} ({len(shifted)})",
+                                     own_colors=True)
+        else:
+            trace = go.Mesh3d(x=[], y=[], z=[], name=f"{plan['name']} (0)")
+        fig.add_trace(trace)
+
+    static = [True] * FLEET_STATIC_TRACES
+    buttons = [dict(label='All trucks', method='restyle', args=[{'visible': static + [True] * len(plans)}])]
+    buttons += [dict(label=plan['name'], method='restyle',
+                     args=[{'visible': static + [n == shown for n in range(len(plans))]}])
+                for shown, plan in enumerate(plans)]
+
+    num_packages = sum(len(plan['packages']) for plan in plans)
+    fleet_length = max((plan['truck_dims']['length'] for plan in plans), default=1)
+    fleet_width = offsets[-1] + plans[-1]['truck_dims']['width'] if plans else 1
+    fleet_height = max((plan['truck_dims']['height'] for plan in plans), default=1)
+
+    fig.update_layout(
+        scene=dict(
+            xaxis=dict(title='Length (m)', range=[0, fleet_length]),
+            yaxis=dict(title='Width (m)', range=[0, fleet_width]),
+            zaxis=dict(title='Height (m)', range=[0, fleet_height + 0.6]),
+            aspectmode='data',
+            camera=camera if camera else DEFAULT_CAMERA
+        ),
+        title=dict(
+            text=f'Fleet - {len(plans)} Truck(s), {num_packages} Package(s)',
+            x=0.5,
+            xanchor='center'
+        ),
+        updatemenus=[dict(type='dropdown', direction='down', x=0.01, y=0.99, xanchor='left', yanchor='top',
+                          buttons=buttons, bgcolor='#334155', font=dict(color='white'))],
+        showlegend=True,
+        uirevision=FLEET_UIREVISION,
+        height=700,
+        margin=dict(l=0, r=0, t=40, b=0),
+        paper_bgcolor='#1e293b',
+        plot_bgcolor='#1e293b',
+        font=dict(color='white')
+    )
+
+    return fig